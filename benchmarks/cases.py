@@ -0,0 +1,228 @@
+"""
+Benchmark cases of the simulation hot paths.
+
+Every case is a setup function registered with @benchmark: it builds its
+input (not timed) from fixed seeds and compositions and returns the callable
+that is timed. Setup runs again before every repetition, so cases that
+change their input (Combat.tick, generate_map) always measure the same work.
+"""
+import os
+import random
+import tempfile
+
+# Headless rendering: must be set before pygame creates a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from src.core.world import GameWorld
+from src.core.map_generator import generate_map
+from src.core.pathfinding import search_path
+from src.core.combat import Combat
+from src.core.combat_scheduler import CombatScheduler
+from src.core.collisions import handle_collisions
+from src.core.renderer import Renderer
+from src.core.snapshot import save_world, load_world
+from src.core.camera import Camera
+from src.core.terrain_config import TERRAIN_TYPES
+from src.game_objects.army import Army
+from src.game_objects.unit import Unit
+from src.game_objects.faction import Faction
+from src.game_objects.tile import Tile
+from src.misc.enums import CombatType, PathStatus
+
+MAP_SEED = 42
+RANDOM_SEED = 1234
+MAP_SIZE = 100
+
+# name -> (setup function, repetitions)
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=10):
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return decorator
+
+
+_FACTIONS = (Faction("Order of the Sun", "Blue"), Faction("Shadow Syndicate", "Red"))
+_MAPS = {}
+
+
+def _map(size=MAP_SIZE):
+    """The benchmark map of a given size (generated once per process, seeds fixed)."""
+    if size not in _MAPS:
+        random.seed(RANDOM_SEED) # Roads are placed with the global random generator
+        _MAPS[size] = generate_map(size, size, list(_FACTIONS), seed=MAP_SEED)
+    return _MAPS[size]
+
+
+def _world(size=MAP_SIZE):
+    world = GameWorld(width=size, height=size)
+    world.map_data, world.territories = _map(size)
+    world.build_movement_cost_raster()
+    world.build_defense_bonus_raster()
+    world.build_knowledge()
+    world.build_influence()
+    world.events.views.clear() # Measure the simulation, not the text log
+    return world
+
+
+def _walkable_tiles(game_map):
+    return [(x, y) for y, row in enumerate(game_map) for x, tile in enumerate(row) if tile.is_walkable]
+
+
+def _army(faction, x, y, size):
+    """Mixed army with a fixed composition: half infantry, a quarter cavalry, a quarter ranged."""
+    units = ([Unit("swordsman") for _ in range(size // 2)]
+             + [Unit("light_cavalry") for _ in range(size // 4)]
+             + [Unit("archer") for _ in range(size - size // 2 - size // 4)])
+    return Army(faction, x, y, units)
+
+
+# ---- Map generation ----
+
+def _generate_map_case(size):
+    def setup():
+        random.seed(RANDOM_SEED)
+        return lambda: generate_map(size, size, list(_FACTIONS), seed=MAP_SEED)
+    return setup
+
+
+for _size, _repeat in ((50, 3), (75, 2), (100, 1)):
+    benchmark(f"generate_map_{_size}", repeat=_repeat)(_generate_map_case(_size))
+
+
+# ---- Pathfinding ----
+
+def _path_endpoints():
+    """Start, a goal ~10 tiles away and a goal across the map, picked from the walkable tiles."""
+    game_map, _ = _map()
+    tiles = _walkable_tiles(game_map)
+    start = min(tiles, key=lambda t: t[0] + t[1])
+    near = min(tiles, key=lambda t: abs(max(abs(t[0] - start[0]), abs(t[1] - start[1])) - 10))
+    far = max(tiles, key=lambda t: t[0] + t[1])
+    return start, near, far
+
+
+@benchmark("find_path_short", repeat=20)
+def _find_path_short():
+    game_map, _ = _map()
+    start, near, _ = _path_endpoints()
+    return lambda: search_path(game_map, start, near)
+
+
+@benchmark("find_path_long", repeat=5)
+def _find_path_long():
+    game_map, _ = _map()
+    start, _, far = _path_endpoints()
+    return lambda: search_path(game_map, start, far)
+
+
+@benchmark("find_path_unreachable", repeat=5)
+def _find_path_unreachable():
+    """The goal is walled off with deep water, so the search exhausts the start's whole region."""
+    game_map, _ = _map()
+    start, _, far = _path_endpoints()
+    water = TERRAIN_TYPES["DEEP_WATER"]
+    walled = [list(row) for row in game_map]
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            x, y = far[0] + dx, far[1] + dy
+            if (dx or dy) and 0 <= x < MAP_SIZE and 0 <= y < MAP_SIZE:
+                walled[y][x] = Tile(water)
+
+    def run():
+        query = search_path(walled, start, far, iteration_limit=MAP_SIZE * MAP_SIZE * 8)
+        assert query.status == PathStatus.UNREACHABLE
+        return query
+    return run
+
+
+# ---- Combat ----
+
+def _combat_case(size):
+    def setup():
+        random.seed(RANDOM_SEED)
+        world = _world()
+        x, y = _walkable_tiles(world.map_data)[0]
+        combat = Combat(_army(_FACTIONS[0], x, y, size), _army(_FACTIONS[1], x, y, size), world,
+                        CombatType.MEETING_ENGAGEMENT)
+        return combat.tick
+    return setup
+
+
+benchmark("combat_tick_small", repeat=50)(_combat_case(10))
+benchmark("combat_tick_huge", repeat=5)(_combat_case(5000))
+
+
+# ---- Collisions ----
+
+def _collisions_case(count):
+    def setup():
+        random.seed(RANDOM_SEED)
+        world = _world()
+        tiles = _walkable_tiles(world.map_data)
+        for index, (x, y) in enumerate(random.sample(tiles, count)):
+            world.add_army(_army(_FACTIONS[index % 2], x + 0.5, y + 0.5, 4))
+        # Only the collision step of the game loop is needed, without a window or AI
+        scheduler = CombatScheduler()
+        return lambda: handle_collisions(world, scheduler)
+    return setup
+
+
+benchmark("handle_collisions_200", repeat=10)(_collisions_case(200))
+benchmark("handle_collisions_2000", repeat=5)(_collisions_case(2000))
+
+
+# ---- Snapshots ----
+
+def _snapshot_world(count):
+    random.seed(RANDOM_SEED)
+    world = _world()
+    for index, (x, y) in enumerate(random.sample(_walkable_tiles(world.map_data), count)):
+        world.add_army(_army(_FACTIONS[index % 2], x + 0.5, y + 0.5, 10))
+    return world
+
+
+_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), "ewc_benchmark.ewcs")
+
+
+@benchmark("save_snapshot_2000", repeat=5)
+def _save_snapshot():
+    world = _snapshot_world(2000)
+    return lambda: save_world(_SNAPSHOT_PATH, world)
+
+
+@benchmark("load_snapshot_2000", repeat=5)
+def _load_snapshot():
+    save_world(_SNAPSHOT_PATH, _snapshot_world(2000))
+    return lambda: load_world(_SNAPSHOT_PATH)
+
+
+# ---- Rendering ----
+
+def _renderer():
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    return Renderer(screen)
+
+
+@benchmark("pre_render_map", repeat=3)
+def _pre_render_map():
+    game_map, territories = _map()
+    renderer = _renderer()
+    return lambda: renderer.pre_render_map(game_map, territories)
+
+
+@benchmark("render_frame", repeat=30)
+def _render_frame():
+    random.seed(RANDOM_SEED)
+    world = _world()
+    for index, (x, y) in enumerate(random.sample(_walkable_tiles(world.map_data), 200)):
+        world.add_army(_army(_FACTIONS[index % 2], x + 0.5, y + 0.5, 4))
+    renderer = _renderer()
+    renderer.pre_render_map(world.map_data, world.territories)
+    camera = Camera(renderer.game_surface.get_width(), renderer.game_surface.get_height())
+    return lambda: renderer.render(world, camera)
@@ -0,0 +1,134 @@
+"""
+Runs the benchmark suite and compares it with a stored baseline.
+
+    python -m benchmarks.run                        # run everything, print a table
+    python -m benchmarks.run -k find_path           # only cases whose name contains "find_path"
+    python -m benchmarks.run -o results.json        # also write the results as JSON
+    python -m benchmarks.run --save-baseline        # store the results as benchmarks/baseline.json
+    python -m benchmarks.run --compare              # fail (exit code 1) on regressions against the baseline
+
+The median of the repetitions is compared; a case regresses when it is slower
+than the baseline by more than the threshold (20% by default). Baselines are
+only comparable on the same machine.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.2
+
+
+def run_case(setup, repeat):
+    """Times `repeat` runs of a case (fresh setup each time, GC off while timing). Returns times in ms."""
+    times = []
+    for _ in range(repeat):
+        func = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) * 1000.0)
+        finally:
+            gc.enable()
+    return times
+
+
+def run_suite(benchmarks, name_filter=None, repeat=None):
+    results = {}
+    for name, (setup, default_repeat) in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        times = run_case(setup, repeat or default_repeat)
+        results[name] = {
+            "repeat": len(times),
+            "min_ms": min(times),
+            "median_ms": statistics.median(times),
+            "mean_ms": statistics.fmean(times),
+        }
+        print(f"{name:<26}{results[name]['median_ms']:>12.3f} ms  (min {results[name]['min_ms']:.3f}, n={len(times)})",
+              flush=True)
+    return results
+
+
+def environment():
+    """Where the numbers come from: interpreter, library versions, machine and commit."""
+    import numpy
+    import pygame
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "commit": commit,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns [(name, baseline_ms, current_ms, change)] of the cases slower than baseline by more than `threshold`."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or reference["median_ms"] <= 0:
+            continue
+        change = result["median_ms"] / reference["median_ms"] - 1.0
+        marker = "REGRESSION" if change > threshold else ""
+        print(f"{name:<26}{reference['median_ms']:>12.3f} -> {result['median_ms']:>10.3f} ms  {change:+7.1%}  {marker}")
+        if change > threshold:
+            regressions.append((name, reference["median_ms"], result["median_ms"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eternal War Chronicles benchmark suite")
+    parser.add_argument("-k", "--filter", help="run only cases whose name contains this text")
+    parser.add_argument("-n", "--repeat", type=int, help="repetitions per case (overrides the case default)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline, exit code 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of the median before a case counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    from .cases import BENCHMARKS
+    from src.core.log import set_level
+    set_level("", logging.WARNING) # Keep the log writer out of the measurements
+
+    report = {"environment": environment(), "results": run_suite(BENCHMARKS, args.filter, args.repeat)}
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {path}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            return 1
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(report["results"], baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,271 @@
-from src.core.game import Game
+"""
+Eternal War Chronicles command line.
 
-def main():
+    python main.py                                   # play (same as "play")
+    python main.py play --map-size 150 --armies 3    # windowed game
+    python main.py sim --ticks 36000 --seed 7        # headless simulation, reports ticks/s
+    python main.py genmap --size 200 --seed 5 --png  # generate a map, cache it for --map
+    python main.py bench -k find_path                # benchmark suite (options of benchmarks/run.py)
+    python main.py battle --battles 1000             # batch of combats, reports battles/s
+
+Every command prints its throughput; the heavy imports (pygame, numpy) only
+happen once the arguments are parsed.
+"""
+import argparse
+import os
+import sys
+import time
+from src.core.startup import STARTUP
+
+DEFAULT_MAP_DIR = "maps"
+DEFAULT_ARMY1 = "shieldman:3,spearman:7,archer:5"
+DEFAULT_ARMY2 = "swordsman:5,light_cavalry:4,crossbowman:3"
+
+
+def _add_world_arguments(parser):
+    parser.add_argument("--seed", type=int, help="seed of the simulation (random by default)")
+    parser.add_argument("--map-seed", type=int, help="seed of the map (drawn from --seed by default)")
+    parser.add_argument("--map-size", type=int, default=100, help="map width and height in tiles (default 100)")
+    parser.add_argument("--map", dest="map_path", help="map file written by genmap (replaces --map-size/--map-seed)")
+    parser.add_argument("--armies", type=int, default=1, help="armies per faction (default 1)")
+
+
+def _game_arguments(args):
+    return dict(seed=args.seed, map_seed=args.map_seed, map_size=args.map_size, armies_per_faction=args.armies,
+                map_path=args.map_path)
+
+
+def play(args):
+    STARTUP.enabled = args.startup_timing
+    with STARTUP.stage("imports"), STARTUP.time_imports():
+        from src.core.game import Game
+    game = Game(args.width, args.height, record_path=args.record, background_load=True, **_game_arguments(args))
+    game.run()
+    return 0
+
+
+def sim(args):
+    from src.core.game import Game
+    from src.core.log import set_level
+    if args.quiet:
+        set_level("", "WARNING")
+    start = time.perf_counter()
+    game = Game(headless=True, record_path=args.record, **_game_arguments(args))
+    setup_s = time.perf_counter() - start
+    if not args.frame_budgets:
+        # Without the wall-clock budgets a run depends only on the seeds and is repeatable
+        game.ai_scheduler.frame_budget_ms = None
+        game.combat_scheduler.frame_budget_ms = None
+    game.autosave.enabled = args.autosave
+    game.profile_reload_interval = float('inf')
+    if args.quiet:
+        game.world.events.views.clear()
+
+    frame_ms = round(args.dt * 1000)
+    delta_time = frame_ms / 1000.0
+    combats = 0
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        if game.recorder is not None:
+            game.recorder.begin_frame(frame_ms)
+        game.step(delta_time)
+        combats = max(combats, len(game.combat_scheduler))
+    elapsed = time.perf_counter() - start
+
+    if game.recorder is not None:
+        game.recorder.save(args.record)
+    if args.snapshot:
+        game.save_snapshot(args.snapshot)
+    game.autosave.shutdown()
+    game.world.events.close()
+    factions = {}
+    for army in game.world.armies:
+        factions[army.faction.name] = factions.get(army.faction.name, 0) + 1
+    source = args.map_path or f"map seed {game.map_seed}"
+    print(f"seed {game.seed}, {source}, map {game.world.width}x{game.world.height}, setup {setup_s:.2f} s")
+    print(f"{args.ticks} ticks ({args.ticks * delta_time:.0f} s of game time) in {elapsed:.2f} s: "
+          f"{args.ticks / elapsed if elapsed > 0 else 0:.0f} ticks/s, "
+          f"{args.ticks * delta_time / elapsed if elapsed > 0 else 0:.0f}x real time")
+    print(f"armies left: {factions or 'none'}, most simultaneous combats: {combats}")
+    return 0
+
+
+def genmap(args):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import random
+    from src.core.map_generator import generate_map
+    from src.core.world import GameWorld
+    from src.core.snapshot import save_world
+    from src.game_objects.faction import Faction
+
+    seed = args.seed if args.seed is not None else random.randrange(1000000)
+    path = args.output or os.path.join(DEFAULT_MAP_DIR, f"map_{args.size}_{seed}.ewcs")
+    if os.path.exists(path) and not args.force:
+        print(f"{path} already exists (use --force to regenerate)")
+        return 0
+    # Game's factions, so that territory owners match when the map is played
+    world = GameWorld(width=args.size, height=args.size)
+    factions = [Faction("Order of the Sun", "Blue"), Faction("Shadow Syndicate", "Red")]
+    for faction in factions:
+        world.add_faction(faction)
+    random.seed(seed) # Roads are placed with the global random generator
+    start = time.perf_counter()
+    world.map_data, world.territories = generate_map(args.size, args.size, factions, seed=seed)
+    elapsed = time.perf_counter() - start
+    world.build_movement_cost_raster()
+    world.build_defense_bonus_raster()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    size = save_world(path, world)
+    tiles = args.size * args.size
+    print(f"map {args.size}x{args.size} (seed {seed}) generated in {elapsed:.2f} s "
+          f"({tiles / elapsed if elapsed > 0 else 0:.0f} tiles/s), {size / 1024:.0f} KB written to {path}")
+    if args.png:
+        import pygame
+        from src.core.renderer import Renderer
+        pygame.display.init()
+        renderer = Renderer(pygame.display.set_mode((1, 1)))
+        renderer.pre_render_map(world.map_data)
+        png_path = os.path.splitext(path)[0] + ".png"
+        pygame.image.save(renderer.map_surface, png_path)
+        pygame.quit()
+        print(f"image written to {png_path}")
+    return 0
+
+
+def bench(options):
+    from benchmarks.run import main as run_benchmarks
+    return run_benchmarks(options)
+
+
+def _parse_army(spec):
+    """ "swordsman:20,archer:10" -> [("swordsman", 20), ("archer", 10)] """
+    composition = []
+    for part in spec.split(","):
+        unit_type, _, count = part.strip().partition(":")
+        composition.append((unit_type, int(count or 1)))
+    return composition
+
+
+def battle(args):
+    import random
+    from src.core.world import GameWorld
+    from src.core.combat import Combat
+    from src.core.terrain_config import TERRAIN_TYPES
+    from src.core.log import set_level
+    from src.game_objects.army import Army
+    from src.game_objects.unit import Unit, get_unit_type_record
+    from src.game_objects.faction import Faction
+    from src.game_objects.tile import Tile
+    from src.misc.enums import CombatType, Stance
+
+    if args.terrain not in TERRAIN_TYPES:
+        print(f"Unknown terrain {args.terrain}; one of: {', '.join(sorted(TERRAIN_TYPES))}")
+        return 2
+    compositions = (_parse_army(args.army1), _parse_army(args.army2))
+    for unit_type, _ in compositions[0] + compositions[1]:
+        get_unit_type_record(unit_type) # Fails early on unknown unit types
+    set_level("", "WARNING")
+
+    # A small field of one terrain: every battle is fought on its centre tile
+    world = GameWorld(width=3, height=3)
+    world.map_data = [[Tile(TERRAIN_TYPES[args.terrain]) for _ in range(3)] for _ in range(3)]
+    world.events.views.clear()
+    factions = (Faction("Order of the Sun", "Blue"), Faction("Shadow Syndicate", "Red"))
+    combat_type = CombatType.POSITIONAL_ASSAULT if args.assault else CombatType.MEETING_ENGAGEMENT
+    random.seed(args.seed)
+
+    wins = [0, 0, 0] # side 1, side 2, draw
+    rounds = 0
+    survivors = [0, 0]
+    start = time.perf_counter()
+    for _ in range(args.battles):
+        armies = [Army(faction, 1, 1, [Unit(unit_type) for unit_type, count in composition for _ in range(count)])
+                  for faction, composition in zip(factions, compositions)]
+        if args.assault:
+            armies[0].stance = Stance.IDLE # Side 1 holds the position
+            armies[1].stance = Stance.MOVING
+        combat = Combat(armies[0], armies[1], world, combat_type)
+        status, winner = None, None
+        while status != 'finished' and combat.round_number < args.max_rounds:
+            status, winner, _ = combat.tick()
+        wins[2 if winner is None else armies.index(winner)] += 1
+        rounds += combat.round_number
+        for side, army in enumerate(armies):
+            survivors[side] += len(army.units)
+    elapsed = time.perf_counter() - start
+
+    battles = args.battles
+    print(f"{battles} battles ({combat_type.name.lower()}, {args.terrain}) in {elapsed:.2f} s: "
+          f"{battles / elapsed if elapsed > 0 else 0:.0f} battles/s, {rounds / elapsed if elapsed > 0 else 0:.0f} rounds/s")
+    print(f"side 1 won {wins[0]} ({wins[0] / battles:.1%}), side 2 won {wins[1]} ({wins[1] / battles:.1%}), "
+          f"draws {wins[2]}; {rounds / battles:.1f} rounds per battle, "
+          f"survivors per battle {survivors[0] / battles:.1f} / {survivors[1] / battles:.1f}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Eternal War Chronicles")
+    commands = parser.add_subparsers(dest="command")
+
+    play_parser = commands.add_parser("play", help="windowed game (the default)")
+    _add_world_arguments(play_parser)
+    play_parser.add_argument("--width", type=int, default=1280, help="window width (default 1280)")
+    play_parser.add_argument("--height", type=int, default=720, help="window height (default 720)")
+    play_parser.add_argument("--record", default="last_session.ewcr", help="session recording written on exit")
+    play_parser.add_argument("--startup-timing", action="store_true",
+                             help="log the startup breakdown: imports, window, map generation, first frame")
+    play_parser.set_defaults(handler=play)
+
+    sim_parser = commands.add_parser("sim", help="headless simulation of N ticks")
+    _add_world_arguments(sim_parser)
+    sim_parser.add_argument("--ticks", type=int, default=3600, help="ticks to simulate (default 3600)")
+    sim_parser.add_argument("--dt", type=float, default=1 / 60, help="game seconds per tick (default 1/60)")
+    sim_parser.add_argument("--frame-budgets", action="store_true",
+                            help="keep the AI and combat frame budgets (wall-clock dependent, not repeatable)")
+    sim_parser.add_argument("--autosave", action="store_true", help="write autosaves as the game does")
+    sim_parser.add_argument("--record", help="write a session recording (replayable with src/core/replay.py)")
+    sim_parser.add_argument("--snapshot", help="save a snapshot of the final state")
+    sim_parser.add_argument("-q", "--quiet", action="store_true", help="only warnings in the log, no text event log")
+    sim_parser.set_defaults(handler=sim)
+
+    genmap_parser = commands.add_parser("genmap", help="generate a map and cache it for --map")
+    genmap_parser.add_argument("--size", type=int, default=100, help="width and height in tiles (default 100)")
+    genmap_parser.add_argument("--seed", type=int, help="map seed (random by default)")
+    genmap_parser.add_argument("-o", "--output", help=f"map file (default {DEFAULT_MAP_DIR}/map_<size>_<seed>.ewcs)")
+    genmap_parser.add_argument("--force", action="store_true", help="regenerate even if the file exists")
+    genmap_parser.add_argument("--png", action="store_true", help="also export the rendered map as PNG")
+    genmap_parser.set_defaults(handler=genmap)
+
+    # Listed for the help only: main() hands the options of "bench" straight to benchmarks/run.py
+    commands.add_parser("bench", help="benchmark suite; options are those of benchmarks/run.py")
+
+    battle_parser = commands.add_parser("battle", help="batch of combat simulations")
+    battle_parser.add_argument("--battles", type=int, default=100, help="number of battles (default 100)")
+    battle_parser.add_argument("--army1", default=DEFAULT_ARMY1, help=f"side 1, e.g. \"{DEFAULT_ARMY1}\"")
+    battle_parser.add_argument("--army2", default=DEFAULT_ARMY2, help=f"side 2, e.g. \"{DEFAULT_ARMY2}\"")
+    battle_parser.add_argument("--terrain", default="PLAINS", help="terrain of the battlefield (default PLAINS)")
+    battle_parser.add_argument("--assault", action="store_true", help="side 1 defends a position (positional assault)")
+    battle_parser.add_argument("--max-rounds", type=int, default=1000, help="rounds before a battle counts as a draw")
+    battle_parser.add_argument("--seed", type=int, default=0, help="seed of the batch (default 0)")
+    battle_parser.set_defaults(handler=battle)
+    return parser
+
+
+def main(argv=None):
     """
     Главная функция игры.
-    Создает экземпляр игры и запускает ее.
+    Разбирает командную строку и запускает выбранную команду (по умолчанию — игру).
     """
-    game = Game()
-    game.run()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        argv = ["play"] + argv # "python main.py [options]" plays, as before
+    if argv[0] == "bench":
+        # Passed through untouched: argparse would take the suite's options (-k, -n...) for its own
+        return bench(argv[1:])
+    args = parser.parse_args(argv)
+    return args.handler(args)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import time
+from .general_ai import decide_batch
+
+# Golden-ratio step used to spread the first decisions of generals over their interval
+_PHASE_STEP = 0.6180339887498949
+
+
+class AIScheduler:
+    """
+    Decides which AI generals think in the current frame. Every general has its
+    own think interval (see GeneralAI.think_interval) and phase, so generals
+    added together do not all think in the same frame. An optional per-frame
+    time budget limits how long AI may run: generals that did not fit are
+    carried over to the next frame and processed first.
+
+    AI cost therefore scales with the number of decisions made, not with
+    frames x generals.
+    """
+    def __init__(self, frame_budget_ms=None, batch_size=16):
+        """
+        :param frame_budget_ms: Time budget for AI decisions per frame (ms). None means unlimited.
+        :param batch_size: How many due generals are evaluated together at most.
+        """
+        self.frame_budget_ms = frame_budget_ms
+        self.batch_size = batch_size
+        self.clock = 0.0 # Scheduler time (does not advance while the game is paused)
+
+        self._queue = [] # Heap of (due_time, sequence, general)
+        self._due_times = {} # general -> time of its next decision
+        self._counter = itertools.count()
+        self._phase_index = 0
+
+        # Called as on_decision(general, tactic) after every decision (session recording)
+        self.on_decision = None
+
+        # Statistics of the last frame
+        self.last_frame_thinks = 0
+        self.last_frame_time_ms = 0.0
+        self.last_frame_deferred = 0
+        self.last_frame_cutoff = None # Number of the budget check that ended the last frame, None if none did
+
+    def __len__(self):
+        return len(self._due_times)
+
+    def __iter__(self):
+        return iter(list(self._due_times))
+
+    def __contains__(self, general):
+        return general in self._due_times
+
+    def add(self, general, due_time=None):
+        """
+        Registers a general. Its first decision is offset in phase from the other generals,
+        unless `due_time` gives it explicitly (restoring a snapshot).
+        """
+        if general in self._due_times:
+            return
+        if due_time is None:
+            phase = (self._phase_index * _PHASE_STEP) % 1.0
+            self._phase_index += 1
+            due_time = self.clock + general.think_interval * phase
+        self._schedule(general, due_time)
+
+    def remove(self, general):
+        """Removes a general from the schedule. Its heap entry is dropped lazily."""
+        self._due_times.pop(general, None)
+
+    def due_time(self, general):
+        """Time of the general's next decision, or None if it is not scheduled."""
+        return self._due_times.get(general)
+
+    def update(self, delta_time, world, cutoff=None):
+        """
+        Advances the scheduler clock and lets every general whose decision is due
+        think once. Due generals are taken in batches and grouped by faction:
+        the decision tables of a group are evaluated at once (decide_batch),
+        then each general acts within the frame budget. Generals whose army is
+        no longer in the world are removed.
+
+        :param cutoff: Replays a recorded frame: the frame ends at budget check
+            number `cutoff` (see last_frame_cutoff) instead of by the clock, so
+            exactly the recorded generals are carried over. None never cuts by
+            count.
+        """
+        self.clock += delta_time
+        frame_start = time.perf_counter()
+        budget = self.frame_budget_ms / 1000.0 if self.frame_budget_ms is not None else None
+
+        thinks = 0
+        checks = 0
+        self.last_frame_cutoff = None
+
+        def out_of_budget():
+            nonlocal checks
+            checks += 1
+            if cutoff is not None:
+                exhausted = checks >= cutoff
+            else:
+                exhausted = budget is not None and thinks > 0 and time.perf_counter() - frame_start >= budget
+            if exhausted and self.last_frame_cutoff is None:
+                self.last_frame_cutoff = checks
+            return exhausted
+
+        while self._queue and self._queue[0][0] <= self.clock:
+            if out_of_budget():
+                break # The remaining generals are carried over to the next frame
+
+            batch = self._pop_due(self.batch_size, world)
+            by_faction = {}
+            for item in batch:
+                by_faction.setdefault(item[1].army.faction, []).append(item)
+
+            pending = []
+            for group in by_faction.values():
+                if out_of_budget():
+                    pending.extend(group)
+                    continue
+                decide_start = time.perf_counter()
+                generals = [general for _, general in group]
+                actions = dict(decide_batch(generals, world))
+                # The cheap batched part of the decision is shared evenly by the group
+                decide_share = (time.perf_counter() - decide_start) / len(group)
+
+                for index, (due_time, general) in enumerate(group):
+                    if out_of_budget():
+                        pending.extend(group[index:])
+                        break
+                    act_start = time.perf_counter()
+                    tactic = actions.get(general)
+                    if tactic is not None:
+                        general.act(world, tactic)
+                    if self.on_decision is not None:
+                        self.on_decision(general, tactic)
+                    general.record_think_time(decide_share + time.perf_counter() - act_start)
+                    thinks += 1
+                    self._reschedule(general, due_time)
+
+            # Generals that did not fit into the budget keep their due time and go first next frame
+            for due_time, general in pending:
+                heapq.heappush(self._queue, (due_time, next(self._counter), general))
+
+        self.last_frame_thinks = thinks
+        self.last_frame_time_ms = (time.perf_counter() - frame_start) * 1000.0
+        self.last_frame_deferred = sum(1 for due_time in self._due_times.values() if due_time <= self.clock)
+
+    def _pop_due(self, count, world):
+        """Pops up to `count` valid generals whose decision is due, as (due_time, general) pairs."""
+        batch = []
+        while self._queue and len(batch) < count and self._queue[0][0] <= self.clock:
+            due_time, _, general = heapq.heappop(self._queue)
+            # Skip stale entries (general removed or rescheduled)
+            if self._due_times.get(general) != due_time:
+                continue
+            if general.army not in world.army_index:
+                del self._due_times[general]
+                continue
+            batch.append((due_time, general))
+        return batch
+
+    def _schedule(self, general, due_time):
+        self._due_times[general] = due_time
+        heapq.heappush(self._queue, (due_time, next(self._counter), general))
+
+    def _reschedule(self, general, due_time):
+        """Schedules the next decision of a general, keeping its phase."""
+        next_due = due_time + general.think_interval
+        if next_due <= self.clock:
+            # The general fell behind by more than an interval (overload) - do not catch up
+            next_due = self.clock + general.think_interval
+        self._schedule(general, next_due)
@@ -0,0 +1,173 @@
+import weakref
+import numpy as np
+from ..misc.enums import Situation, Tactic
+from ..game_objects.unit import get_unit_type_record
+
+# Personality traits stored in the compiled tables (column order)
+TRAITS = ("aggression", "caution", "strategic_flexibility")
+AGGRESSION = TRAITS.index("aggression")
+DEFAULT_TRAIT = 0.5
+
+# Target scoring weights (column order), see target_scoring.score_targets
+TARGET_WEIGHTS = ("distance", "strength", "terrain_defense")
+W_DISTANCE, W_STRENGTH, W_TERRAIN = range(len(TARGET_WEIGHTS))
+CAUTION = TRAITS.index("caution")
+
+# Rows allocated up front by DecisionTables (doubled whenever they run out)
+INITIAL_ROWS = 16
+
+# Generals below this aggression do not look for targets at all
+ENGAGE_AGGRESSION = 0.75
+# The enemy counts as "outnumbering" when its influence is this many times our own
+OUTNUMBERED_RATIO = 1.5
+# Tactic used for situations the profile does not mention (and no "default" is given)
+FALLBACK_TACTIC = Tactic.CHARGE
+
+# Tactics that make a general march on its target
+ATTACK_TACTICS = frozenset((Tactic.CHARGE, Tactic.OVERWHELM, Tactic.DESPERATE_CHARGE))
+
+_CATEGORY_SITUATIONS = {
+    "infantry": Situation.VS_INFANTRY,
+    "ranged": Situation.VS_ARCHERS,
+    "cavalry": Situation.VS_CAVALRY,
+}
+
+
+def parse_situation(name: str) -> Situation:
+    """Converts a tactical_matrix key ("vs_cavalry") to a Situation. Raises ValueError if unknown."""
+    try:
+        return Situation[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown situation: {name}") from None
+
+
+def parse_tactic(name: str) -> Tactic:
+    """Converts a tactic name ("desperate_charge") to a Tactic. Raises ValueError if unknown."""
+    try:
+        return Tactic[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown tactic: {name}") from None
+
+
+def army_situation(army) -> Situation:
+    """The VS_* situation matching the unit category that dominates the army."""
+    strength = {}
+    for unit_type, count in army.unit_counts.items():
+        category = get_unit_type_record(unit_type).category
+        strength[category] = strength.get(category, 0) + count
+    if not strength:
+        return Situation.DEFAULT
+    return _CATEGORY_SITUATIONS.get(max(strength, key=strength.get), Situation.DEFAULT)
+
+
+class DecisionTables:
+    """
+    Profiles compiled into rows of three arrays: personality traits
+    (row x TRAITS), the tactic to use in every situation (row x Situation)
+    and the target scoring weights (row x TARGET_WEIGHTS).
+    Rows are keyed by their compiled content, so all generals of a shared
+    profile (and of overridden copies that compile to the same values) point
+    to the same row, and a batch of generals is evaluated with plain array
+    indexing instead of nested dict lookups.
+    A row is in use while some live general holds it. Rows of superseded
+    profiles (hot-reload, restored games) are reused for new content, and the
+    arrays grow geometrically.
+    """
+    def __init__(self, capacity=INITIAL_ROWS):
+        self.traits = np.zeros((capacity, len(TRAITS)))
+        self.tactics = np.zeros((capacity, len(Situation)), dtype=np.int8)
+        self.weights = np.zeros((capacity, len(TARGET_WEIGHTS)))
+        self._size = 0 # Rows handed out so far (used or free)
+        self._rows = {} # compiled content -> row
+        self._keys = {} # row -> compiled content
+        self._free = [] # Rows released for reuse
+        self._holders = weakref.WeakKeyDictionary() # general -> its row
+
+    def __len__(self):
+        """Number of compiled rows currently kept."""
+        return len(self._rows)
+
+    def row_for(self, profile, holder) -> int:
+        """
+        Returns the row of a profile for `holder` (the general using it),
+        compiling it if no kept row has the same content. The row the holder
+        had before is released unless another general still uses it.
+        """
+        traits, tactics, weights = self.compile(profile)
+        key = (traits.tobytes(), tactics.tobytes(), weights.tobytes())
+        self._holders.pop(holder, None) # Its previous row may be reused right away
+        row = self._rows.get(key)
+        if row is None:
+            row = self._allocate()
+            self.traits[row] = traits
+            self.tactics[row] = tactics
+            self.weights[row] = weights
+            self._rows[key] = row
+            self._keys[row] = key
+        self._holders[holder] = row
+        return row
+
+    def _allocate(self):
+        """
+        A free row: a released one, or a new one at the end. Unused rows are
+        looked for only when the arrays are full, before growing them by doubling.
+        """
+        if not self._free and self._size == len(self.tactics):
+            self._release_unused()
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self.tactics):
+            capacity = max(INITIAL_ROWS, 2 * self._size)
+            self.traits = self._grow(self.traits, capacity)
+            self.tactics = self._grow(self.tactics, capacity)
+            self.weights = self._grow(self.weights, capacity)
+        self._size += 1
+        return self._size - 1
+
+    def _release_unused(self):
+        """Frees the rows no live general holds any more (superseded profiles, dropped generals)."""
+        used = set(self._holders.values())
+        for row in [row for row in self._keys if row not in used]:
+            del self._rows[self._keys.pop(row)]
+            self._free.append(row)
+
+    @staticmethod
+    def _grow(array, capacity):
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    @staticmethod
+    def compile(profile):
+        """Builds the traits, tactics and target weights rows of a profile."""
+        personality = profile.get("personality", {})
+        traits = np.array([personality.get(trait, DEFAULT_TRAIT) for trait in TRAITS], dtype=np.float64)
+
+        matrix = {parse_situation(situation): parse_tactic(tactic)
+                  for situation, tactic in profile.get("tactical_matrix", {}).items()}
+        default = matrix.get(Situation.DEFAULT, FALLBACK_TACTIC)
+        tactics = np.array([matrix.get(situation, default) for situation in Situation], dtype=np.int8)
+
+        # Unless the profile gives explicit weights, closer targets are preferred and
+        # cautious generals also avoid strong enemies and well defended terrain
+        caution = traits[CAUTION]
+        defaults = {"distance": -1.0, "strength": caution, "terrain_defense": -0.1 * caution}
+        explicit = profile.get("target_weights", {})
+        weights = np.array([explicit.get(name, defaults[name]) for name in TARGET_WEIGHTS], dtype=np.float64)
+        return traits, tactics, weights
+
+    def active_mask(self, rows):
+        """Which of the given rows belong to generals aggressive enough to seek battle."""
+        return self.traits[rows, AGGRESSION] >= ENGAGE_AGGRESSION
+
+    def choose_tactics(self, rows, own_strength, enemy_strength, enemy_situations):
+        """
+        Picks the tactic of every general at once: WHEN_OUTNUMBERED if the enemy
+        is much stronger, otherwise the situation given by the enemy composition.
+        """
+        situations = np.where(enemy_strength > own_strength * OUTNUMBERED_RATIO, Situation.WHEN_OUTNUMBERED, enemy_situations)
+        return self.tactics[rows, situations]
+
+
+# Tables shared by all generals
+DECISION_TABLES = DecisionTables()
@@ -1,108 +1,252 @@
-import json
 import os
-import time
-from ..core.log import log
-from ..core.pathfinding import find_path
-from .profiles.profile_manager import load_profile, load_knowledge_base
+import numpy as np
+from ..core.log import get_logger
+from ..core.pathfinding import find_path, search_path, DEFAULT_ITERATION_LIMIT
+from ..core.path_smoothing import simplify_path
+from .profiles.profile_manager import load_profile, load_knowledge_base, with_overrides
+from .decision_tables import DECISION_TABLES, ATTACK_TACTICS, army_situation
+from .target_scoring import acquire_targets
+from ..misc.enums import Tactic, PathStatus
+
+log = get_logger("ai")
+
+# Think interval bounds (seconds of game time between two decisions of a general)
+MIN_THINK_INTERVAL = 0.1
+DEFAULT_THINK_INTERVAL = 0.5
+# How far (in tiles) a retreating army falls back
+RETREAT_DISTANCE = 8
+# A search that runs out of budget is retried with twice the budget, up to this limit
+MAX_PATH_BUDGET = DEFAULT_ITERATION_LIMIT * 8
 
 class GeneralAI:
     """
-    The 'brain' of an army. It loads a personality profile and a knowledge base
-    from JSON files and makes decisions based on them.
+    The 'brain' of an army. It takes a personality profile and a knowledge base
+    from the shared profile registry and makes decisions based on them.
+    Per-general `overrides` are merged into a private copy of the profile.
     """
-    def __init__(self, profile_name: str, army):
+    def __init__(self, profile_name: str, army, overrides=None):
         self.army = army
-        self.profile = load_profile(profile_name)
-        self.knowledge_base = load_knowledge_base("base_knowledge")
-        self.unreachable_targets = {} # key: target_id, value: timestamp
-        self.unreachable_cooldown = 30.0 # seconds
+        self.profile_name = profile_name
+        self.overrides = overrides
+        self.profile = with_overrides(load_profile(profile_name), overrides)
+        self.knowledge_base = load_knowledge_base(self._knowledge_base_name())
+        self.unreachable_targets = {} # key: target_id, value: game time when it was marked
+        self.unreachable_cooldown = 30.0 # seconds of game time
+        self._next_unreachable_expiry = float('inf') # Earliest time an unreachable entry expires
         self.name = self.profile.get("name", "Unnamed General")
         self.target_army = None
+        # Row of the compiled profile in the shared decision tables
+        self.decision_row = DECISION_TABLES.row_for(self.profile, self)
+        self.tactic = Tactic.NONE
         
         # Cooldown for path recalculation to prevent performance issues
-        self.path_recalc_cooldown = 2.0  # seconds
-        self.last_recalc_time = 0
-        
-        log.info(f"General {self.name} (Faction: {self.army.faction.name}) has taken command of an army.")
+        self.path_recalc_cooldown = 2.0  # seconds of game time
+        self.path_budget = DEFAULT_ITERATION_LIMIT # A* iteration limit of the next search for the target
+        self.last_recalc_time = float('-inf')
+
+        # How often the general makes a decision (used by AIScheduler)
+        self.think_interval = self._get_think_interval()
+        # Cost statistics of the decisions, filled in by AIScheduler
+        self.think_count = 0
+        self.total_think_time = 0.0
+        self.last_think_time = 0.0
+        self.max_think_time = 0.0
+
+        log.info("General %s (Faction: %s) has taken command of an army.", self.name, self.army.faction.name)
 
     def update(self, world):
         """
-        The main decision-making loop for the AI general.
-        Called once per game tick.
+        The main decision-making loop for a single AI general.
+        AIScheduler evaluates due generals in batches via decide_batch instead.
         """
-        # Simple logic for now: if aggressive, find the nearest enemy and attack.
-        aggression = self.profile.get("personality", {}).get("aggression", 0.5)
-
-        if aggression < 0.75:
-            return
+        for general, tactic in decide_batch([self], world):
+            general.act(world, tactic)
 
+    def prepare(self, world):
+        """
+        First half of a decision: drops stale state (finished targets, expired
+        unreachable marks). Returns False if the general has nothing to decide
+        because its army is in combat. New targets are then given to the whole
+        batch at once by target_scoring.acquire_targets.
+        """
         # If already in combat, do nothing. The Combat class handles it.
-        if self.army.in_combat:
+        if world.engagements.combat_of(self.army) is not None:
             self.target_army = None # Clear target when combat starts
-            return
+            return False
 
         # Check if the current target is still valid
-        if self.target_army and self.target_army not in world.armies:
-            log.info(f"General {self.name}'s target has been defeated or disbanded. Acquiring new target.")
+        if self.target_army and self.target_army not in world.army_index:
+            log.info("General %s's target has been defeated or disbanded. Acquiring new target.", self.name)
             self.target_army = None
 
-        # Clear expired unreachable targets
-        current_time = time.time()
-        self.unreachable_targets = {
-            target_id: ts 
-            for target_id, ts in self.unreachable_targets.items() 
-            if current_time - ts < self.unreachable_cooldown
-        }
+        # Reached the place where the target was last seen, but it is not there anymore
+        knowledge = world.knowledge.of(self.army.faction)
+        if self.target_army and not knowledge.is_visible(self.target_army.x, self.target_army.y):
+            last_position = knowledge.last_known_position(self.target_army)
+            if last_position and abs(last_position[0] - self.army.x) <= 1 and abs(last_position[1] - self.army.y) <= 1:
+                log.info("General %s lost track of the target. Acquiring new target.", self.name)
+                knowledge.forget(self.target_army)
+                self.target_army = None
 
-        # If no target, find the closest enemy army
-        if self.target_army is None:
-            # This logic could be improved with personality traits, e.g.,
-            # a 'cautious' general might not attack a stronger army.
-            closest_enemy = self._find_closest_enemy(world)
-            if closest_enemy:
-                self.target_army = closest_enemy
-                log.info(f"General {self.name} has acquired a new target: "
-                         f"{self.target_army.faction.name}'s army (ID: {self.target_army.id}).")
-        
-        # If we have a target, recalculate the path periodically.
-        if self.target_army and (current_time - self.last_recalc_time > self.path_recalc_cooldown):
+        # Clear expired unreachable targets (only when one of them has actually expired)
+        current_time = world.time
+        if current_time >= self._next_unreachable_expiry:
+            self._expire_unreachable_targets(current_time)
+
+        return True
+
+    def act(self, world, tactic):
+        """Second half of a decision: carries out the tactic chosen from the decision table."""
+        if tactic != self.tactic:
+            log.debug("General %s switches tactic to %s.", self.name, tactic.name)
+            self.tactic = tactic
+        if tactic == Tactic.RETREAT:
+            self._retreat(world)
+            return
+        if tactic not in ATTACK_TACTICS:
+            return # Holding and skirmishing do not march on the target yet
+
+        # Recalculate the path to the target periodically.
+        current_time = world.time
+        if current_time - self.last_recalc_time > self.path_recalc_cooldown:
             self.last_recalc_time = current_time # Update timer immediately
 
             # Check if the target is on the unreachable list
             if self.target_army.id in self.unreachable_targets:
                 return # Do not attempt to pathfind to a known unreachable target
 
+            # March on the position the faction knows about, over the tiles it has explored
+            knowledge = world.knowledge.of(self.army.faction)
+            goal = knowledge.last_known_position(self.target_army) or (self.target_army.x, self.target_army.y)
             start_pos = (int(self.army.x), int(self.army.y))
-            goal_pos = (int(self.target_army.x), int(self.target_army.y))
+            goal_pos = (int(goal[0]), int(goal[1]))
+
+            query = search_path(world.map_data, start_pos, goal_pos, explored=knowledge.explored,
+                                iteration_limit=self.path_budget)
+            path = query.path
 
-            # For now, AI uses the true world map.
-            # In the future, it will use its 'knowledge_map'.
-            path = find_path(world.map_data, start_pos, goal_pos)
-            
-            if path is not None:
+            if query.status == PathStatus.BUDGET_EXCEEDED and self.path_budget < MAX_PATH_BUDGET:
+                # Not proven unreachable: search again on the next recalculation with a bigger budget
+                self.path_budget = min(self.path_budget * 2, MAX_PATH_BUDGET)
+                log.debug("General %s ran out of pathfinding budget (%s nodes), retrying with %s.",
+                          self.name, query.nodes_expanded, self.path_budget)
+            elif path is not None:
+                self.path_budget = DEFAULT_ITERATION_LIMIT
                 # If the path is empty, it means we are at or next to the target.
                 # The army will handle stopping or engaging in combat.
                 # If the path has content, set it.
                 if path:
-                    log.debug(f"General {self.name} recalculated a path to the target.")
-                self.army.set_path(path)
+                    log.debug("General %s recalculated a path to the target.", self.name)
+                # Store the path compressed to line-of-sight waypoints
+                self.army.set_path(simplify_path(path, world.movement_cost_raster))
             else:
-                # path is None, which means it's truly unreachable
-                log.warning(f"General {self.name} could not find a path to the target. Caching as unreachable.")
-                self.unreachable_targets[self.target_army.id] = time.time()
+                # Truly unreachable, or still too expensive with the largest budget
+                log.warning("General %s could not find a path to the target (%s). Caching as unreachable.",
+                            self.name, query.status.name)
+                self.path_budget = DEFAULT_ITERATION_LIMIT
+                self._mark_unreachable(self.target_army, world.time)
                 self.target_army = None
 
-    def _find_closest_enemy(self, world):
-        """Finds the closest enemy army."""
-        closest_enemy = None
-        min_distance = float('inf')
-        for other_army in world.armies:
-            if other_army.faction != self.army.faction and other_army.id not in self.unreachable_targets:
-                distance = self.army.get_distance_to(other_army)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_enemy = other_army
-        return closest_enemy
+    def _retreat(self, world):
+        """Falls back towards the nearby tile with the least enemy influence."""
+        current_time = world.time
+        if current_time - self.last_recalc_time <= self.path_recalc_cooldown:
+            return
+        self.last_recalc_time = current_time
+        knowledge = world.knowledge.of(self.army.faction)
+        danger = knowledge.last_known_position(self.target_army) if self.target_army else None
+        safe_tile = world.influence.safest_tile(self.army.faction, self.army.x, self.army.y, RETREAT_DISTANCE, away_from=danger)
+        if safe_tile is None:
+            return
+        path = find_path(world.map_data, (int(self.army.x), int(self.army.y)), safe_tile, explored=knowledge.explored)
+        if path:
+            log.info("General %s is retreating to %s.", self.name, safe_tile)
+            self.army.set_path(simplify_path(path, world.movement_cost_raster))
+
+    def reload_profile(self):
+        """Re-binds the general to the current version of its profile (after a hot-reload)."""
+        self.profile = with_overrides(load_profile(self.profile_name), self.overrides)
+        self.knowledge_base = load_knowledge_base(self._knowledge_base_name())
+        self.name = self.profile.get("name", "Unnamed General")
+        self.decision_row = DECISION_TABLES.row_for(self.profile, self)
+        self.think_interval = self._get_think_interval()
+
+    def _knowledge_base_name(self):
+        return os.path.splitext(self.profile.get("knowledge_base_path", "base_knowledge.json"))[0]
+
+    def record_think_time(self, seconds):
+        """Accumulates the cost of one decision."""
+        self.think_count += 1
+        self.total_think_time += seconds
+        self.last_think_time = seconds
+        if seconds > self.max_think_time:
+            self.max_think_time = seconds
+
+    @property
+    def average_think_time(self):
+        return self.total_think_time / self.think_count if self.think_count else 0.0
+
+    def _get_think_interval(self):
+        """
+        Think interval from the profile: an explicit "think_interval" value, or
+        one derived from the personality - flexible generals re-evaluate the
+        situation more often than stubborn ones.
+        """
+        interval = self.profile.get("think_interval")
+        if interval is None:
+            flexibility = self.profile.get("personality", {}).get("strategic_flexibility", 0.5)
+            interval = DEFAULT_THINK_INTERVAL * (1.5 - flexibility)
+        return max(MIN_THINK_INTERVAL, float(interval))
+
+    def _mark_unreachable(self, target_army, timestamp):
+        self.unreachable_targets[target_army.id] = timestamp
+        self._next_unreachable_expiry = min(self._next_unreachable_expiry, timestamp + self.unreachable_cooldown)
+
+    def _expire_unreachable_targets(self, current_time):
+        self.unreachable_targets = {
+            target_id: ts
+            for target_id, ts in self.unreachable_targets.items()
+            if current_time - ts < self.unreachable_cooldown
+        }
+        self._next_unreachable_expiry = min(
+            (ts + self.unreachable_cooldown for ts in self.unreachable_targets.values()), default=float('inf'))
+
+    def set_target(self, target_army):
+        self.target_army = target_army
+        log.info("General %s has acquired a new target: %s's army (ID: %s).",
+                 self.name, target_army.faction.name, target_army.id)
 
     def __repr__(self):
-        return f"GeneralAI(name='{self.name}', army_id={self.army.id})" 
\ No newline at end of file
+        return f"GeneralAI(name='{self.name}', army_id={self.army.id})" 
+
+def decide_batch(generals, world):
+    """
+    Evaluates the decision tables for a batch of generals (usually of one
+    faction) at once. Returns (general, tactic) pairs for the generals that
+    have something to do; their act() is left to the caller so it can spread
+    the expensive part over frames.
+    """
+    if not generals:
+        return []
+    tables = DECISION_TABLES
+    rows = np.fromiter((general.decision_row for general in generals), dtype=np.intp, count=len(generals))
+    active = tables.active_mask(rows)
+    prepared = [i for i, is_active in enumerate(active.tolist()) if is_active and generals[i].prepare(world)]
+    # Generals without a target get one from a single scoring pass per faction
+    idle = [generals[i] for i in prepared if generals[i].target_army is None]
+    if idle:
+        acquire_targets(idle, world)
+    ready = [i for i in prepared if generals[i].target_army is not None]
+    if not ready:
+        return []
+
+    # Balance of forces from the influence map: our strength where we stand
+    # against the enemy strength around the target
+    influence = world.influence
+    own_strength = np.array([influence.strength_at(generals[i].army.faction, generals[i].army.x, generals[i].army.y)
+                             for i in ready])
+    enemy_strength = np.array([influence.threat_at(generals[i].army.faction, generals[i].target_army.x,
+                                                   generals[i].target_army.y) for i in ready])
+    enemy_situations = np.array([army_situation(generals[i].target_army) for i in ready], dtype=np.intp)
+    tactics = tables.choose_tactics(rows[ready], own_strength, enemy_strength, enemy_situations)
+    return [(generals[i], Tactic(tactic)) for i, tactic in zip(ready, tactics.tolist())]
@@ -1,36 +1,194 @@
 import json
 import os
-from ...core.log import log
-
-def load_profile(profile_name: str) -> dict:
-    """Loads a personality and tactical profile from a JSON file."""
-    # Correctly construct the path to the profiles directory
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    profile_path = os.path.join(base_dir, f"{profile_name}.json")
-    
-    log.debug(f"Loading AI profile from: {profile_path}")
-    try:
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        log.error(f"AI profile not found at {profile_path}. AI will be inert.")
-        return {}
-    except json.JSONDecodeError:
-        log.error(f"Failed to decode AI profile at {profile_path}. AI will be inert.")
-        return {}
-
-def load_knowledge_base(knowledge_base_name: str) -> dict:
-    """Loads a knowledge base from a JSON file."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    kb_path = os.path.join(base_dir, f"{knowledge_base_name}.json")
-    
-    log.debug(f"Loading AI knowledge base from: {kb_path}")
-    try:
-        with open(kb_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        log.error(f"Knowledge base not found at {kb_path}.")
-        return {}
-    except json.JSONDecodeError:
-        log.error(f"Failed to decode knowledge base at {kb_path}.")
-        return {} 
\ No newline at end of file
+from types import MappingProxyType
+from ...core.log import get_logger
+from ...misc.enums import Situation, Tactic
+
+log = get_logger("ai")
+
+PROFILES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shared empty profile for missing or invalid files: the AI will be inert
+EMPTY = MappingProxyType({})
+
+
+def freeze(value):
+    """Recursively converts parsed JSON into read-only objects (dicts -> mapping proxies, lists -> tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def with_overrides(base, overrides):
+    """
+    Copy-on-write: returns a new frozen mapping with `overrides` merged into
+    `base` (nested mappings are merged key by key). `base` is not modified and
+    stays shared with the other generals.
+    """
+    if not overrides:
+        return base
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), MappingProxyType):
+            merged[key] = with_overrides(merged[key], value)
+        else:
+            merged[key] = freeze(value)
+    return MappingProxyType(merged)
+
+
+def validate_profile(profile) -> list:
+    """Returns a list of problems found in a personality profile (empty if it is valid)."""
+    errors = []
+    name = profile.get("name")
+    if name is not None and not isinstance(name, str):
+        errors.append("'name' must be a string")
+    personality = profile.get("personality", EMPTY)
+    if not isinstance(personality, MappingProxyType):
+        errors.append("'personality' must be an object")
+    else:
+        for trait, weight in personality.items():
+            if not isinstance(weight, (int, float)) or not 0.0 <= weight <= 1.0:
+                errors.append(f"personality trait '{trait}' must be a number in [0, 1]")
+    tactical_matrix = profile.get("tactical_matrix", EMPTY)
+    if not isinstance(tactical_matrix, MappingProxyType):
+        errors.append("'tactical_matrix' must be an object")
+    else:
+        for situation, tactic in tactical_matrix.items():
+            if situation.upper() not in Situation.__members__:
+                errors.append(f"unknown situation '{situation}'")
+            if not isinstance(tactic, str) or tactic.upper() not in Tactic.__members__:
+                errors.append(f"unknown tactic '{tactic}' for '{situation}'")
+    target_weights = profile.get("target_weights", EMPTY)
+    if not isinstance(target_weights, MappingProxyType):
+        errors.append("'target_weights' must be an object")
+    else:
+        for name, weight in target_weights.items():
+            if name not in ("distance", "strength", "terrain_defense"):
+                errors.append(f"unknown target weight '{name}'")
+            elif not isinstance(weight, (int, float)):
+                errors.append(f"target weight '{name}' must be a number")
+    think_interval = profile.get("think_interval")
+    if think_interval is not None and (not isinstance(think_interval, (int, float)) or think_interval <= 0):
+        errors.append("'think_interval' must be a positive number")
+    return errors
+
+
+class ProfileRegistry:
+    """
+    Loads every JSON file of the profiles directory once and shares the parsed,
+    read-only objects between all generals. Files are re-read only when their
+    modification time changes (see reload_changed), so profiles can be tuned
+    while the simulation is running.
+    """
+    def __init__(self, directory=PROFILES_DIR):
+        self.directory = directory
+        self._data = {} # name -> frozen contents of <name>.json
+        self._mtimes = {} # name -> mtime of the loaded file
+        self._profiles = {} # name -> validated profile (EMPTY if invalid)
+        self._loaded = False
+
+    def load_all(self):
+        """Loads all JSON files of the directory."""
+        self._loaded = True
+        for name, mtime in self._scan().items():
+            self._load(name, mtime)
+
+    def get(self, name):
+        """Returns the frozen contents of <name>.json, or None if there is no such file."""
+        if not self._loaded:
+            self.load_all()
+        return self._data.get(name)
+
+    def profile(self, name):
+        """Returns the shared validated profile. Missing or invalid profiles are EMPTY."""
+        profile = self._profiles.get(name)
+        if profile is not None:
+            return profile
+        data = self.get(name)
+        if data is None:
+            log.error("AI profile '%s' not found in %s. AI will be inert.", name, self.directory)
+            profile = EMPTY
+        else:
+            errors = validate_profile(data)
+            if errors:
+                log.error("AI profile '%s' is invalid (%s). AI will be inert.", name, '; '.join(errors))
+                profile = EMPTY
+            else:
+                profile = data
+        self._profiles[name] = profile
+        return profile
+
+    def knowledge_base(self, name):
+        """Returns the shared knowledge base, or EMPTY if it cannot be loaded."""
+        data = self.get(name)
+        if data is None:
+            log.error("Knowledge base '%s' not found in %s.", name, self.directory)
+            return EMPTY
+        return data
+
+    def reload_changed(self) -> list:
+        """
+        Re-reads files whose modification time changed, picks up new files and
+        forgets deleted ones. Returns the names that changed.
+        """
+        if not self._loaded:
+            self.load_all()
+            return []
+        current = self._scan()
+        changed = []
+        for name, mtime in current.items():
+            if self._mtimes.get(name) != mtime:
+                self._load(name, mtime)
+                changed.append(name)
+        for name in list(self._mtimes):
+            if name not in current:
+                del self._mtimes[name]
+                self._data.pop(name, None)
+                changed.append(name)
+        for name in changed:
+            self._profiles.pop(name, None)
+            log.info("AI profile '%s' reloaded.", name)
+        return changed
+
+    def _scan(self):
+        """Returns name -> mtime of every JSON file in the directory."""
+        result = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return result
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".json"):
+                result[entry.name[:-5]] = entry.stat().st_mtime
+        return result
+
+    def _load(self, name, mtime):
+        path = os.path.join(self.directory, f"{name}.json")
+        log.debug("Loading AI data from: %s", path)
+        self._mtimes[name] = mtime
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._data[name] = freeze(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            log.error("Failed to load AI data from %s.", path)
+            self._data.pop(name, None)
+
+
+_registry = ProfileRegistry()
+
+
+def get_registry() -> ProfileRegistry:
+    """Returns the registry shared by all generals."""
+    return _registry
+
+
+def load_profile(profile_name: str):
+    """Returns the shared, read-only personality and tactical profile."""
+    return _registry.profile(profile_name)
+
+
+def load_knowledge_base(knowledge_base_name: str):
+    """Returns the shared, read-only knowledge base."""
+    return _registry.knowledge_base(knowledge_base_name)
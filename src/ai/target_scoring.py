@@ -0,0 +1,138 @@
+import numpy as np
+from .decision_tables import DECISION_TABLES, W_DISTANCE, W_STRENGTH, W_TERRAIN
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError: # scipy is optional: without it targets are assigned greedily
+    linear_sum_assignment = None
+
+# How many generals may be sent against one enemy army in a batch
+MAX_ATTACKERS_PER_TARGET = 3
+# Candidates taken per general from the spatial index when no known enemy can be targeted
+FALLBACK_CANDIDATES = 4
+# Distances are measured in units of this many tiles when scored
+DISTANCE_SCALE = 10.0
+
+
+def collect_candidates(generals, world):
+    """
+    Enemy armies the generals (of one faction) may target and the positions
+    they are believed to be at: everything the faction has seen.
+    Returns (armies, positions as a (T, 2) array).
+    """
+    known = world.knowledge.of(generals[0].army.faction).last_seen
+    armies = list(known)
+    positions = np.array([(x, y) for x, y, _ in known.values()], dtype=np.float64).reshape(-1, 2)
+    return armies, positions
+
+
+def nearest_candidates(generals, world):
+    """
+    Fallback candidates for generals that cannot target any known enemy (the
+    faction has no intelligence, or every known enemy is unreachable for
+    them): the few nearest reachable enemies of every general, at their
+    current positions. Returns (armies, positions) like collect_candidates.
+    """
+    candidates = {}
+    for general in generals:
+        for _, enemy in world.target_index.nearest_enemies(general.army, k=FALLBACK_CANDIDATES,
+                                                           exclude_ids=general.unreachable_targets):
+            candidates[enemy] = (enemy.x, enemy.y)
+    return list(candidates), np.array(list(candidates.values()), dtype=np.float64).reshape(-1, 2)
+
+
+def score_targets(generals, armies, positions, world):
+    """
+    Scores every (general, candidate) pair in one vectorized pass.
+    Features: distance to the believed position, relative strength
+    (log of our attack x hp over theirs) and the terrain defense bonus at the
+    target; they are weighted by each general's compiled profile weights.
+    Targets the general knows to be unreachable score -inf.
+    """
+    own = np.array([(g.army.x, g.army.y, g.army.attack_power, g.army.total_hp) for g in generals], dtype=np.float64)
+    enemy = np.array([(a.attack_power, a.total_hp) for a in armies], dtype=np.float64)
+
+    distance = np.hypot(own[:, 0:1] - positions[None, :, 0], own[:, 1:2] - positions[None, :, 1]) / DISTANCE_SCALE
+    own_power = np.log1p(own[:, 2] * own[:, 3])
+    enemy_power = np.log1p(enemy[:, 0] * enemy[:, 1])
+    strength = own_power[:, None] - enemy_power[None, :]
+    tile_x = positions[:, 0].astype(np.intp)
+    tile_y = positions[:, 1].astype(np.intp)
+    terrain = world.defense_bonus_raster[tile_y, tile_x]
+
+    weights = DECISION_TABLES.weights[[g.decision_row for g in generals]]
+    scores = (weights[:, W_DISTANCE, None] * distance
+              + weights[:, W_STRENGTH, None] * strength
+              + weights[:, W_TERRAIN, None] * terrain[None, :])
+
+    column_of = {army.id: col for col, army in enumerate(armies)}
+    for row, general in enumerate(generals):
+        blocked = [column_of[army_id] for army_id in general.unreachable_targets if army_id in column_of]
+        if blocked:
+            scores[row, blocked] = -np.inf
+    return scores
+
+
+def assign_targets(scores, capacity=MAX_ATTACKERS_PER_TARGET):
+    """
+    Picks a target column for every row (general) of the score matrix so that
+    no target gets more than `capacity` generals while the total score is
+    maximal (Hungarian method via scipy; a greedy assignment without it).
+    Generals left over once every target is full get their best target anyway.
+    Returns an array of column indices, -1 where no target is possible.
+    """
+    n_generals, n_targets = scores.shape
+    choice = np.full(n_generals, -1, dtype=np.intp)
+    if n_targets == 0:
+        return choice
+    finite = np.isfinite(scores)
+
+    if linear_sum_assignment is not None:
+        # Every target is repeated `capacity` times so it can take several generals
+        cost = -np.where(finite, scores, -1e12)
+        rows, cols = linear_sum_assignment(np.tile(cost, (1, capacity)))
+        choice[rows] = cols % n_targets
+    else:
+        # Generals with the most attractive options choose first, each taking its best free target
+        masked = np.where(finite, scores, -np.inf)
+        preferences = np.argsort(-masked, axis=1, kind='stable')
+        taken = np.zeros(n_targets, dtype=np.intp)
+        for row in np.argsort(-masked.max(axis=1), kind='stable').tolist():
+            for col in preferences[row]:
+                if not finite[row, col]:
+                    break
+                if taken[col] < capacity:
+                    choice[row] = col
+                    taken[col] += 1
+                    break
+
+    # Rows without a slot (more generals than slots) or assigned an impossible target
+    for row in range(n_generals):
+        if choice[row] == -1 or not finite[row, choice[row]]:
+            best = int(np.argmax(np.where(finite[row], scores[row], -np.inf)))
+            choice[row] = best if finite[row, best] else -1
+    return choice
+
+
+def acquire_targets(generals, world):
+    """Gives new targets to generals without one, evaluating each faction as one batch."""
+    by_faction = {}
+    for general in generals:
+        by_faction.setdefault(general.army.faction, []).append(general)
+    for faction_generals in by_faction.values():
+        # Known enemies first; generals left without a possible target fall back to the nearest enemies
+        pending = faction_generals
+        for collect in (collect_candidates, nearest_candidates):
+            armies, positions = collect(pending, world)
+            if not armies:
+                continue
+            scores = score_targets(pending, armies, positions, world)
+            left = []
+            for general, col in zip(pending, assign_targets(scores).tolist()):
+                if col >= 0:
+                    general.set_target(armies[col])
+                else:
+                    left.append(general)
+            pending = left
+            if not pending:
+                break
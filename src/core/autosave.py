@@ -0,0 +1,307 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .log import get_logger
+from .metrics import METRICS
+from .snapshot import (capture_world, capture_state, encode_armies, encode_tiles, faction_index_of, write_snapshot,
+                       build_world, Snapshot, SnapshotData, ARMY_DTYPE, UNIT_DTYPE)
+
+log = get_logger("autosave")
+
+# Game seconds between checkpoints
+DEFAULT_INTERVAL = 30.0
+# Deltas written on top of a base before the chain is compacted into a new base
+DEFAULT_MAX_CHAIN = 10
+
+TILE_DTYPE = np.dtype([('index', '<i8'), ('terrain', 'u1'), ('territory', '<i4'), ('features', 'u1'),
+                       ('movement_cost', '<f8'), ('defense_bonus', '<f8'), ('vision_radius', '<i2')])
+
+_FILE_PATTERN = re.compile(r"^(base|delta)_(\d{6})(?:_(\d{4}))?\.ewcs$")
+
+# Sections of a delta that replace the base's sections as a whole
+_STATE_SECTIONS = ("explored", "last_seen", "combats", "combat_members", "generals", "unreachable",
+                   "influence_deposits")
+# Header fields of a delta that replace the base's fields
+_STATE_FIELDS = ("saved_at", "time", "next_army_id", "world_factions", "known_factions", "territories",
+                 "random_state", "profiles", "overrides", "ai_clock", "combat_clock", "map_seed", "ai_phase",
+                 "combat_phase", "influence_schedule")
+
+
+def capture_delta(world, game=None):
+    """
+    Encodes what changed since the last checkpoint: tiles reported through
+    GameWorld.tile_changed, armies with their `dirty` flag set (moved, fought,
+    re-planned or created), ids of removed armies, plus the small state that
+    changes all the time (clock, fog of war, combats, AI, RNG). Clears the
+    dirty flags. Returns (header, sections); like capture_world, the sections
+    are copies and may be written from another thread.
+    """
+    header, sections = capture_state(world, game)
+    changed = [army for army in world.armies if army.dirty]
+    army_rows, units, paths, type_keys = encode_armies(changed, faction_index_of(world))
+    sections.update(armies=army_rows, units=units, paths=paths,
+                    removed_armies=np.array(world.removed_army_ids, dtype=np.int64))
+
+    indices, terrain, territory, features, extras = encode_tiles(world.map_data, world.dirty_tiles)
+    tiles = np.zeros(len(indices), dtype=TILE_DTYPE)
+    tiles['index'], tiles['terrain'], tiles['territory'], tiles['features'] = indices, terrain, territory, features
+    rasters = (('movement_cost', world.movement_cost_raster), ('defense_bonus', world.defense_bonus_raster),
+               ('vision_radius', world.knowledge.vision_radius))
+    for field, raster in rasters:
+        if raster is not None:
+            tiles[field] = raster.ravel()[indices]
+    sections["tiles"] = tiles
+    header.update(unit_types=type_keys, feature_extras=extras)
+
+    for army in changed:
+        army.dirty = False
+    world.dirty_tiles.clear()
+    world.removed_army_ids.clear()
+    return header, sections
+
+
+def clear_dirty(world):
+    """Marks everything as saved (after a full capture)."""
+    for army in world.armies:
+        army.dirty = False
+    world.dirty_tiles.clear()
+    world.removed_army_ids.clear()
+
+
+# ---- Restoring a chain ----
+
+def _faction_key(entry):
+    return entry["name"], str(entry["color"])
+
+
+def merge_chain(base_path, delta_paths):
+    """
+    Applies the deltas, in order, to the base snapshot. Returns a SnapshotData
+    equivalent to a full snapshot taken at the last delta (build_world and
+    restore_game accept it like a Snapshot).
+    """
+    snapshots = [Snapshot(base_path)] + [Snapshot(path) for path in delta_paths]
+    base, last = snapshots[0], snapshots[-1]
+    header = dict(base.header)
+    for field in _STATE_FIELDS:
+        if field in last.header:
+            header[field] = last.header[field]
+
+    # Faction and unit type indices are local to each file: map them to the last file's factions
+    # (which its state sections refer to) and to one merged list of unit types
+    factions = list(last.header["factions"])
+    faction_slots = {_faction_key(entry): slot for slot, entry in enumerate(factions)}
+    unit_types = []
+    type_slots = {}
+
+    def remap(snapshot):
+        faction_map = []
+        for entry in snapshot.header["factions"]:
+            if _faction_key(entry) not in faction_slots:
+                faction_slots[_faction_key(entry)] = len(factions)
+                factions.append(entry)
+            faction_map.append(faction_slots[_faction_key(entry)])
+        type_map = []
+        for key in snapshot.header["unit_types"]:
+            if key not in type_slots:
+                type_slots[key] = len(unit_types)
+                unit_types.append(key)
+            type_map.append(type_slots[key])
+        return np.array(faction_map, dtype=np.int32), np.array(type_map, dtype=np.uint16)
+
+    armies = {} # id -> (row, units, path); insertion order is the order of world.armies
+    def apply_armies(snapshot):
+        faction_map, type_map = remap(snapshot)
+        rows = np.array(snapshot["armies"])
+        units = np.array(snapshot["units"])
+        paths = np.array(snapshot["paths"])
+        if len(rows):
+            rows['faction'] = faction_map[rows['faction']]
+        if len(units):
+            units['type'] = type_map[units['type']]
+        for row in rows:
+            unit_offset, path_offset = int(row['unit_offset']), int(row['path_offset'])
+            armies[int(row['id'])] = (row, units[unit_offset:unit_offset + int(row['unit_count'])],
+                                      paths[path_offset:path_offset + int(row['path_length'])])
+
+    sections = {name: np.array(base[name]) for name in base.header["sections"]}
+    if len(snapshots) > 1:
+        sections.pop("influence_fields", None) # Stale: rebuilt from the last delta's deposits instead
+    apply_armies(base)
+    extras = dict(base.header["feature_extras"])
+    for delta in snapshots[1:]:
+        for army_id in delta["removed_armies"].tolist():
+            armies.pop(army_id, None)
+        apply_armies(delta)
+
+        tiles = delta["tiles"]
+        indices = tiles['index']
+        for name, field in (("terrain", 'terrain'), ("territory", 'territory'), ("features", 'features'),
+                            ("movement_cost_raster", 'movement_cost'), ("defense_bonus_raster", 'defense_bonus'),
+                            ("vision_radius", 'vision_radius')):
+            if name in sections:
+                sections[name].ravel()[indices] = tiles[field]
+        for index in indices.tolist():
+            extras.pop(str(index), None)
+        extras.update(delta.header["feature_extras"])
+        for name in _STATE_SECTIONS:
+            if name in delta.header["sections"]:
+                sections[name] = np.array(delta[name])
+
+    records = list(armies.values())
+    rows = np.array([row for row, _, _ in records], dtype=ARMY_DTYPE)
+    unit_counts = [len(units) for _, units, _ in records]
+    path_lengths = [len(path) for _, _, path in records]
+    if records:
+        rows['unit_offset'] = np.concatenate(([0], np.cumsum(unit_counts)[:-1]))
+        rows['path_offset'] = np.concatenate(([0], np.cumsum(path_lengths)[:-1]))
+    sections["armies"] = rows
+    sections["units"] = np.concatenate([units for _, units, _ in records]) if records else np.zeros(0, UNIT_DTYPE)
+    sections["paths"] = np.concatenate([path for _, _, path in records]).reshape(-1, 2) if records \
+        else np.zeros((0, 2))
+    header.update(factions=factions, unit_types=unit_types, feature_extras=extras)
+    return SnapshotData(header, sections)
+
+
+def latest_chain(directory):
+    """(base path, [delta paths]) of the newest generation in an autosave directory, or None."""
+    generations = {}
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        match = _FILE_PATTERN.match(name)
+        if match is None:
+            continue
+        kind, generation, sequence = match.group(1), int(match.group(2)), match.group(3)
+        entry = generations.setdefault(generation, [None, []])
+        if kind == "base":
+            entry[0] = os.path.join(directory, name)
+        else:
+            entry[1].append((int(sequence), os.path.join(directory, name)))
+    complete = [generation for generation, (base, _) in generations.items() if base is not None]
+    if not complete:
+        return None
+    base, deltas = generations[max(complete)]
+    return base, [path for _, path in sorted(deltas)]
+
+
+def load_autosave(directory):
+    """Restores the newest autosave chain of a directory. Returns (world, snapshot) like load_world."""
+    chain = latest_chain(directory)
+    if chain is None:
+        raise FileNotFoundError(f"No autosave in {directory}")
+    return build_world(merge_chain(*chain))
+
+
+# ---- Autosave ----
+
+class Autosave:
+    """
+    Periodic autosave: the first checkpoint writes a full base snapshot, every
+    following one a delta with only what changed since the previous
+    checkpoint. After `max_chain` deltas the chain is compacted (base + deltas
+    merged into the next generation's base and the old files deleted).
+
+    On the simulation thread a checkpoint only encodes the changes into fresh
+    arrays (a copy of the changed state, so later frames never touch what is
+    being written); writing and compaction run on a background thread.
+    """
+    def __init__(self, directory, interval=DEFAULT_INTERVAL, max_chain=DEFAULT_MAX_CHAIN, enabled=True):
+        self.directory = directory
+        self.interval = interval
+        self.max_chain = max_chain
+        self.enabled = enabled
+        self.generation = None # Generation of the current chain; None until its base is written
+        self.chain_length = 0 # Deltas in the current chain
+        self.last_checkpoint = None # Game time of the last checkpoint
+        self.last_capture_ms = 0.0
+        self._executor = None
+
+    def update(self, world, game=None):
+        """Writes a checkpoint when `interval` game seconds have passed since the previous one."""
+        if not self.enabled:
+            return
+        if self.last_checkpoint is None:
+            self.last_checkpoint = world.time
+        elif world.time - self.last_checkpoint >= self.interval:
+            self.checkpoint(world, game)
+
+    def checkpoint(self, world, game=None):
+        """Captures a base or delta now and hands it to the writer thread."""
+        start = time.perf_counter()
+        if self.generation is None:
+            self.generation = self._next_generation()
+            self.chain_length = 0
+            header, sections = capture_world(world, game)
+            clear_dirty(world)
+            path = self._path(self.generation)
+            self._submit(self._write_base, path, header, sections, self.generation)
+        else:
+            header, sections = capture_delta(world, game)
+            self.chain_length += 1
+            path = self._path(self.generation, self.chain_length)
+            self._submit(write_snapshot, path, header, sections)
+            if self.chain_length >= self.max_chain:
+                self._submit(self._compact, self.generation)
+                self.generation += 1
+                self.chain_length = 0
+        self.last_checkpoint = world.time
+        self.last_capture_ms = (time.perf_counter() - start) * 1000.0
+        METRICS.observe("autosave.capture_ms", self.last_capture_ms)
+        log.debug("Autosave checkpoint %s captured in %.2f ms.", path, self.last_capture_ms)
+
+    def reset(self):
+        """Starts a new chain with a full base at the next checkpoint (e.g. after loading another world)."""
+        self.generation = None
+        self.chain_length = 0
+        self.last_checkpoint = None
+
+    def flush(self):
+        """Waits until every submitted checkpoint is on disk."""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # ---- Writer thread ----
+
+    def _submit(self, func, *args):
+        if self._executor is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._executor.submit(func, *args).add_done_callback(self._report_error)
+
+    @staticmethod
+    def _report_error(future):
+        if future.exception() is not None:
+            log.error("Autosave failed: %s", future.exception())
+
+    def _write_base(self, path, header, sections, generation):
+        write_snapshot(path, dict(header, generation=generation), sections)
+        self._remove_generations_before(generation)
+
+    def _compact(self, generation):
+        """Merges a generation's base and deltas into the next generation's base."""
+        start = time.perf_counter()
+        chain = (self._path(generation), [self._path(generation, sequence) for sequence in range(1, self.max_chain + 1)])
+        merged = merge_chain(*chain)
+        self._write_base(self._path(generation + 1), merged.header, merged.sections, generation + 1)
+        log.info("Autosave chain %s compacted in %.1f ms.", generation, (time.perf_counter() - start) * 1000.0)
+
+    def _remove_generations_before(self, generation):
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match is not None and int(match.group(2)) < generation:
+                os.remove(os.path.join(self.directory, name))
+
+    def _next_generation(self):
+        generations = [int(match.group(2)) for match in map(_FILE_PATTERN.match, os.listdir(self.directory))
+                       if match is not None] if os.path.isdir(self.directory) else []
+        return max(generations, default=-1) + 1
+
+    def _path(self, generation, sequence=None):
+        name = f"base_{generation:06d}.ewcs" if sequence is None else f"delta_{generation:06d}_{sequence:04d}.ewcs"
+        return os.path.join(self.directory, name)
@@ -0,0 +1,59 @@
+from .combat import Combat
+from .log import log
+from ..misc.enums import Stance, CombatType
+
+
+def handle_collisions(world, combat_scheduler):
+    """
+    Detects collisions between armies of the world and initiates combat
+    (registered with `combat_scheduler`) or joins an ongoing one.
+    """
+    engagements = world.engagements
+    # Only armies in the same or neighbouring grid cells can collide
+    for army1, army2 in world.army_index.candidate_pairs():
+        if army1.faction != army2.faction:
+            # Check if they are already fighting each other
+            if engagements.combat_between(army1, army2) is not None:
+                continue
+
+            if army1.get_distance_to(army2) < army1.collision_radius + army2.collision_radius:
+                combat1 = engagements.combat_of(army1)
+                combat2 = engagements.combat_of(army2)
+
+                if combat1 is not None and combat2 is not None:
+                    continue # Both are busy in separate battles
+                if combat1 is not None or combat2 is not None:
+                    join_combat(world, combat1 or combat2, army2 if combat1 else army1, army1 if combat1 else army2)
+                    continue
+
+                # Determine combat type based on stances
+                if army1.stance == Stance.MOVING and army2.stance == Stance.MOVING:
+                    combat_type = CombatType.MEETING_ENGAGEMENT
+                    log.info("Collision: A meeting engagement between %s and %s!", army1.faction.name, army2.faction.name)
+                    defender, attacker = None, None
+                else:
+                    combat_type = CombatType.POSITIONAL_ASSAULT
+                    # Determine who is the attacker and who is the defender
+                    if army1.stance == Stance.IDLE and army2.stance == Stance.MOVING:
+                        defender, attacker = army1, army2
+                    elif army2.stance == Stance.IDLE and army1.stance == Stance.MOVING:
+                        defender, attacker = army2, army1
+                    else: # Default case (e.g., both IDLE), treat army1 as defender for consistency
+                        defender, attacker = army1, army2
+                    log.info("Collision: %s is assaulting the position of %s!", attacker.faction.name, defender.faction.name)
+
+                army1.in_combat = True
+                army2.in_combat = True
+                army1.set_target(None) # Stop movement
+                army2.set_target(None)
+                new_combat = Combat(army1, army2, world, combat_type)
+                engagements.add(new_combat)
+                combat_scheduler.add(new_combat)
+
+
+def join_combat(world, combat, army, enemy):
+    """Adds an army to an ongoing combat on the side opposite to the enemy it collided with."""
+    enemy_side = 0 if enemy in combat.sides[0] else 1
+    log.info("Collision: %s joins the battle against %s!", army.faction.name, enemy.faction.name)
+    army.set_target(None) # Stop movement
+    world.engagements.join(combat, army, 1 - enemy_side)
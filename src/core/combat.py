@@ -1,45 +1,105 @@
-import logging
 from ..misc.enums import Stance, CombatType
 from ..game_objects.army import Army
+from ..game_objects.unit import get_unit_type_record
+from .log import get_logger
 import random
 
-# Настройка логгера для этого модуля
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-# Предотвращаем передачу сообщений в корневой логгер, чтобы избежать двойного вывода
-logger.propagate = False
-
-# Если у логгера нет обработчиков, добавляем новый
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - [COMBAT] - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+# Логгер подсистемы боя (уровень настраивается через EWC_LOG_LEVELS, например "combat=WARNING")
+logger = get_logger("combat")
 
 COUNTER_BONUS = 1.5 # Бонус к атаке для контр-юнита
 
 class Combat:
     """
-    Управляет состоянием и логикой одного конкретного сражения между двумя армиями.
+    Управляет состоянием и логикой одного конкретного сражения между двумя сторонами.
+    Бой начинается между двумя армиями (`army1` и `army2` — ведущие армии сторон),
+    но позже к любой из сторон могут присоединиться другие армии (`join`).
     """
     def __init__(self, army1, army2, world, combat_type):
         self.army1 = army1
         self.army2 = army2
+        self.sides = ([army1], [army2])
         self.world = world
         self.combat_type = combat_type
         self.round_number = 0
         self.army1.in_combat = True
         self.army2.in_combat = True
         
-        if self.combat_type == CombatType.MEETING_ENGAGEMENT:
-            logger.info(f"Начался встречный бой между {self.army1.faction.name} и {self.army2.faction.name}!")
-        elif self.combat_type == CombatType.POSITIONAL_ASSAULT:
-            # Определяем, кто защитник, для красивого лога
-            if army1.stance == Stance.IDLE:
-                defender, attacker = army1, army2
-            else:
-                defender, attacker = army2, army1
-            logger.info(f"{attacker.faction.name} атакует позиции {defender.faction.name}!")
+        world.events.combat_started(world.time, self)
+
+        # Таблица урона (тип атакующего, тип защищающегося) -> урон, общая для всех раундов
+        self._damage_table = {}
+        self._damage_table_key = None
+        self._build_damage_table()
+
+    @classmethod
+    def restore(cls, sides, world, combat_type, round_number):
+        """
+        Воссоздаёт идущий бой (например, из снимка мира) без события начала боя.
+        `sides` — два списка армий, ведущая армия стороны первая.
+        """
+        combat = cls.__new__(cls)
+        combat.army1 = sides[0][0]
+        combat.army2 = sides[1][0]
+        combat.sides = (list(sides[0]), list(sides[1]))
+        combat.world = world
+        combat.combat_type = combat_type
+        combat.round_number = round_number
+        for army in combat.armies:
+            army.in_combat = True
+        combat._damage_table = {}
+        combat._damage_table_key = None
+        combat._build_damage_table()
+        return combat
+
+    def defender_and_attacker(self):
+        """Для атаки на позицию: защитник — ведущая армия, стоявшая на месте."""
+        if self.army1.stance == Stance.IDLE:
+            return self.army1, self.army2
+        return self.army2, self.army1
+
+    @property
+    def armies(self):
+        """Все армии-участники боя (обеих сторон)."""
+        return self.sides[0] + self.sides[1]
+
+    def join(self, army, side_index):
+        """Присоединяет армию к стороне боя (0 — сторона `army1`, 1 — сторона `army2`)."""
+        side = self.sides[side_index]
+        if army in side:
+            return
+        side.append(army)
+        army.in_combat = True
+        logger.info("Армия %s вступает в бой на стороне %s!", army.faction.name, side[0].faction.name)
+
+    def leave(self, army):
+        """
+        Убирает армию из боя (например, уничтоженную посреди боя). Если это была
+        ведущая армия стороны, ведущей становится следующая армия этой стороны.
+        """
+        side_index = self._get_side_index(army)
+        side = self.sides[side_index]
+        if army not in side:
+            return
+        side.remove(army)
+        if side and side_index == 0:
+            self.army1 = side[0]
+        elif side:
+            self.army2 = side[0]
+
+    def _get_side_units(self, side_index):
+        """Возвращает список живых юнитов стороны (без копирования, если армия одна)."""
+        side = self.sides[side_index]
+        if len(side) == 1:
+            return side[0].units
+        return [unit for army in side for unit in army.units]
+
+    def _get_side_owners(self, side_index):
+        """Возвращает армии-владельцы юнитов стороны в том же порядке, что и `_get_side_units`."""
+        side = self.sides[side_index]
+        if len(side) == 1:
+            return None # Все юниты принадлежат единственной армии стороны
+        return [army for army in side for _ in army.units]
 
     def tick(self):
         """
@@ -48,93 +108,156 @@ class Combat:
         """
         self.round_number += 1
 
-        if not self.army1.units or not self.army2.units:
+        side1_units = self._get_side_units(0)
+        side2_units = self._get_side_units(1)
+        if not side1_units or not side2_units:
             return self._check_for_winner()
 
         # 1. Запомнить состояние до боя
-        army1_initial_count = len(self.army1.units)
-        army2_initial_count = len(self.army2.units)
+        army1_initial_count = len(side1_units)
+        army2_initial_count = len(side2_units)
+
+        # Таблица урона пересчитывается только при смене стойки, клетки или состава
+        self._refresh_damage_table()
         
         # 2. Тактический бой: юниты сражаются друг с другом
-        # Для простоты, каждый юнит из каждой армии атакует случайного врага
+        # Для простоты, каждый юнит из каждой стороны атакует случайного врага
         # В будущем это можно усложнить (линии фронта, цели)
         total_damage_to_army1 = 0
         total_damage_to_army2 = 0
 
-        for unit1 in self.army1.units:
-            if not self.army2.units: break
-            target_unit = random.choice(self.army2.units)
-            damage = self._resolve_unit_attack(unit1, target_unit, self.army2)
-            target_unit.hp -= damage
+        # Урон наносится через армию-владельца, чтобы её суммарное здоровье оставалось актуальным
+        side1_owners = self._get_side_owners(0)
+        side2_owners = self._get_side_owners(1)
+        side1_count = len(side1_units)
+        side2_count = len(side2_units)
+
+        for unit1 in side1_units:
+            index = random.randrange(side2_count)
+            target_unit = side2_units[index]
+            damage = self._resolve_unit_attack(unit1, target_unit)
+            (side2_owners[index] if side2_owners else self.sides[1][0]).damage_unit(target_unit, damage)
             total_damage_to_army2 += damage
         
-        for unit2 in self.army2.units:
-            if not self.army1.units: break
-            target_unit = random.choice(self.army1.units)
-            damage = self._resolve_unit_attack(unit2, target_unit, self.army1)
-            target_unit.hp -= damage
+        for unit2 in side2_units:
+            index = random.randrange(side1_count)
+            target_unit = side1_units[index]
+            damage = self._resolve_unit_attack(unit2, target_unit)
+            (side1_owners[index] if side1_owners else self.sides[0][0]).damage_unit(target_unit, damage)
             total_damage_to_army1 += damage
 
         # 3. Удаление "убитых" юнитов
-        army1_lost_units = self._cleanup_units(self.army1)
-        army2_lost_units = self._cleanup_units(self.army2)
+        army1_lost_units = [unit for army in self.sides[0] for unit in self._cleanup_units(army)]
+        army2_lost_units = [unit for army in self.sides[1] for unit in self._cleanup_units(army)]
         
-        # 4. Формирование сжатого лога
-        log_msg = (
-            f"РАУНД {self.round_number}: "
-            f"{self.army1.faction.name} ({army1_initial_count}) vs {self.army2.faction.name} ({army2_initial_count}) | "
-            f"Урон: {total_damage_to_army1}/{total_damage_to_army2} | "
-            f"Потери: {len(army1_lost_units)}/{len(army2_lost_units)}"
-        )
-        
-        logger.info(log_msg)
+        # 4. Событие раунда в структурный журнал (текстовый лог — его представление)
+        self.world.events.round_resolved(
+            self.world.time, self,
+            (army1_initial_count, army2_initial_count),
+            (total_damage_to_army1, total_damage_to_army2),
+            (len(army1_lost_units), len(army2_lost_units)))
 
         return self._check_for_winner()
 
-    def _resolve_unit_attack(self, attacker_unit, defender_unit, defender_army):
-        """Рассчитывает урон от одного юнита другому, учитывая все бонусы."""
-        
-        attack_power = attacker_unit.attack
-        defense_power = defender_unit.defense
+    def _resolve_unit_attack(self, attacker_unit, defender_unit):
+        """Возвращает урон от одного юнита другому из таблицы урона этого боя."""
+        key = (attacker_unit.unit_type, defender_unit.unit_type)
+        damage = self._damage_table.get(key)
+        if damage is None:
+            # Тип юнита, которого не было при построении таблицы (например, подкрепление)
+            damage = self._damage_table[key] = self._compute_damage(*key)
+        return damage
+
+    def _get_defending_army(self):
+        """Возвращает обороняющуюся армию (в стойке IDLE) для позиционного боя или None."""
+        if self.combat_type != CombatType.POSITIONAL_ASSAULT:
+            return None
+        if self.army1.stance == Stance.IDLE:
+            return self.army1
+        if self.army2.stance == Stance.IDLE:
+            return self.army2
+        return None
+
+    def _get_side_index(self, army):
+        """Возвращает индекс стороны, на которой сражается армия."""
+        return 0 if army in self.sides[0] else 1
+
+    def _get_damage_table_key(self):
+        """
+        Возвращает ключ, от которого зависит таблица урона: тип боя, обороняющаяся
+        армия, её клетка и, если ландшафт даёт бонус к защите, число юнитов её стороны
+        (бонус делится между ними). Пока ключ не меняется, таблица остаётся верной.
+        """
+        defending_army = self._get_defending_army()
+        if defending_army is None:
+            return (self.combat_type, None)
+        tile_x, tile_y = int(defending_army.x), int(defending_army.y)
+        combat_tile = self.world.map_data[tile_y][tile_x]
+        unit_count = len(self._get_side_units(self._get_side_index(defending_army))) if combat_tile.get_defense_bonus() else None
+        return (self.combat_type, defending_army.id, (tile_x, tile_y), unit_count)
+
+    def _refresh_damage_table(self):
+        """Перестраивает таблицу урона, только если изменился её ключ."""
+        key = self._get_damage_table_key()
+        if key != self._damage_table_key:
+            self._build_damage_table(key)
+
+    def _build_damage_table(self, key=None):
+        """
+        Предрасчитывает урон для всех пар (тип атакующего x тип защищающегося),
+        присутствующих в бою, с учётом контр-бонусов, ландшафта и типа боя.
+        """
+        self._damage_table_key = key if key is not None else self._get_damage_table_key()
+        self._damage_table = {}
+
+        # Бонусы ландшафта действуют только в позиционном бою
+        self._defense_share = 0
+        self._unit_modifiers = {}
+        defending_army = self._get_defending_army()
+        if defending_army:
+            tile_x, tile_y = int(defending_army.x), int(defending_army.y)
+            combat_tile = self.world.map_data[tile_y][tile_x]
+            terrain_defense_bonus = combat_tile.get_defense_bonus()
+            defending_units = self._get_side_units(self._get_side_index(defending_army))
+            self._defense_share = terrain_defense_bonus / len(defending_units) if defending_units else 0
+            self._unit_modifiers = combat_tile.get_unit_modifiers()
+
+        unit_types = {unit.unit_type for army in self.armies for unit in army.units}
+        for attacker_type in unit_types:
+            for defender_type in unit_types:
+                self._damage_table[(attacker_type, defender_type)] = self._compute_damage(attacker_type, defender_type)
+
+    def _compute_damage(self, attacker_type, defender_type):
+        """Рассчитывает урон от юнита одного типа юниту другого типа, учитывая все бонусы."""
+        attacker_record = get_unit_type_record(attacker_type)
+        attack_power = attacker_record.attack
+        defense_power = get_unit_type_record(defender_type).defense
 
         # 1. Бонус контр-юнита
-        if defender_unit.unit_type in attacker_unit.counters:
+        if defender_type in attacker_record.counters:
             attack_power *= COUNTER_BONUS
 
         # 2. Бонусы и штрафы от ландшафта (только для позиционных боев)
-        if self.combat_type == CombatType.POSITIONAL_ASSAULT:
-            # Определяем, кто защищается
-            defending_army_instance = None
-            if self.army1.stance == Stance.IDLE: defending_army_instance = self.army1
-            elif self.army2.stance == Stance.IDLE: defending_army_instance = self.army2
-            
-            if defending_army_instance:
-                tile_x, tile_y = int(defending_army_instance.x), int(defending_army_instance.y)
-                combat_tile = self.world.map_data[tile_y][tile_x]
-                
-                # a) Общий бонус защиты от ландшафта
-                terrain_defense_bonus = combat_tile.get_defense_bonus()
-                defense_share = terrain_defense_bonus / len(defending_army_instance.units) if defending_army_instance.units else 0
-                defense_power += defense_share
-
-                # b) Специфичные модификаторы для юнитов
-                unit_modifiers = combat_tile.get_unit_modifiers()
-                
-                # Модификатор для атакующего
-                if attacker_unit.unit_type in unit_modifiers:
-                    mods = unit_modifiers[attacker_unit.unit_type]
-                    attack_power += mods.get("attack_bonus", 0)
-                    # Можно добавить и атакующему бонус к защите, если он, например, в лесу
-                    defense_power += mods.get("defense_bonus", 0)
-                
-                # Модификатор для защищающегося
-                if defender_unit.unit_type in unit_modifiers:
-                    mods = unit_modifiers[defender_unit.unit_type]
-                    # У защищающегося свой бонус к атаке (например, контратака)
-                    attack_power += mods.get("attack_bonus", 0) 
-                    defense_power += mods.get("defense_bonus", 0)
-
-                # 3. Итоговый урон по процентной формуле.
+        if self._unit_modifiers or self._defense_share:
+            # a) Общий бонус защиты от ландшафта
+            defense_power += self._defense_share
+
+            # b) Специфичные модификаторы для юнитов
+            # Модификатор для атакующего
+            if attacker_type in self._unit_modifiers:
+                mods = self._unit_modifiers[attacker_type]
+                attack_power += mods.get("attack_bonus", 0)
+                # Можно добавить и атакующему бонус к защите, если он, например, в лесу
+                defense_power += mods.get("defense_bonus", 0)
+
+            # Модификатор для защищающегося
+            if defender_type in self._unit_modifiers:
+                mods = self._unit_modifiers[defender_type]
+                # У защищающегося свой бонус к атаке (например, контратака)
+                attack_power += mods.get("attack_bonus", 0)
+                defense_power += mods.get("defense_bonus", 0)
+
+        # 3. Итоговый урон по процентной формуле.
         # Решает проблему "бессмертия" юнитов с высокой защитой.
         if attack_power + defense_power > 0:
             damage = attack_power * (attack_power / (attack_power + defense_power))
@@ -145,30 +268,30 @@ class Combat:
         # Если юнит вообще атаковал, он должен нанести хотя бы 1 ед. урона.
         if attack_power > 0 and damage < 1:
             damage = 1
-            
+
         return int(round(damage))
 
 
     def _cleanup_units(self, army):
         """Удаляет юнитов с hp <= 0 и возвращает список уничтоженных."""
-        dead_units = [unit for unit in army.units if unit.hp <= 0]
-        army.units = [unit for unit in army.units if unit.hp > 0]
-        return dead_units
+        return army.remove_dead_units()
 
 
     def _check_for_winner(self):
         """Checks if the combat is over and returns the status, winner, and loser."""
-        army1_alive = bool(self.army1.units)
-        army2_alive = bool(self.army2.units)
+        army1_alive = any(army.units for army in self.sides[0])
+        army2_alive = any(army.units for army in self.sides[1])
 
         if army1_alive and not army2_alive:
-            logger.info(f"Армия {self.army1.faction.name} победила, уничтожив врага. Осталось юнитов: {len(self.army1.units)}.")
-            return 'finished', self.army1, self.army2
+            winner = next(army for army in self.sides[0] if army.units)
+            self.world.events.combat_finished(self.world.time, self, winner, self.army2, len(self._get_side_units(0)))
+            return 'finished', winner, self.army2
         elif not army1_alive and army2_alive:
-            logger.info(f"Армия {self.army2.faction.name} победила, уничтожив врага. Осталось юнитов: {len(self.army2.units)}.")
-            return 'finished', self.army2, self.army1
+            winner = next(army for army in self.sides[1] if army.units)
+            self.world.events.combat_finished(self.world.time, self, winner, self.army1, len(self._get_side_units(1)))
+            return 'finished', winner, self.army1
         elif not army1_alive and not army2_alive:
-            logger.info("Обе армии были уничтожены в бою!")
+            self.world.events.combat_finished(self.world.time, self, None, None, 0)
             return 'finished', None, None
         else:
             # If both armies are still alive, the combat is ongoing.
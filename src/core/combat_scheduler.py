@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import time
+
+# Шаг "золотого сечения" для равномерного разнесения фаз боёв по времени
+_PHASE_STEP = 0.6180339887498949
+
+
+class CombatScheduler:
+    """
+    Планировщик тиков боя. Каждый бой тикает по своему расписанию (своя фаза
+    внутри периода `tick_rate`), поэтому одновременно начавшиеся бои не
+    обрабатываются в одном кадре. Поддерживает бюджет времени на кадр:
+    не успевшие бои переносятся на следующий кадр и обрабатываются первыми.
+    Раунды проводятся по одному в основном потоке: бои тянут случайные числа
+    из общего генератора `random`, и порядок раундов определяет исход
+    (от этого зависят повторы сессий и снимки).
+    """
+    def __init__(self, tick_rate=1.0, frame_budget_ms=None):
+        """
+        :param tick_rate: Период между раундами одного боя (в секундах).
+        :param frame_budget_ms: Бюджет на обработку боёв за кадр (мс). None — без ограничения.
+        """
+        self.tick_rate = tick_rate
+        self.frame_budget_ms = frame_budget_ms
+        self.clock = 0.0  # Внутреннее время планировщика (учитывает паузу)
+
+        self._queue = []  # Куча (время_следующего_тика, порядковый_номер, бой)
+        self._due_times = {}  # бой -> время его следующего тика
+        self._counter = itertools.count()
+        self._phase_index = 0
+
+        # Статистика последнего кадра
+        self.last_frame_ticks = 0
+        self.last_frame_time_ms = 0.0
+        self.last_frame_deferred = 0
+        self.last_frame_cutoff = None  # Номер проверки бюджета, прервавшей последний кадр (None — не прерывался)
+
+    def __len__(self):
+        return len(self._due_times)
+
+    def __iter__(self):
+        return iter(list(self._due_times))
+
+    def __contains__(self, combat):
+        return combat in self._due_times
+
+    def add(self, combat, due_time=None):
+        """
+        Регистрирует бой. Его первый раунд смещается по фазе относительно остальных боёв.
+        `due_time` задаёт время следующего раунда явно (восстановление из снимка).
+        """
+        if combat in self._due_times:
+            return
+        if due_time is None:
+            phase = (self._phase_index * _PHASE_STEP) % 1.0
+            self._phase_index += 1
+            due_time = self.clock + self.tick_rate * (1.0 - phase)
+        self._due_times[combat] = due_time
+        heapq.heappush(self._queue, (due_time, next(self._counter), combat))
+
+    def remove(self, combat):
+        """Снимает бой с расписания. Запись в куче удаляется лениво."""
+        self._due_times.pop(combat, None)
+
+    def due_time(self, combat):
+        """Время следующего раунда боя или None, если бой не в расписании."""
+        return self._due_times.get(combat)
+
+    def update(self, delta_time, cutoff=None):
+        """
+        Продвигает время и проводит раунды у тех боёв, чей тик наступил.
+        Возвращает сыгранные раунды в виде кортежей (бой, статус, победитель, проигравший),
+        где статус, как у `Combat.tick`: 'ongoing' или 'finished'.
+        Завершившиеся бои автоматически снимаются с расписания.
+
+        :param cutoff: Воспроизведение записанного кадра: кадр прерывается на проверке
+            бюджета номер `cutoff` (см. last_frame_cutoff), а не по часам.
+        """
+        self.clock += delta_time
+        frame_start = time.perf_counter()
+        budget = self.frame_budget_ms / 1000.0 if self.frame_budget_ms is not None else None
+
+        rounds = []
+        ticks = 0
+        checks = 0
+        self.last_frame_cutoff = None
+        while self._queue and self._queue[0][0] <= self.clock:
+            checks += 1
+            if cutoff is not None:
+                exhausted = checks >= cutoff
+            else:
+                exhausted = budget is not None and ticks > 0 and time.perf_counter() - frame_start >= budget
+            if exhausted:
+                self.last_frame_cutoff = checks
+                break  # Остальные бои переносятся на следующий кадр
+
+            entry = self._pop_due()
+            if entry is None:
+                continue
+            due_time, combat = entry
+            status, winner, loser = combat.tick()
+            ticks += 1
+            rounds.append((combat, status, winner, loser))
+            if status == 'finished':
+                self._due_times.pop(combat, None)
+            else:
+                self._reschedule(combat, due_time)
+
+        self.last_frame_ticks = ticks
+        self.last_frame_time_ms = (time.perf_counter() - frame_start) * 1000.0
+        self.last_frame_deferred = sum(1 for due_time in self._due_times.values() if due_time <= self.clock)
+        return rounds
+
+    def _pop_due(self):
+        """Извлекает актуальный бой, чьё время тика наступило, как (время, бой), или None."""
+        while self._queue and self._queue[0][0] <= self.clock:
+            due_time, _, combat = heapq.heappop(self._queue)
+            # Пропускаем устаревшие записи (бой снят или перепланирован)
+            if self._due_times.get(combat) == due_time:
+                return due_time, combat
+        return None
+
+    def _reschedule(self, combat, due_time):
+        """Планирует следующий раунд боя, сохраняя его фазу."""
+        next_due = due_time + self.tick_rate
+        if next_due <= self.clock:
+            # Бой отстал больше чем на период (перегрузка) — не догоняем пропущенные раунды
+            next_due = self.clock + self.tick_rate
+        self._due_times[combat] = next_due
+        heapq.heappush(self._queue, (next_due, next(self._counter), combat))
+
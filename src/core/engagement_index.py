@@ -0,0 +1,67 @@
+class EngagementIndex:
+    """
+    Индекс активных боёв: отвечает на вопросы "в каком бою армия?" и
+    "сражаются ли эти две армии?" за O(1), без обхода списка боёв.
+    Поддерживает бои с несколькими армиями на каждой стороне.
+    """
+    def __init__(self):
+        self._combats = {}  # бой -> None (словарь как упорядоченное множество, O(1) удаление)
+        self._by_army = {}  # army.id -> бой
+        self._by_pair = {}  # frozenset({id1, id2}) противников -> бой
+
+    def __len__(self):
+        return len(self._combats)
+
+    def __iter__(self):
+        return iter(list(self._combats))
+
+    def __contains__(self, combat):
+        return combat in self._combats
+
+    def add(self, combat):
+        """Регистрирует новый бой и всех его участников."""
+        self._combats[combat] = None
+        for side_index, side in enumerate(combat.sides):
+            for army in side:
+                self._register_army(combat, army, side_index)
+
+    def join(self, combat, army, side_index):
+        """Добавляет армию в уже идущий бой на указанную сторону."""
+        combat.join(army, side_index)
+        self._register_army(combat, army, side_index)
+
+    def leave(self, combat, army):
+        """Убирает армию из идущего боя (например, уничтоженную), бой продолжается без неё."""
+        side_index = 0 if army in combat.sides[0] else 1
+        enemies = combat.sides[1 - side_index]
+        combat.leave(army)
+        if self._by_army.get(army.id) is combat:
+            del self._by_army[army.id]
+        for enemy in enemies:
+            self._by_pair.pop(frozenset((army.id, enemy.id)), None)
+
+    def remove(self, combat):
+        """Удаляет завершившийся бой. Стоимость зависит только от числа его участников."""
+        if combat not in self._combats:
+            return
+        del self._combats[combat]
+        side1, side2 = combat.sides
+        for army in side1 + side2:
+            if self._by_army.get(army.id) is combat:
+                del self._by_army[army.id]
+        for army1 in side1:
+            for army2 in side2:
+                self._by_pair.pop(frozenset((army1.id, army2.id)), None)
+
+    def combat_of(self, army):
+        """Возвращает бой, в котором участвует армия, или None."""
+        return self._by_army.get(army.id)
+
+    def combat_between(self, army1, army2):
+        """Возвращает бой, в котором эти две армии сражаются друг против друга, или None."""
+        return self._by_pair.get(frozenset((army1.id, army2.id)))
+
+    def _register_army(self, combat, army, side_index):
+        self._by_army[army.id] = combat
+        for enemy in combat.sides[1 - side_index]:
+            self._by_pair[frozenset((army.id, enemy.id))] = combat
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import threading
+import numpy as np
+from ..misc.enums import EventType, CombatType
+from .log import get_logger
+
+try:
+    import pandas as pd
+except ImportError: # pandas is optional: without it events are read as a NumPy record array
+    pd = None
+
+# Fixed-width event record. Field meaning per EventType:
+#   COMBAT_STARTED   army / other = lead armies of the two sides, detail = CombatType, x, y = tile of `army`
+#   ROUND_RESOLVED   army / other = lead armies, round, units_* = alive units before the round,
+#                    damage_* = damage taken by the side, losses_* = units the side lost
+#   COMBAT_FINISHED  army = winner (-1 for a draw), other = loser, units_a = units the winning side has left
+#   ARMY_MOVED_TILE  army, x, y = the new tile
+#   ARMY_DESTROYED   army, x, y = tile it was destroyed on
+# `_a` fields belong to the side of `army`, `_b` fields to the side of `other`; unused fields are 0 (-1 for ids).
+EVENT_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('kind', 'u1'),
+    ('detail', 'u1'),
+    ('round', '<u4'),
+    ('army', '<i8'),
+    ('other', '<i8'),
+    ('x', '<i4'),
+    ('y', '<i4'),
+    ('units_a', '<i4'),
+    ('units_b', '<i4'),
+    ('damage_a', '<f4'),
+    ('damage_b', '<f4'),
+    ('losses_a', '<i4'),
+    ('losses_b', '<i4'),
+])
+
+# Records held in memory before they are flushed to the file (or overwritten, without a file)
+DEFAULT_CAPACITY = 65536
+# Event files start with this magic, a little-endian uint32 header length and a JSON header
+MAGIC = b"EWCEVT01"
+NO_ARMY = -1
+# CombatType (a plain Enum) -> code stored in the `detail` field of COMBAT_STARTED
+_COMBAT_TYPE_CODES = {combat_type: code for code, combat_type in enumerate(CombatType)}
+
+
+def _header_bytes():
+    header = json.dumps({"dtype": EVENT_DTYPE.descr}).encode("utf-8")
+    return MAGIC + np.uint32(len(header)).tobytes() + header
+
+
+class EventRecorder:
+    """
+    Structured recorder of simulation events. Events are written as fixed-width
+    records (EVENT_DTYPE) into a preallocated ring buffer. With a file opened,
+    a full buffer is appended to it as raw bytes in one write; without one, the
+    buffer keeps the most recent `capacity` events in memory.
+    Views (e.g. TextLogView) receive the same events as objects and turn
+    them into human-readable logs.
+    """
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY):
+        self.buffer = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.views = []
+        self.total = 0 # Events recorded since creation
+        self._head = 0 # Next slot in the buffer
+        self._wrapped = False # The buffer (without a file) overwrote its oldest events
+        self._file = None
+        self._lock = threading.Lock() # Guards the buffer and the file (open/flush may come from another thread)
+        self.path = None
+        if path is not None:
+            self.open(path)
+
+    @property
+    def capacity(self):
+        return len(self.buffer)
+
+    def open(self, path):
+        """
+        Starts appending events to a file (the header is written if the file
+        is new). Events held in memory so far are written to it first.
+        """
+        self.close()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with self._lock:
+            self._file = open(path, "ab")
+            if new_file:
+                self._file.write(_header_bytes())
+            self.records().tofile(self._file)
+            self._file.flush()
+            self.path = path
+            self._head = 0
+            self._wrapped = False
+
+    def flush(self):
+        """Appends the buffered events to the file."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def records(self):
+        """Events currently held in memory, oldest first."""
+        if self._wrapped:
+            return np.concatenate((self.buffer[self._head:], self.buffer[:self._head]))
+        return self.buffer[:self._head].copy()
+
+    # ---- Typed events ----
+
+    def combat_started(self, time, combat):
+        self._append((time, EventType.COMBAT_STARTED, _COMBAT_TYPE_CODES[combat.combat_type], 0,
+                      combat.army1.id, combat.army2.id, int(combat.army1.x), int(combat.army1.y),
+                      0, 0, 0.0, 0.0, 0, 0))
+        for view in self.views:
+            view.combat_started(combat)
+
+    def round_resolved(self, time, combat, units, damage, losses):
+        """`units`, `damage` and `losses` are (side 1, side 2) pairs."""
+        self._append((time, EventType.ROUND_RESOLVED, 0, combat.round_number,
+                      combat.army1.id, combat.army2.id, int(combat.army1.x), int(combat.army1.y),
+                      units[0], units[1], damage[0], damage[1], losses[0], losses[1]))
+        for view in self.views:
+            view.round_resolved(combat, units, damage, losses)
+
+    def combat_finished(self, time, combat, winner, loser, units_left):
+        self._append((time, EventType.COMBAT_FINISHED, 0, combat.round_number,
+                      winner.id if winner else NO_ARMY, loser.id if loser else NO_ARMY,
+                      int(combat.army1.x), int(combat.army1.y), units_left, 0, 0.0, 0.0, 0, 0))
+        for view in self.views:
+            view.combat_finished(combat, winner, units_left)
+
+    def army_moved_tile(self, time, army):
+        self._append((time, EventType.ARMY_MOVED_TILE, 0, 0, army.id, NO_ARMY,
+                      int(army.x), int(army.y), 0, 0, 0.0, 0.0, 0, 0))
+        for view in self.views:
+            view.army_moved_tile(army)
+
+    def armies_moved_tile(self, time, armies, tile_x, tile_y):
+        """Batch form of army_moved_tile for the movement system: tile_x / tile_y are arrays."""
+        count = len(armies)
+        if count == 0:
+            return
+        block = np.zeros(count, dtype=EVENT_DTYPE)
+        block['time'] = time
+        block['kind'] = EventType.ARMY_MOVED_TILE
+        block['army'] = np.fromiter((army.id for army in armies), dtype=np.int64, count=count)
+        block['other'] = NO_ARMY
+        block['x'] = tile_x
+        block['y'] = tile_y
+        self._append_block(block)
+        for view in self.views:
+            view.armies_moved_tile(armies)
+
+    def army_destroyed(self, time, army):
+        self._append((time, EventType.ARMY_DESTROYED, 0, 0, army.id, NO_ARMY,
+                      int(army.x), int(army.y), 0, 0, 0.0, 0.0, 0, 0))
+        for view in self.views:
+            view.army_destroyed(army)
+
+    # ---- Buffer ----
+
+    def _append(self, record):
+        with self._lock:
+            self.buffer[self._head] = record
+            self._advance(1)
+
+    def _append_block(self, block):
+        with self._lock:
+            while len(block):
+                take = min(len(block), self.capacity - self._head)
+                self.buffer[self._head:self._head + take] = block[:take]
+                self._advance(take)
+                block = block[take:]
+
+    def _flush(self):
+        if self._file is None or self._head == 0:
+            return
+        self.buffer[:self._head].tofile(self._file)
+        self._file.flush()
+        self._head = 0
+
+    def _advance(self, count):
+        self.total += count
+        self._head += count
+        if self._head == self.capacity:
+            if self._file is not None:
+                self._flush()
+            else:
+                self._head = 0
+                self._wrapped = True
+
+
+class TextLogView:
+    """
+    Human-readable view of the event stream: writes the events to the
+    "combat" and "movement" loggers. Disabled log levels cost one level check.
+    """
+    def __init__(self):
+        self.combat_log = get_logger("combat")
+        self.movement_log = get_logger("movement")
+
+    def combat_started(self, combat):
+        if combat.combat_type == CombatType.MEETING_ENGAGEMENT:
+            self.combat_log.info("Начался встречный бой между %s и %s!", combat.army1.faction.name, combat.army2.faction.name)
+        else:
+            defender, attacker = combat.defender_and_attacker()
+            self.combat_log.info("%s атакует позиции %s!", attacker.faction.name, defender.faction.name)
+
+    def round_resolved(self, combat, units, damage, losses):
+        self.combat_log.info("РАУНД %s: %s (%s) vs %s (%s) | Урон: %s/%s | Потери: %s/%s",
+                             combat.round_number,
+                             combat.army1.faction.name, units[0], combat.army2.faction.name, units[1],
+                             damage[0], damage[1], losses[0], losses[1])
+
+    def combat_finished(self, combat, winner, units_left):
+        if winner is None:
+            self.combat_log.info("Обе армии были уничтожены в бою!")
+        else:
+            self.combat_log.info("Армия %s победила, уничтожив врага. Осталось юнитов: %s.", winner.faction.name, units_left)
+
+    def army_moved_tile(self, army):
+        if self.movement_log.isEnabledFor(logging.DEBUG):
+            self.movement_log.debug("Army %s moved to tile %s (Faction: %s).", army.id, (int(army.x), int(army.y)), army.faction.name)
+
+    def armies_moved_tile(self, armies):
+        """Batch form of army_moved_tile: the level is checked once for the whole batch."""
+        if not self.movement_log.isEnabledFor(logging.DEBUG):
+            return
+        for army in armies:
+            self.movement_log.debug("Army %s moved to tile %s (Faction: %s).", army.id, (int(army.x), int(army.y)), army.faction.name)
+
+    def army_destroyed(self, army):
+        self.combat_log.info("Армия %s (%s) уничтожена.", army.id, army.faction.name)
+
+
+def read_events(path):
+    """Loads an event file as a NumPy record array (memory-mapped, read-only)."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not an event file: {path}")
+        header_length = int(np.frombuffer(file.read(4), dtype='<u4')[0])
+        header = json.loads(file.read(header_length))
+    dtype = np.dtype([tuple(field) for field in header["dtype"]])
+    offset = len(MAGIC) + 4 + header_length
+    if os.path.getsize(path) == offset:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset)
+
+
+def events_to_dataframe(records):
+    """Converts event records (or a path to an event file) to a pandas DataFrame with a `kind` category column."""
+    if pd is None:
+        raise ImportError("pandas is required for events_to_dataframe; use read_events for a NumPy array")
+    if isinstance(records, (str, os.PathLike)):
+        records = read_events(records)
+    frame = pd.DataFrame(np.asarray(records))
+    frame['kind'] = pd.Categorical.from_codes(frame['kind'], categories=[kind.name for kind in EventType])
+    return frame
@@ -2,6 +2,8 @@ import pygame
 import sys
 import os
 import random
+import threading
+import time
 
 # Adjust the path to include the project's root directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -10,61 +12,215 @@ from .world import GameWorld
 from ..game_objects.army import Army
 from ..game_objects.unit import Unit
 from ..game_objects.faction import Faction
-from .combat import Combat
+from .combat_scheduler import CombatScheduler
+from .collisions import handle_collisions
 from .log import log
+from .profiler import PROFILER
+from .startup import STARTUP
+from .snapshot import Snapshot, save_world, load_world, restore_game
+from .autosave import Autosave, load_autosave
+from .recording import SessionRecorder, Command
 from ..ai.general_ai import GeneralAI
+from ..ai.ai_scheduler import AIScheduler
+from ..ai.profiles.profile_manager import get_registry
 from .camera import Camera
 from .renderer import Renderer, TILE_SIZE
-from .map_generator import generate_map
-from ..misc.enums import Stance, CombatType
+from ..misc.enums import CommandType
+
+
+class _LoadCancelled(Exception):
+    """Raised in the loading thread to abandon the world setup when the player quits during loading."""
+
 
 class Game:
     """
     The main game class, managing the game loop, state, and rendering.
     """
-    def __init__(self, width=1280, height=720, map_seed=None):
-        pygame.init()
+    def __init__(self, width=1280, height=720, map_seed=None, event_log_path=None, seed=None, headless=False,
+                 record_path=None, background_load=False, map_size=100, armies_per_faction=1, map_path=None):
+        """
+        :param seed: Seed of the simulation's random generator (random by default); together with
+            map_seed it makes a session reproducible.
+        :param headless: No window (SDL dummy video driver), for replays and simulations.
+        :param record_path: Record the session and write the recording here on exit (see SessionRecorder).
+        :param background_load: Return at once and generate the world in a loading thread; run() shows
+            a progress bar until it is ready. Otherwise the world is ready when the constructor returns.
+        :param map_size: Width and height of the generated map in tiles.
+        :param armies_per_faction: Armies (each with its general) every faction starts with.
+        :param map_path: Take the map from a file written by `main.py genmap` instead of generating
+            it; its size replaces map_size.
+        """
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        random.seed(self.seed)
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
-        pygame.display.set_caption("Eternal War Chronicles")
+        with STARTUP.stage("window"):
+            # Only the modules the game uses: initializing audio alone can take longer than the window
+            pygame.display.init()
+            pygame.font.init()
+            self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+            pygame.display.set_caption("Eternal War Chronicles")
 
         self.running = True
         self.clock = pygame.time.Clock()
         self.paused = False
-
-        self.world = GameWorld(width=100, height=100)
+        self.profiler = PROFILER # Frame/subsystem timings: F3 toggles the overlay, F4 dumps a Chrome trace
+        self.quicksave_path = "quicksave.ewcs" # F5 saves a snapshot here, F9 loads it
+        # Base snapshot plus periodic deltas, written in the background; F10 loads the latest
+        self.autosave = Autosave("autosave")
+
+        self.map_path = map_path
+        if map_path is not None:
+            map_size = Snapshot(map_path).header["width"]
+        self.armies_per_faction = armies_per_faction
+        self.world = GameWorld(width=map_size, height=map_size)
+        if event_log_path is not None:
+            self.world.events.open(event_log_path)
         
         # Сначала создаём фракции
         faction1 = Faction("Order of the Sun", "Blue")
         faction2 = Faction("Shadow Syndicate", "Red")
-        factions = [faction1, faction2]
+        self._factions = [faction1, faction2]
         # Генерируем seed карты
-        if map_seed is None:
-            map_seed = random.randint(0, 1000000)
-        self.map_seed = map_seed
-        log.info(f"Map seed: {self.map_seed}")
-        # Генерируем карту с учётом фракций и сида
-        game_map, territories = generate_map(self.world.width, self.world.height, factions, seed=self.map_seed)
-        self.world.map_data = game_map
-        self.world.territories = territories
-        
+        # Always drawn, so that the simulation's random stream does not depend on whether the map seed was given
+        drawn_map_seed = random.randint(0, 1000000)
+        self.map_seed = map_seed if map_seed is not None else drawn_map_seed
+        log.info("Map seed: %s, simulation seed: %s", self.map_seed, self.seed)
+
         # Инициализация рендерера
         self.renderer = Renderer(self.screen)
-        self.renderer.pre_render_map(self.world.map_data) # Pre-render the map once
         self.camera = Camera(self.renderer.game_surface.get_width(), self.renderer.game_surface.get_height())
 
-        self.active_combats = []
         self.ai_generals = []
+        self.ai_frame_budget_ms = 2.0  # Max time per frame spent on AI decisions
+        # Generals think on their own staggered intervals instead of every frame
+        self.ai_scheduler = AIScheduler(self.ai_frame_budget_ms)
+        # AI profiles are checked for changes on disk this often (seconds, wall clock)
+        self.profile_reload_interval = 1.0
+        self._last_profile_check = time.time()
 
         self.combat_tick_rate = 1.0  # seconds
-        self.time_since_last_combat_tick = 0.0
-
-        # Добавляем фракции в мир
-        for faction in factions:
-            self.world.add_faction(faction)
-
-        self._setup_world()
+        self.combat_frame_budget_ms = 4.0  # Max time per frame spent on combat rounds
+        # Each combat ticks on its own staggered phase instead of all at once
+        self.combat_scheduler = CombatScheduler(self.combat_tick_rate, self.combat_frame_budget_ms)
+
+        # Seeds, frame times, commands and AI decisions of the session, for replays (see src/core/replay.py)
+        self.record_path = record_path
+        self.recorder = SessionRecorder(self.seed, self.map_seed, map_size, armies_per_faction, map_path) \
+            if record_path is not None else None
+        self._attach_recorder()
+
+        # Map generation and world setup take seconds: with background_load the window shows
+        # a progress bar while they run in a loading thread, and run() starts once they finish
+        self.load_progress = (0.0, "") # (share done, stage), written by the loading thread
+        self._loader = None
+        self._load_error = None
+        self._cancel_load = threading.Event() # Set when the player quits before the world is ready
+        if background_load:
+            self._loader = threading.Thread(target=self._load_in_background, name="world-loader", daemon=True)
+            self._loader.start()
+        else:
+            self._build_world()
+            self._finish_loading()
+
+    def _attach_recorder(self):
+        if self.recorder is not None:
+            self.ai_scheduler.on_decision = self.recorder.decision
+
+    def _build_world(self):
+        """Generates the map and sets up the world: everything of the startup that does not need the window."""
+        from .map_generator import generate_map # Imported here: opensimplex is only needed for generation
+
+        if self.map_path is not None:
+            with STARTUP.stage("load map"):
+                game_map, territories = self._load_map(self.map_path)
+        else:
+            # Генерируем карту с учётом фракций и сида
+            with STARTUP.stage("generate_map"):
+                game_map, territories = generate_map(self.world.width, self.world.height, self._factions,
+                                                     seed=self.map_seed, progress=self._report_map_progress)
+        self._check_load_cancelled()
+        self.world.map_data = game_map
+        self.world.territories = territories
+        self.load_progress = (0.95, "World")
+        with STARTUP.stage("build world"):
+            self.world.build_movement_cost_raster()
+            self.world.build_defense_bonus_raster()
+            self.world.build_knowledge()
+            self.world.build_influence()
+
+            # Добавляем фракции в мир
+            for faction in self._factions:
+                self.world.add_faction(faction)
+            self._check_load_cancelled()
+            self._setup_world()
+        self.load_progress = (1.0, "Rendering")
+
+    def _load_map(self, path):
+        """Map tiles and territories of a saved map; territory owners are matched to the game's factions by name."""
+        state = random.getstate() # load_world restores the RNG of the file; the game keeps its own
+        world, _ = load_world(path)
+        random.setstate(state)
+        by_name = {faction.name: faction for faction in self._factions}
+        for territory in world.territories:
+            if territory.owner_faction is not None:
+                territory.owner_faction = by_name.get(territory.owner_faction.name)
+        log.info("Map loaded from %s (%sx%s).", path, world.width, world.height)
+        return world.map_data, world.territories
+
+    def _report_map_progress(self, share, stage):
+        self._check_load_cancelled()
+        self.load_progress = (share * 0.95, stage)
+
+    def _check_load_cancelled(self):
+        if self._cancel_load.is_set():
+            raise _LoadCancelled()
+
+    def _load_in_background(self):
+        try:
+            self._build_world()
+        except _LoadCancelled:
+            log.info("World loading cancelled.")
+        except BaseException as error: # Re-raised in the main thread by _wait_for_world
+            self._load_error = error
+
+    def _stop_loader(self):
+        """Makes the loading thread abandon the world setup and waits for it, so nothing still writes to the world."""
+        self._cancel_load.set()
+        self._loader.join()
+        self._loader = None
+
+    def _finish_loading(self):
+        """The part of the startup that needs the display: pre-rendering the map."""
+        with STARTUP.stage("pre_render_map"):
+            self.renderer.pre_render_map(self.world.map_data) # Pre-render the map once
+        STARTUP.mark("world ready")
+        STARTUP.report(log)
+
+    def _wait_for_world(self):
+        """Shows the loading screen until the loading thread is done. Returns False if the player quit meanwhile."""
+        while self._loader.is_alive():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    self._stop_loader()
+                    return False
+                if event.type == pygame.VIDEORESIZE:
+                    self._fit_view()
+            share, stage = self.load_progress
+            self.renderer.render_loading(share, stage)
+            pygame.display.flip()
+            STARTUP.mark("first frame")
+            self.clock.tick(30)
+        self._loader.join()
+        self._loader = None
+        if self._load_error is not None:
+            raise self._load_error
+        self._finish_loading()
+        return True
 
     def _find_valid_spawn_point(self, search_rect, max_attempts=100):
         """Finds a random walkable tile within a given rectangle."""
@@ -72,9 +228,9 @@ class Game:
             x = random.randint(search_rect.left, search_rect.right - 1)
             y = random.randint(search_rect.top, search_rect.bottom - 1)
             if self.world.map_data[y][x].is_walkable:
-                log.debug(f"Found valid spawn point at ({x}, {y})")
+                log.debug("Found valid spawn point at (%s, %s)", x, y)
                 return x, y
-        log.warning(f"Could not find a valid spawn point in {search_rect} after {max_attempts} attempts.")
+        log.warning("Could not find a valid spawn point in %s after %s attempts.", search_rect, max_attempts)
         return None # Could not find a valid point
 
     def _setup_world(self):
@@ -84,91 +240,165 @@ class Game:
         # Используем уже созданные фракции
         faction1 = self.world.factions[0]
         faction2 = self.world.factions[1]
-        log.info(f"Faction 1: {faction1.name} (color: {faction1.color})")
-        log.info(f"Faction 2: {faction2.name} (color: {faction2.color})")
+        log.info("Faction 1: %s (color: %s)", faction1.name, faction1.color)
+        log.info("Faction 2: %s (color: %s)", faction2.name, faction2.color)
 
         # Define spawn areas to ensure armies start far apart
         spawn_area_1 = pygame.Rect(0, 0, self.world.width // 4, self.world.height)
         spawn_area_2 = pygame.Rect(self.world.width * 3 // 4, 0, self.world.width // 4, self.world.height)
 
-        spawn_pos_1 = self._find_valid_spawn_point(spawn_area_1)
-        spawn_pos_2 = self._find_valid_spawn_point(spawn_area_2)
-
-        if not spawn_pos_1 or not spawn_pos_2:
-            log.error("Failed to find valid spawn points for one or both armies. Aborting setup.")
-            # Fallback to default positions if spawn fails, though this is not ideal
-            spawn_pos_1 = (10, 10)
-            spawn_pos_2 = (self.world.width - 10, self.world.height - 10)
-
-        # Армия 1: Пехотный кулак с лучниками
-        army1_units = [Unit("shieldman") for _ in range(3)] + \
-                      [Unit("spearman") for _ in range(7)] + \
-                      [Unit("archer") for _ in range(5)]
-        army1 = Army(faction1, spawn_pos_1[0], spawn_pos_1[1], army1_units)
-        self.world.add_army(army1)
-        self.ai_generals.append(GeneralAI("aggressive_general", army1))
-
-        # Армия 2: Кавалерийский налет с поддержкой арбалетчиков
-        army2_units = [Unit("swordsman") for _ in range(5)] + \
-                      [Unit("light_cavalry") for _ in range(4)] + \
-                      [Unit("crossbowman") for _ in range(3)]
-        army2 = Army(faction2, spawn_pos_2[0], spawn_pos_2[1], army2_units)
-        self.world.add_army(army2)
-        self.ai_generals.append(GeneralAI("aggressive_general", army2))
-        
+        # Армии фракций создаются парами, по армии каждой фракции за проход
+        for _ in range(self.armies_per_faction):
+            spawn_pos_1 = self._find_valid_spawn_point(spawn_area_1)
+            spawn_pos_2 = self._find_valid_spawn_point(spawn_area_2)
+
+            if not spawn_pos_1 or not spawn_pos_2:
+                log.error("Failed to find valid spawn points for one or both armies. Aborting setup.")
+                # Fallback to default positions if spawn fails, though this is not ideal
+                spawn_pos_1 = (10, 10)
+                spawn_pos_2 = (self.world.width - 10, self.world.height - 10)
+
+            # Армия 1: Пехотный кулак с лучниками
+            army1_units = [Unit("shieldman") for _ in range(3)] + \
+                          [Unit("spearman") for _ in range(7)] + \
+                          [Unit("archer") for _ in range(5)]
+            army1 = Army(faction1, spawn_pos_1[0], spawn_pos_1[1], army1_units)
+            self.world.add_army(army1)
+            self._add_general(GeneralAI("aggressive_general", army1))
+
+            # Армия 2: Кавалерийский налет с поддержкой арбалетчиков
+            army2_units = [Unit("swordsman") for _ in range(5)] + \
+                          [Unit("light_cavalry") for _ in range(4)] + \
+                          [Unit("crossbowman") for _ in range(3)]
+            army2 = Army(faction2, spawn_pos_2[0], spawn_pos_2[1], army2_units)
+            self.world.add_army(army2)
+            self._add_general(GeneralAI("aggressive_general", army2))
+
         log.info("World setup complete.")
 
+    def _add_general(self, general):
+        """Puts a general in command and schedules its decisions."""
+        self.ai_generals.append(general)
+        self.ai_scheduler.add(general)
+
+
+    def save_snapshot(self, path):
+        """Saves the world, the AI generals and the schedulers to a snapshot file."""
+        start = time.perf_counter()
+        size = save_world(path, self.world, self)
+        log.info("Snapshot saved to %s (%.1f KB, %.1f ms).", path, size / 1024, (time.perf_counter() - start) * 1000)
+
+    def load_snapshot(self, path):
+        """Replaces the running world with a saved snapshot."""
+        start = time.perf_counter()
+        self._replace_world(*load_world(path))
+        log.info("Snapshot loaded from %s (%s armies, %.1f ms).", path, len(self.world.armies),
+                 (time.perf_counter() - start) * 1000)
+
+    def load_autosave(self):
+        """Replaces the running world with the latest autosave (base snapshot with its deltas applied)."""
+        start = time.perf_counter()
+        self.autosave.flush()
+        self._replace_world(*load_autosave(self.autosave.directory))
+        log.info("Autosave loaded (%s armies, %.1f ms).", len(self.world.armies), (time.perf_counter() - start) * 1000)
+
+    def _replace_world(self, world, snapshot):
+        world.events = self.world.events # Keep journaling into the same event log
+        restore_game(self, world, snapshot)
+        self._attach_recorder()
+        self.autosave.reset() # The next checkpoint starts a new chain from the loaded world
+        self.renderer.pre_render_map(self.world.map_data, self.world.territories)
+
+    def step(self, delta_time, ai_cutoff=None, combat_cutoff=None):
+        """
+        Advances the simulation by one frame: everything the frame does except
+        input and rendering. The cutoffs replay where the frame budgets of the
+        AI and combat schedulers cut a recorded frame.
+        """
+        profiler = self.profiler
+        self.world.time += delta_time
+        with profiler.span("_update_ai"):
+            self._update_ai(delta_time, ai_cutoff)
+        with profiler.span("_update_armies"):
+            self._update_armies(delta_time)
+        with profiler.span("_handle_collisions"):
+            self._handle_collisions()
+        with profiler.span("_update_combats"):
+            self._update_combats(delta_time, combat_cutoff)
+        with profiler.span("_autosave"):
+            self.autosave.update(self.world, self)
+        if self.recorder is not None:
+            self.recorder.end_frame(self.ai_scheduler.last_frame_cutoff, self.combat_scheduler.last_frame_cutoff)
 
     def run(self):
         """Starts the main game loop."""
+        profiler = self.profiler
+        if self._loader is not None and not self._wait_for_world():
+            self.running = False
         while self.running:
-            delta_time = self.clock.tick(60) / 1000.0
+            frame_ms = self.clock.tick(60)
             if self.paused:
-                delta_time = 0
-
-            self._handle_input()
-            self._update_ai(delta_time)
-            self._update_armies(delta_time)
-            self._handle_collisions()
-            self._update_combats(delta_time)
-            self._render()
-
+                frame_ms = 0
+            if self.recorder is not None:
+                self.recorder.begin_frame(frame_ms)
+
+            with profiler.span("frame"):
+                with profiler.span("_handle_input"):
+                    self._handle_input()
+                self.step(frame_ms / 1000.0)
+                with profiler.span("_render"):
+                    self._render()
+
+        self.autosave.shutdown()
+        self.world.events.close()
+        if self.recorder is not None:
+            frames = self.recorder.save(self.record_path)
+            log.info("Session recording (%s frames) written to %s.", frames, self.record_path)
         pygame.quit()
         sys.exit()
 
     def _handle_input(self):
-        """Handles user input and system events."""
-        map_width_pixels = self.world.width * TILE_SIZE
-        map_height_pixels = self.world.height * TILE_SIZE
+        """Turns user input into commands and executes them."""
+        for command in self._read_input():
+            self.execute_command(command)
 
+    def _read_input(self):
+        """Translates pygame events and held keys into player commands."""
+        commands = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                self.running = False
-            
+                commands.append(Command(CommandType.QUIT))
+
             if event.type == pygame.VIDEORESIZE:
-                self.renderer.calculate_game_surface()
-                self.camera.width = self.renderer.game_surface.get_width()
-                self.camera.height = self.renderer.game_surface.get_height()
-            
+                commands.append(Command(CommandType.RESIZE))
+
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    self.running = False
-                if event.key == pygame.K_p:
-                    self.paused = not self.paused
-                    log.info(f"Game {'paused' if self.paused else 'resumed'}.")
-                if event.key in [pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS]:
-                    self.camera.zoom_in(map_width_pixels, map_height_pixels)
+                    commands.append(Command(CommandType.QUIT))
+                elif event.key == pygame.K_p:
+                    commands.append(Command(CommandType.TOGGLE_PAUSE))
+                elif event.key in [pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS]:
+                    commands.append(Command(CommandType.ZOOM_IN))
                 elif event.key in [pygame.K_MINUS, pygame.K_KP_MINUS]:
-                    self.camera.zoom_out(map_width_pixels, map_height_pixels)
+                    commands.append(Command(CommandType.ZOOM_OUT))
+                elif event.key == pygame.K_F3:
+                    commands.append(Command(CommandType.TOGGLE_PROFILER))
+                elif event.key == pygame.K_F4:
+                    commands.append(Command(CommandType.DUMP_TRACE))
+                elif event.key == pygame.K_F5:
+                    commands.append(Command(CommandType.QUICKSAVE))
+                elif event.key == pygame.K_F9:
+                    commands.append(Command(CommandType.QUICKLOAD))
+                elif event.key == pygame.K_F10:
+                    commands.append(Command(CommandType.LOAD_AUTOSAVE))
                 elif event.key == pygame.K_v:
-                    self.renderer.toggle_political_mode()
-                    self.renderer.pre_render_map(self.world.map_data, self.world.territories)
+                    commands.append(Command(CommandType.TOGGLE_POLITICAL_MAP))
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 4: # Scroll up
-                    self.camera.zoom_in(map_width_pixels, map_height_pixels)
+                    commands.append(Command(CommandType.ZOOM_IN))
                 elif event.button == 5: # Scroll down
-                    self.camera.zoom_out(map_width_pixels, map_height_pixels)
+                    commands.append(Command(CommandType.ZOOM_OUT))
                 elif event.button == 1: # Left click - логируем инфу о клетке
                     mouse_x, mouse_y = pygame.mouse.get_pos()
                     rel_x = mouse_x - self.renderer.game_surface_rect.left
@@ -180,16 +410,7 @@ class Game:
                         tile_x = world_x // TILE_SIZE
                         tile_y = world_y // TILE_SIZE
                         if 0 <= tile_x < self.world.width and 0 <= tile_y < self.world.height:
-                            tile = self.world.map_data[tile_y][tile_x]
-                            terrain = tile.base_terrain
-                            features = [f.__class__.__name__ for f in tile.features]
-                            territory_id = tile.territory_id
-                            owner = None
-                            for terr in self.world.territories:
-                                if terr.id == territory_id:
-                                    owner = getattr(terr, 'owner_faction', None)
-                                    break
-                            log.info(f"TILE INFO: ({tile_x}, {tile_y}) | type: {terrain.name} (key: {terrain.key}) | walkable: {tile.is_walkable} | move_cost: {tile.get_movement_cost()} | defense: {tile.get_defense_bonus()} | features: {features} | territory: {territory_id} | owner: {getattr(owner, 'name', None)}")
+                            commands.append(Command(CommandType.INSPECT_TILE, tile_x, tile_y))
 
         # Handle camera movement with keys
         keys = pygame.key.get_pressed()
@@ -204,92 +425,129 @@ class Game:
             move_dy += self.camera.move_speed
 
         if move_dx != 0 or move_dy != 0:
-            self.camera.move(move_dx, move_dy, map_width_pixels, map_height_pixels)
+            commands.append(Command(CommandType.MOVE_CAMERA, move_dx, move_dy))
+        return commands
 
-    def _update_ai(self, delta_time):
-        """Updates all AI generals."""
-        for general in self.ai_generals:
-            general.update(self.world)
+    def execute_command(self, command):
+        """Executes a player command (and records it when the session is being recorded)."""
+        if self.recorder is not None:
+            self.recorder.command(command)
+        map_width_pixels = self.world.width * TILE_SIZE
+        map_height_pixels = self.world.height * TILE_SIZE
+        kind = command.type
+
+        if kind == CommandType.QUIT:
+            self.running = False
+        elif kind == CommandType.TOGGLE_PAUSE:
+            self.paused = not self.paused
+            log.info("Game %s.", 'paused' if self.paused else 'resumed')
+        elif kind == CommandType.ZOOM_IN:
+            self.camera.zoom_in(map_width_pixels, map_height_pixels)
+        elif kind == CommandType.ZOOM_OUT:
+            self.camera.zoom_out(map_width_pixels, map_height_pixels)
+        elif kind == CommandType.MOVE_CAMERA:
+            self.camera.move(command.a, command.b, map_width_pixels, map_height_pixels)
+        elif kind == CommandType.RESIZE:
+            self._fit_view()
+        elif kind == CommandType.INSPECT_TILE:
+            self._log_tile_info(int(command.a), int(command.b))
+        elif kind == CommandType.TOGGLE_POLITICAL_MAP:
+            self.renderer.toggle_political_mode()
+            self.renderer.pre_render_map(self.world.map_data, self.world.territories)
+        elif kind == CommandType.TOGGLE_PROFILER:
+            self.renderer.toggle_profiler_overlay()
+        elif kind == CommandType.DUMP_TRACE:
+            path = f"trace_{int(time.time())}.json"
+            count = self.profiler.dump_trace(path)
+            log.info("Profiler trace (%s spans) written to %s.", count, path)
+        elif kind == CommandType.QUICKSAVE:
+            self.save_snapshot(self.quicksave_path)
+        elif kind == CommandType.QUICKLOAD:
+            if os.path.exists(self.quicksave_path):
+                self.load_snapshot(self.quicksave_path)
+            else:
+                log.warning("No snapshot at %s to load.", self.quicksave_path)
+        elif kind == CommandType.LOAD_AUTOSAVE:
+            try:
+                self.load_autosave()
+            except FileNotFoundError as error:
+                log.warning("%s", error)
+
+    def _fit_view(self):
+        """Fits the game surface and the camera to the resized window."""
+        self.renderer.calculate_game_surface()
+        self.camera.width = self.renderer.game_surface.get_width()
+        self.camera.height = self.renderer.game_surface.get_height()
+
+    def _log_tile_info(self, tile_x, tile_y):
+        tile = self.world.map_data[tile_y][tile_x]
+        terrain = tile.base_terrain
+        features = [f.__class__.__name__ for f in tile.features]
+        territory_id = tile.territory_id
+        owner = None
+        for terr in self.world.territories:
+            if terr.id == territory_id:
+                owner = getattr(terr, 'owner_faction', None)
+                break
+        log.info("TILE INFO: (%s, %s) | type: %s (key: %s) | walkable: %s | move_cost: %s | defense: %s | features: %s | territory: %s | owner: %s",
+                 tile_x, tile_y, terrain.name, terrain.key, tile.is_walkable, tile.get_movement_cost(),
+                 tile.get_defense_bonus(), features, territory_id, getattr(owner, 'name', None))
+
+    def _update_ai(self, delta_time, cutoff=None):
+        """Lets the AI generals whose decision is due think."""
+        self._reload_changed_profiles()
+        self.world.influence.update(delta_time)
+        self.ai_scheduler.update(delta_time, self.world, cutoff)
+
+    def _reload_changed_profiles(self):
+        """Hot-reload: re-binds generals whose profile file changed on disk."""
+        now = time.time()
+        if now - self._last_profile_check < self.profile_reload_interval:
+            return
+        self._last_profile_check = now
+        changed = get_registry().reload_changed()
+        if changed:
+            changed = set(changed)
+            for general in self.ai_generals:
+                if general.profile_name in changed or general._knowledge_base_name() in changed:
+                    general.reload_profile()
 
     def _update_armies(self, delta_time):
-        """Updates all armies in the world."""
-        # Create a copy of the list to iterate over, as it might be modified during combat resolution
-        for army in list(self.world.armies):
-            army.update(delta_time, self.world)
+        """Moves all armies in the world in one batch step and updates what the factions see."""
+        self.world.movement.update(delta_time)
+        self.world.knowledge.update(delta_time)
 
     def _handle_collisions(self):
-        """Detects collisions between armies and initiates combat."""
-        armies_to_check = list(self.world.armies)
-        for i, army1 in enumerate(armies_to_check):
-            for army2 in armies_to_check[i+1:]:
-                if army1.faction != army2.faction:
-                    # Check if they are already fighting each other
-                    is_in_combat = False
-                    for combat in self.active_combats:
-                        if (combat.army1 == army1 and combat.army2 == army2) or \
-                           (combat.army1 == army2 and combat.army2 == army1):
-                            is_in_combat = True
-                            break
-                    
-                    if not is_in_combat and army1.get_distance_to(army2) < army1.collision_radius + army2.collision_radius:
-                        # Determine combat type based on stances
-                        if army1.stance == Stance.MOVING and army2.stance == Stance.MOVING:
-                            combat_type = CombatType.MEETING_ENGAGEMENT
-                            log.info(f"Collision: A meeting engagement between {army1.faction.name} and {army2.faction.name}!")
-                            defender, attacker = None, None
-                        else:
-                            combat_type = CombatType.POSITIONAL_ASSAULT
-                            # Determine who is the attacker and who is the defender
-                            if army1.stance == Stance.IDLE and army2.stance == Stance.MOVING:
-                                defender, attacker = army1, army2
-                            elif army2.stance == Stance.IDLE and army1.stance == Stance.MOVING:
-                                defender, attacker = army2, army1
-                            else: # Default case (e.g., both IDLE), treat army1 as defender for consistency
-                                defender, attacker = army1, army2
-                            log.info(f"Collision: {attacker.faction.name} is assaulting the position of {defender.faction.name}!")
-
-                        army1.in_combat = True
-                        army2.in_combat = True
-                        army1.set_target(None) # Stop movement
-                        army2.set_target(None)
-                        new_combat = Combat(army1, army2, self.world, combat_type)
-                        self.active_combats.append(new_combat)
-
-    def _update_combats(self, delta_time):
-        """Updates the state of all active combats."""
-        self.time_since_last_combat_tick += delta_time
-        if self.time_since_last_combat_tick < self.combat_tick_rate:
-            return  # Not time for the next combat tick yet
-
-        self.time_since_last_combat_tick -= self.combat_tick_rate
-
-        for combat in list(self.active_combats):
-            status, winner, loser = combat.tick()
-
-            if status == 'finished':
-                log.info(f"Combat finished. Winner: {winner.faction.name if winner else 'Draw'}. Loser: {loser.faction.name if loser else 'Draw'}.")
-                
-                # In a draw, both are losers.
-                if winner is None and loser is None:
-                    if combat.army1 in self.world.armies:
-                        self.world.remove_army(combat.army1)
-                    if combat.army2 in self.world.armies:
-                        self.world.remove_army(combat.army2)
-                else:
-                    # Remove loser from the world
-                    if loser:
-                        self.world.remove_army(loser)
-                    
-                    # Mark surviving winner as not in combat
-                    if winner and winner in self.world.armies:
-                        winner.in_combat = False
-
-                self.active_combats.remove(combat)
+        """Detects collisions between armies and initiates combat or joins an ongoing one."""
+        handle_collisions(self.world, self.combat_scheduler)
+
+    def _update_combats(self, delta_time, cutoff=None):
+        """Updates the state of all active combats whose round is due this frame."""
+        for combat, status, winner, loser in self.combat_scheduler.update(delta_time, cutoff):
+            # Armies destroyed in this round leave the battle and the world at once,
+            # even if their side fights on with other armies.
+            for army in combat.armies:
+                if army.is_destroyed:
+                    self.world.engagements.leave(combat, army)
+                    self.world.events.army_destroyed(self.world.time, army)
+                    self.world.remove_army(army)
+            if status != 'finished':
+                continue
+
+            log.info("Combat finished. Winner: %s. Loser: %s.", winner.faction.name if winner else 'Draw', loser.faction.name if loser else 'Draw')
+            # Survivors are released from combat
+            for army in combat.armies:
+                if army in self.world.army_index:
+                    army.in_combat = False
+
+            self.world.engagements.remove(combat)
 
 
     def _render(self):
         """Renders all game objects to the screen."""
         self.renderer.render(self.world, self.camera)
+        if self.renderer.show_profiler:
+            self.renderer.render_profiler_overlay(self.profiler)
         pygame.display.flip() 
 
 if __name__ == '__main__':
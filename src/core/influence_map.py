@@ -0,0 +1,217 @@
+import math
+import numpy as np
+
+# Number of diffusion steps: an army influences tiles up to SPREAD_STEPS - 1 tiles away
+SPREAD_STEPS = 12
+# Share of influence kept per step (before terrain attenuation)
+DECAY = 0.9
+# The fields are recalculated this often (seconds of game time)
+UPDATE_INTERVAL = 1.0
+# Incremental updates accumulate rounding errors; rebuild from scratch every N updates
+FULL_REBUILD_EVERY = 30
+
+
+def army_strength(army):
+    """Combat strength of an army from its aggregates, scaled by remaining health."""
+    if army.max_hp <= 0:
+        return 0.0
+    return (army.attack_power + army.defense_power) * army.total_hp / army.max_hp
+
+
+def build_conductivity(cost_raster):
+    """How well influence passes through every tile: 1 / movement cost, 0 for unwalkable tiles."""
+    return (1.0 / cost_raster).astype(np.float32)
+
+
+def diffuse(deposit, conductivity, steps=SPREAD_STEPS, decay=DECAY):
+    """
+    Spreads the deposited strength over the grid:
+    field = deposit + decay * conductivity * mean of the 4 neighbours, repeated
+    `steps` times. The operation is linear in `deposit`, so fields of separate
+    deposits can be added up (used for incremental updates).
+    """
+    field = deposit.copy()
+    neighbours = np.empty_like(field)
+    weight = conductivity * np.float32(decay / 4.0)
+    for _ in range(steps - 1):
+        neighbours.fill(0.0)
+        neighbours[1:, :] += field[:-1, :]
+        neighbours[:-1, :] += field[1:, :]
+        neighbours[:, 1:] += field[:, :-1]
+        neighbours[:, :-1] += field[:, 1:]
+        np.multiply(neighbours, weight, out=field)
+        field += deposit
+    return field
+
+
+class InfluenceMap:
+    """
+    Per-faction strength fields over the tile grid. Every army deposits its
+    strength (army_strength) on its tile, and the deposit is diffused across
+    the map, attenuated by terrain movement cost. The threat a faction faces
+    at a point is the sum of the other factions' strength there.
+
+    The fields are updated at a low frequency (UPDATE_INTERVAL) and only around
+    armies whose tile or strength changed: since diffusion is linear, the
+    difference of an army's deposits is diffused in a small window around it
+    and added to the field. When many armies changed, the fields are rebuilt
+    with one pass over the whole map instead.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.conductivity = None
+        self.strength = {} # faction -> (height, width) float32 field
+        self._deposits = {} # army -> (tile_x, tile_y, strength) included in the fields
+        self._since_update = 0.0
+        self._updates = 0
+
+    def build(self):
+        """(Re)builds the fields for the current map. Call after map_data changes."""
+        if self.world.movement_cost_raster is None:
+            self.world.build_movement_cost_raster()
+        self.conductivity = build_conductivity(self.world.movement_cost_raster)
+        self._rebuild()
+
+    @property
+    def deposits(self):
+        """army -> (tile_x, tile_y, strength) as of the last update: what the fields are made of."""
+        return self._deposits
+
+    @property
+    def schedule(self):
+        """(game time since the last update, number of updates): when the next update and full rebuild happen."""
+        return self._since_update, self._updates
+
+    def restore(self, deposits, schedule, fields=None):
+        """
+        Restores saved state (see deposits, schedule): the fields are taken as
+        given, or rebuilt from the deposits when `fields` (faction -> field) is None.
+        """
+        if self.world.movement_cost_raster is None:
+            self.world.build_movement_cost_raster()
+        self.conductivity = build_conductivity(self.world.movement_cost_raster)
+        self._since_update, self._updates = schedule
+        self._deposits = dict(deposits)
+        if fields is not None:
+            self.strength = dict(fields)
+            return
+        grids = {}
+        for army, (tile_x, tile_y, strength) in self._deposits.items():
+            grid = grids.get(army.faction)
+            if grid is None:
+                grid = grids[army.faction] = np.zeros(self.conductivity.shape, dtype=np.float32)
+            grid[tile_y, tile_x] += strength
+        self.strength = {faction: diffuse(grid, self.conductivity) for faction, grid in grids.items()}
+
+    def update(self, delta_time):
+        """Recalculates the fields once per UPDATE_INTERVAL."""
+        if self.conductivity is None:
+            return
+        self._since_update += delta_time
+        if self._since_update < UPDATE_INTERVAL:
+            return
+        self._since_update = 0.0
+        self._updates += 1
+        if self._updates % FULL_REBUILD_EVERY == 0:
+            self._rebuild()
+            return
+
+        # Deposit differences of armies that moved, changed strength, appeared or disappeared
+        changes = []
+        current = {}
+        for army in self.world.armies:
+            deposit = (int(army.x), int(army.y), army_strength(army))
+            current[army] = deposit
+            old = self._deposits.get(army)
+            if old != deposit:
+                if old is not None:
+                    changes.append((army.faction, old[0], old[1], -old[2]))
+                changes.append((army.faction, deposit[0], deposit[1], deposit[2]))
+        for army, old in self._deposits.items():
+            if army not in current:
+                changes.append((army.faction, old[0], old[1], -old[2]))
+        self._deposits = current
+        if not changes:
+            return
+
+        window = (2 * SPREAD_STEPS - 1) ** 2
+        height, width = self.conductivity.shape
+        if len(changes) * window >= height * width:
+            self._rebuild()
+            return
+        for faction, tile_x, tile_y, amount in changes:
+            self._apply_local(faction, tile_x, tile_y, amount)
+
+    def tile_changed(self, x, y):
+        """
+        Takes the new movement cost of a tile into account. If it changes how
+        influence passes through the tile, the fields are rebuilt at once, so
+        they never mix the old and the new terrain (and can always be rebuilt
+        from the deposits, as autosave deltas do).
+        """
+        if self.conductivity is None:
+            return
+        conductivity = build_conductivity(self.world.movement_cost_raster[y:y + 1, x:x + 1])[0, 0]
+        if conductivity != self.conductivity[y, x]:
+            self.conductivity[y, x] = conductivity
+            self._rebuild()
+
+    def strength_at(self, faction, x, y):
+        """Strength of a faction's own armies felt at a point."""
+        field = self.strength.get(faction)
+        return float(field[int(y), int(x)]) if field is not None else 0.0
+
+    def threat_at(self, faction, x, y):
+        """Strength of all other factions felt at a point."""
+        tile_y, tile_x = int(y), int(x)
+        return float(sum(field[tile_y, tile_x] for other, field in self.strength.items() if other != faction))
+
+    def safest_tile(self, faction, x, y, radius, away_from=None):
+        """
+        Looks at the walkable tiles `radius` tiles away in 8 directions and
+        returns the one where the faction faces the least threat, or None.
+        Ties (e.g. no threat in range at all) go to the tile farthest from `away_from`.
+        """
+        height, width = self.conductivity.shape
+        best, best_key = None, None
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+            tile_x = min(width - 1, max(0, int(x + dx * radius)))
+            tile_y = min(height - 1, max(0, int(y + dy * radius)))
+            if self.conductivity[tile_y, tile_x] == 0:
+                continue
+            distance = 0.0
+            if away_from is not None:
+                distance = math.hypot(tile_x - away_from[0], tile_y - away_from[1])
+            key = (self.threat_at(faction, tile_x, tile_y), -distance)
+            if best_key is None or key < best_key:
+                best, best_key = (tile_x, tile_y), key
+        return best
+
+    def _field(self, faction):
+        field = self.strength.get(faction)
+        if field is None:
+            field = self.strength[faction] = np.zeros(self.conductivity.shape, dtype=np.float32)
+        return field
+
+    def _rebuild(self):
+        """Recalculates every field from scratch: one diffusion pass over the map per faction."""
+        deposits = {}
+        self._deposits = {}
+        for army in self.world.armies:
+            deposit = (int(army.x), int(army.y), army_strength(army))
+            self._deposits[army] = deposit
+            grid = deposits.get(army.faction)
+            if grid is None:
+                grid = deposits[army.faction] = np.zeros(self.conductivity.shape, dtype=np.float32)
+            grid[deposit[1], deposit[0]] += deposit[2]
+        self.strength = {faction: diffuse(grid, self.conductivity) for faction, grid in deposits.items()}
+
+    def _apply_local(self, faction, tile_x, tile_y, amount):
+        """Diffuses a single deposit change inside the window it can reach and adds it to the field."""
+        height, width = self.conductivity.shape
+        reach = SPREAD_STEPS - 1
+        x0, x1 = max(0, tile_x - reach), min(width, tile_x + reach + 1)
+        y0, y1 = max(0, tile_y - reach), min(height, tile_y + reach + 1)
+        deposit = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+        deposit[tile_y - y0, tile_x - x0] = amount
+        self._field(faction)[y0:y1, x0:x1] += diffuse(deposit, self.conductivity[y0:y1, x0:x1])
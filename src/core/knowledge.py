@@ -0,0 +1,154 @@
+import numpy as np
+
+# Vision radius of an army on open ground, in tiles
+BASE_VISION_RADIUS = 6
+# Precomputed disc masks: radius -> (2r + 1, 2r + 1) bool array
+_DISC_MASKS = {}
+
+
+def vision_mask(radius):
+    """Returns the (cached) disc of tiles an army sees within `radius` tiles."""
+    mask = _DISC_MASKS.get(radius)
+    if mask is None:
+        offsets = np.arange(-radius, radius + 1)
+        mask = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius * radius
+        _DISC_MASKS[radius] = mask
+    return mask
+
+
+def build_vision_radius_raster(map_data):
+    """
+    Builds a (height, width) array with the vision radius of an army standing
+    on every tile: BASE_VISION_RADIUS scaled by Terrain.visibility_modifier
+    (hills see farther, forests less far).
+    """
+    height = len(map_data)
+    width = len(map_data[0]) if height else 0
+    raster = np.empty((height, width), dtype=np.int16)
+    for y, row in enumerate(map_data):
+        raster[y, :] = [vision_radius_of(tile) for tile in row]
+    return raster
+
+
+def vision_radius_of(tile):
+    return max(1, round(BASE_VISION_RADIUS * tile.base_terrain.visibility_modifier))
+
+
+class FactionKnowledge:
+    """
+    What one faction knows about the world: explored tiles, tiles it currently
+    sees (as a per-tile count of armies seeing it) and the last known positions
+    of enemy armies.
+    """
+    def __init__(self, faction, width, height):
+        self.faction = faction
+        self.explored = np.zeros((height, width), dtype=bool)
+        self.visible_count = np.zeros((height, width), dtype=np.uint16)
+        self.last_seen = {} # enemy army -> (x, y, time)
+
+    def is_visible(self, x, y):
+        return self.visible_count[int(y), int(x)] > 0
+
+    def is_explored(self, x, y):
+        return bool(self.explored[int(y), int(x)])
+
+    def last_known_position(self, army):
+        """Where the faction last saw an enemy army, or None if it has never seen it."""
+        seen = self.last_seen.get(army)
+        return (seen[0], seen[1]) if seen is not None else None
+
+    def forget(self, army):
+        self.last_seen.pop(army, None)
+
+    def stamp(self, tile_x, tile_y, radius, sign):
+        """Adds (sign=1) or removes (sign=-1) the vision disc of an army standing on a tile."""
+        height, width = self.visible_count.shape
+        mask = vision_mask(radius)
+        x0, y0 = tile_x - radius, tile_y - radius
+        # Clip the disc to the map
+        mx0, my0 = max(0, -x0), max(0, -y0)
+        mx1 = min(mask.shape[1], width - x0)
+        my1 = min(mask.shape[0], height - y0)
+        if mx0 >= mx1 or my0 >= my1:
+            return
+        window = (slice(y0 + my0, y0 + my1), slice(x0 + mx0, x0 + mx1))
+        clipped = mask[my0:my1, mx0:mx1]
+        if sign > 0:
+            self.visible_count[window] += clipped
+            self.explored[window] |= clipped
+        else:
+            self.visible_count[window] -= clipped
+
+
+class KnowledgeMap:
+    """
+    Fog of war for all factions. Each army stamps its precomputed vision disc
+    into its faction's layer; the stamp is moved only when the army changes
+    tile, so an update costs O(armies + moved armies x vision area) instead of
+    O(map). After stamping, enemies standing on visible tiles refresh their
+    last-seen positions.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.clock = 0.0
+        self.vision_radius = None
+        self._factions = {} # faction -> FactionKnowledge
+        self._stamps = {} # army -> (tile_x, tile_y, radius) of its current stamp
+
+    def build(self):
+        """(Re)builds the layers for the current map and stamps all armies. Call after map_data changes."""
+        self.vision_radius = build_vision_radius_raster(self.world.map_data)
+        self._factions = {}
+        self._stamps = {}
+        for army in self.world.armies:
+            self.add_army(army)
+
+    def of(self, faction):
+        """Returns the knowledge layer of a faction (created on first use)."""
+        knowledge = self._factions.get(faction)
+        if knowledge is None:
+            height, width = self.vision_radius.shape
+            knowledge = self._factions[faction] = FactionKnowledge(faction, width, height)
+        return knowledge
+
+    def add_army(self, army):
+        if self.vision_radius is None or army in self._stamps:
+            return
+        self._stamp(army)
+
+    def remove_army(self, army):
+        stamp = self._stamps.pop(army, None)
+        if stamp is not None:
+            self.of(army.faction).stamp(*stamp, -1)
+        for knowledge in self._factions.values():
+            knowledge.forget(army)
+
+    def update(self, delta_time):
+        """Moves the vision stamps of armies that changed tile and refreshes last-seen enemies."""
+        if self.vision_radius is None:
+            return
+        self.clock += delta_time
+        for army, (tile_x, tile_y, radius) in list(self._stamps.items()):
+            if int(army.x) != tile_x or int(army.y) != tile_y:
+                self.of(army.faction).stamp(tile_x, tile_y, radius, -1)
+                self._stamp(army)
+
+        if not self._stamps:
+            return
+        armies = list(self._stamps)
+        stamps = np.array(list(self._stamps.values()), dtype=np.intp)
+        tile_x, tile_y = stamps[:, 0], stamps[:, 1]
+        factions = [army.faction for army in armies]
+        for knowledge in self._factions.values():
+            # Enemies standing on tiles this faction currently sees
+            seen = np.flatnonzero(knowledge.visible_count[tile_y, tile_x])
+            for i in seen.tolist():
+                if factions[i] != knowledge.faction:
+                    army = armies[i]
+                    knowledge.last_seen[army] = (army.x, army.y, self.clock)
+
+    def _stamp(self, army):
+        tile_x, tile_y = int(army.x), int(army.y)
+        radius = int(self.vision_radius[tile_y, tile_x])
+        self.of(army.faction).stamp(tile_x, tile_y, radius, 1)
+        self._stamps[army] = (tile_x, tile_y, radius)
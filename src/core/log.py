@@ -1,30 +1,195 @@
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler
+
+# Name of the shared logger; subsystems log through its children (see get_logger)
+LOGGER_NAME = "EternalWarChronicles"
+
+# Default levels of the shared logger ("") and of the subsystems.
+# Can be overridden with the EWC_LOG_LEVELS environment variable,
+# e.g. EWC_LOG_LEVELS="DEBUG" or EWC_LOG_LEVELS="INFO,ai=DEBUG,movement=WARNING".
+DEFAULT_LEVELS = {
+    "": logging.INFO,
+}
+
+# How many records the writer thread formats and writes at once
+BATCH_SIZE = 256
+
+_FORMAT = '%(asctime)s - [%(module)s.%(funcName)s] - %(levelname)s - %(message)s'
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class _NonFormattingQueueHandler(QueueHandler):
+    """
+    Puts records on the queue as they are: unlike the standard QueueHandler,
+    the message is not formatted in the calling (simulation) thread. Log
+    arguments should therefore be plain values, not objects that keep changing.
+    """
+    def prepare(self, record):
+        return record
+
+
+class LogWriter:
+    """
+    Background thread that drains the log queue in batches: every handler
+    formats the whole batch and writes it with a single write + flush.
+    The simulation thread only puts records on an unbounded queue, so logging
+    never waits for the console or the disk.
+    """
+    _STOP = object()
+
+    def __init__(self, log_queue, handlers, batch_size=BATCH_SIZE):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Writes out everything still queued and stops the thread. Records queued
+        while it stops are written by the calling thread; later ones are not
+        read from the queue any more (shutdown_logging routes them to the
+        handlers directly).
+        """
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+        remaining = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                remaining.append(item)
+        for handler in self.handlers:
+            self._write_batch(handler, remaining)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Records logged after stop() was called may follow the marker in the same batch
+            stop = any(record is self._STOP for record in batch)
+            records = [record for record in batch if record is not self._STOP]
+            for handler in self.handlers:
+                self._write_batch(handler, records)
+            if stop:
+                return
+
+    @staticmethod
+    def _write_batch(handler, records):
+        lines = []
+        for record in records:
+            if record.levelno >= handler.level and handler.filter(record):
+                try:
+                    lines.append(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+        if not lines:
+            return
+        handler.acquire()
+        try:
+            handler.stream.write("".join(lines))
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+
+def parse_levels(spec):
+    """
+    Parses "INFO,ai=DEBUG" into {"": INFO, "ai": DEBUG}. Levels are names or
+    numbers; entries with an unknown level are skipped with a warning.
+    """
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        subsystem, _, name = item.rpartition("=")
+        name = name.strip().upper()
+        level = int(name) if name.isdigit() else logging.getLevelName(name)
+        if not isinstance(level, int):
+            log.warning("Ignoring log level setting %r: unknown level %r.", item, name)
+            continue
+        levels[subsystem.strip()] = level
+    return levels
+
+
+def get_logger(subsystem=None):
+    """Returns the shared logger, or the child logger of a subsystem ("ai", "movement", ...)."""
+    return log.getChild(subsystem) if subsystem else log
+
+
+def set_level(subsystem, level):
+    """Sets the level of a subsystem ("" for the shared logger)."""
+    get_logger(subsystem or None).setLevel(level)
+
+
+def configure_levels(levels):
+    for subsystem, level in levels.items():
+        set_level(subsystem, level)
+
+
+def shutdown_logging():
+    """
+    Flushes the queued records to the handlers and stops the writer thread.
+    Records logged afterwards are written synchronously by the handlers.
+    Called automatically at exit.
+    """
+    if writer is None:
+        return
+    log.removeHandler(queue_handler)
+    for handler in writer.handlers:
+        log.addHandler(handler)
+    writer.stop()
+
 
 # Create a single, shared logger instance
-log = logging.getLogger("EternalWarChronicles")
-log.setLevel(logging.DEBUG)
+log = logging.getLogger(LOGGER_NAME)
+
+# Background writer of the queued records and the handler that feeds it
+# (None if the logger was already configured elsewhere)
+writer = None
+queue_handler = None
 
 # Prevent the logger from propagating messages to the root logger
 log.propagate = False
 
 # If the logger already has handlers, don't add more
 if not log.handlers:
-    # Create a handler to write to the console (stderr by default)
+    # Create a handler to write to the console
     console_handler = logging.StreamHandler(sys.stdout)
-    
+
     # Create a file handler to write to game.log (overwrite mode)
     file_handler = logging.FileHandler('game.log', mode='w', encoding='utf-8')
-    
+
     # Create a formatter and set it for both handlers
-    # Example format: 2023-10-27 15:04:01,123 - [GAME] - INFO - Your log message
-    formatter = logging.Formatter(
-        '%(asctime)s - [%(module)s.%(funcName)s] - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    # Example format: 2023-10-27 15:04:01 - [game.run] - INFO - Your log message
+    formatter = logging.Formatter(_FORMAT, datefmt=_DATE_FORMAT)
     console_handler.setFormatter(formatter)
     file_handler.setFormatter(formatter)
-    
-    # Add both handlers to the logger
-    log.addHandler(console_handler)
-    log.addHandler(file_handler) 
\ No newline at end of file
+
+    # The logger only enqueues records; the writer thread does formatting and I/O
+    log_queue = queue.SimpleQueue()
+    queue_handler = _NonFormattingQueueHandler(log_queue)
+    log.addHandler(queue_handler)
+    writer = LogWriter(log_queue, [console_handler, file_handler])
+    writer.start()
+    atexit.register(shutdown_logging)
+
+    configure_levels(DEFAULT_LEVELS)
+    configure_levels(parse_levels(os.environ.get("EWC_LOG_LEVELS", "")))
@@ -7,12 +7,14 @@ from ..game_objects.territory import Territory
 from .pathfinding import find_path
 from .terrain_config import TERRAIN_TYPES # Импортируем новый конфиг
 
-def _generate_noise_map(width, height, scale, octaves, persistence, lacunarity, seed):
-    """Генерирует карту шума заданного размера и параметров."""
+def _generate_noise_map(width, height, scale, octaves, persistence, lacunarity, seed, on_row=None):
+    """Генерирует карту шума заданного размера и параметров. on_row(доля) вызывается после каждой строки."""
     simplex = OpenSimplex(seed)
     noise_map = np.zeros((height, width))
 
     for y in range(height):
+        if on_row is not None:
+            on_row(y / height)
         for x in range(width):
             amplitude = 1
             frequency = 1
@@ -35,8 +37,8 @@ def _generate_noise_map(width, height, scale, octaves, persistence, lacunarity,
     return noise_map
 
 
-def _generate_roads(game_map, width, height, walkable_tiles):
-    """Generates a road network on the map using A*."""
+def _generate_roads(game_map, width, height, walkable_tiles, on_road=None):
+    """Generates a road network on the map using A*. on_road(share done) is called before every road."""
     if not walkable_tiles:
         return
 
@@ -47,6 +49,8 @@ def _generate_roads(game_map, width, height, walkable_tiles):
     # Соединяем точки по принципу минимального остовного дерева (упрощенно)
     # или просто последовательно для простоты
     for i in range(len(points_of_interest) - 1):
+        if on_road is not None:
+            on_road(i / (len(points_of_interest) - 1))
         start = points_of_interest[i]
         goal = points_of_interest[i+1]
 
@@ -96,17 +100,30 @@ def _create_territories(game_map, width, height, num_territories_x=3, num_territ
     return territories
 
 
-def generate_map(width, height, factions=None, seed=None):
+def _stage_progress(progress, start, end, stage):
+    """Maps the 0..1 progress of one generation stage to [start, end] of the whole generation."""
+    if progress is None:
+        return None
+    return lambda share: progress(start + (end - start) * share, stage)
+
+
+def generate_map(width, height, factions=None, seed=None, progress=None):
     """
     Generates a realistic game map using multiple noise layers for elevation,
     moisture, and temperature. Optionally assigns territory owners from factions.
+    `progress(share done, stage name)` is called as the generation advances
+    (the map may be generated in a loading thread).
     """
     if seed is None:
         seed = random.randint(0, 10000)
     
     # 1. Генерируем карты высот, влажности и температуры
-    elevation_map = _generate_noise_map(width, height, scale=90, octaves=6, persistence=0.5, lacunarity=2.0, seed=seed)
-    moisture_map = _generate_noise_map(width, height, scale=70, octaves=4, persistence=0.5, lacunarity=2.0, seed=seed + 1)
+    elevation_map = _generate_noise_map(width, height, scale=90, octaves=6, persistence=0.5, lacunarity=2.0, seed=seed,
+                                        on_row=_stage_progress(progress, 0.0, 0.15, "Elevation"))
+    moisture_map = _generate_noise_map(width, height, scale=70, octaves=4, persistence=0.5, lacunarity=2.0, seed=seed + 1,
+                                       on_row=_stage_progress(progress, 0.15, 0.25, "Moisture"))
+    if progress is not None:
+        progress(0.25, "Terrain")
     
     game_map = [[None for _ in range(width)] for _ in range(height)]
     walkable_tiles = []
@@ -159,7 +176,7 @@ def generate_map(width, height, factions=None, seed=None):
                 walkable_tiles.append((x, y))
 
     # 3. Генерируем дороги
-    _generate_roads(game_map, width, height, walkable_tiles)
+    _generate_roads(game_map, width, height, walkable_tiles, on_road=_stage_progress(progress, 0.3, 1.0, "Roads"))
 
     # 4. Создаем территории
     territories = _create_territories(game_map, width, height)
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Samples kept per histogram for the rolling percentiles
+DEFAULT_WINDOW = 600
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Rolling window of the last `window` observed values with percentiles over it."""
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.count = 0 # Values observed in total
+        self.total = 0.0
+        self.peak = 0.0
+
+    def add(self, value):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+        self.total += value
+        if value > self.peak:
+            self.peak = value
+
+    def percentiles(self, percentiles=PERCENTILES):
+        """Percentiles of the window (zeros if nothing was observed yet)."""
+        filled = min(self.count, len(self.samples))
+        if filled == 0:
+            return tuple(0.0 for _ in percentiles)
+        return tuple(np.percentile(self.samples[:filled], percentiles).tolist())
+
+
+class MetricsRegistry:
+    """
+    Aggregated counters and histograms reported by subsystems (names like
+    "path.found", "path.nodes_expanded"). Cheap to update from hot paths;
+    the profiler overlay reads them.
+    """
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.counters = {} # name -> int
+        self.histograms = {} # name -> RollingHistogram
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.window)
+        histogram.add(value)
+
+    def counter(self, name):
+        return self.counters.get(name, 0)
+
+    def histogram(self, name):
+        return self.histograms.get(name)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        """Plain-dict copy of all metrics: counters and, per histogram, count / mean / peak / p50 / p95 / p99."""
+        histograms = {}
+        for name, histogram in self.histograms.items():
+            p50, p95, p99 = histogram.percentiles()
+            histograms[name] = {"count": histogram.count, "mean": histogram.total / max(histogram.count, 1),
+                                "peak": histogram.peak, "p50": p50, "p95": p95, "p99": p99}
+        return {"counters": dict(self.counters), "histograms": histograms}
+
+
+# Registry shared by all subsystems
+METRICS = MetricsRegistry()
@@ -0,0 +1,184 @@
+import math
+
+import numpy as np
+
+from .log import get_logger
+from .terrain_config import TERRAIN_TYPES
+
+log = get_logger("movement")
+
+# Cost used for an army standing on an unwalkable tile (a cost of infinity would
+# give it a step of 0 and leave it there forever): the slowest walkable terrain
+STRANDED_MOVEMENT_COST = max(terrain.movement_cost for terrain in TERRAIN_TYPES.values()
+                             if terrain.is_walkable and math.isfinite(terrain.movement_cost))
+
+
+def build_movement_cost_raster(map_data):
+    """
+    Builds a (height, width) float array with the movement cost of every tile.
+    Unwalkable tiles have a cost of infinity.
+    """
+    height = len(map_data)
+    width = len(map_data[0]) if height else 0
+    raster = np.empty((height, width), dtype=np.float64)
+    for y, row in enumerate(map_data):
+        raster[y, :] = [tile.get_movement_cost() for tile in row]
+    return raster
+
+
+class MovementSystem:
+    """
+    Moves all armies at once. Positions, speeds and current waypoints of the
+    registered armies are kept in NumPy arrays (structure of arrays) and advanced
+    in a single vectorized step per frame using the world's movement-cost raster.
+    Only armies that reach a waypoint or change a grid cell are touched in Python.
+
+    Armies notify the system when their path, combat state or position changes
+    outside of it (see Army._notify_movement), so no per-frame scan is needed to
+    find the moving ones.
+    """
+    def __init__(self, world, capacity=64):
+        self.world = world
+        self.armies = [] # slot -> army
+        self._slots = {} # army -> slot
+        self.pos_x = np.zeros(capacity)
+        self.pos_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.waypoint_x = np.zeros(capacity)
+        self.waypoint_y = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._stranded = set() # Armies last seen on an unwalkable tile (logged once per stay)
+
+    def __len__(self):
+        return len(self.armies)
+
+    def register(self, army):
+        """Adds an army to the system."""
+        if army in self._slots:
+            return
+        slot = len(self.armies)
+        if slot >= len(self.active):
+            self._grow()
+        self.armies.append(army)
+        self._slots[army] = slot
+        army._movement_system = self
+        self.refresh(army)
+
+    def unregister(self, army):
+        """Removes an army from the system (swap-remove, O(1))."""
+        slot = self._slots.pop(army, None)
+        if slot is None:
+            return
+        army._movement_system = None
+        last = len(self.armies) - 1
+        if slot != last:
+            moved_army = self.armies[last]
+            self.armies[slot] = moved_army
+            self._slots[moved_army] = slot
+            for array in (self.pos_x, self.pos_y, self.speed, self.waypoint_x, self.waypoint_y, self.active):
+                array[slot] = array[last]
+        self.armies.pop()
+        self.active[last] = False
+
+    def refresh(self, army):
+        """Re-reads the army's position, speed, combat state and current waypoint."""
+        slot = self._slots.get(army)
+        if slot is None:
+            return
+        self.pos_x[slot] = army.x
+        self.pos_y[slot] = army.y
+        self.speed[slot] = army.speed
+        waypoint = army.current_waypoint
+        if waypoint is None or army.in_combat:
+            self.active[slot] = False
+        else:
+            self.active[slot] = True
+            self.waypoint_x[slot], self.waypoint_y[slot] = waypoint
+
+    def update(self, delta_time):
+        """Advances every moving army by one frame."""
+        n = len(self.armies)
+        idx = np.flatnonzero(self.active[:n])
+        if idx.size == 0 or delta_time == 0:
+            return
+
+        world = self.world
+        if world.movement_cost_raster is None:
+            world.build_movement_cost_raster()
+
+        x = self.pos_x[idx]
+        y = self.pos_y[idx]
+        dx = self.waypoint_x[idx] - x
+        dy = self.waypoint_y[idx] - y
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        # Movement speed considering the cost of the tile each army is standing on
+        cost = world.movement_cost_raster[y.astype(np.intp), x.astype(np.intp)]
+        stranded = np.isinf(cost)
+        if stranded.any() or self._stranded:
+            cost = np.where(stranded, STRANDED_MOVEMENT_COST, cost)
+            self._report_stranded(idx[stranded].tolist())
+        step = self.speed[idx] * delta_time / cost
+
+        on_waypoint = distance == 0 # Exactly on the waypoint: advance without moving
+        arrived = ~on_waypoint & (step >= distance)
+        moving = ~on_waypoint & ~arrived
+
+        safe_distance = np.where(on_waypoint, 1.0, distance)
+        new_x = np.where(arrived, self.waypoint_x[idx], np.where(moving, x + dx / safe_distance * step, x))
+        new_y = np.where(arrived, self.waypoint_y[idx], np.where(moving, y + dy / safe_distance * step, y))
+        self.pos_x[idx] = new_x
+        self.pos_y[idx] = new_y
+
+        # Write positions back to the armies that actually moved
+        moved = ~on_waypoint
+        armies = self.armies
+        for slot, ax, ay in zip(idx[moved].tolist(), new_x[moved].tolist(), new_y[moved].tolist()):
+            army = armies[slot]
+            army.x = ax
+            army.y = ay
+            army.dirty = True
+
+        # Update the spatial indices only for armies that changed grid cell
+        cell = world.army_index.cell_size
+        changed_cell = moved & ((np.floor(x / cell) != np.floor(new_x / cell)) | (np.floor(y / cell) != np.floor(new_y / cell)))
+        for slot in idx[changed_cell].tolist():
+            world.update_army_position(armies[slot])
+
+        # ---- Событие смены тайла (текстовый лог — представление журнала событий) ----
+        new_tile_x = new_x.astype(np.intp)
+        new_tile_y = new_y.astype(np.intp)
+        changed_tile = moved & ((x.astype(np.intp) != new_tile_x) | (y.astype(np.intp) != new_tile_y))
+        if changed_tile.any():
+            world.events.armies_moved_tile(world.time, [armies[slot] for slot in idx[changed_tile].tolist()],
+                                           new_tile_x[changed_tile], new_tile_y[changed_tile])
+
+        # Armies that reached their waypoint move their path cursor forward
+        next_slots, next_waypoints, finished_slots = [], [], []
+        for slot in idx[on_waypoint | arrived].tolist():
+            army = armies[slot]
+            if army.advance_waypoint():
+                next_slots.append(slot)
+                next_waypoints.append(army.path[army.path_index])
+            else:
+                finished_slots.append(slot)
+        if next_slots:
+            self.waypoint_x[next_slots], self.waypoint_y[next_slots] = np.array(next_waypoints, dtype=np.float64).T
+        if finished_slots:
+            self.active[finished_slots] = False
+
+    def _report_stranded(self, slots):
+        """Logs armies that are found on an unwalkable tile (they walk off it at STRANDED_MOVEMENT_COST)."""
+        stranded = {self.armies[slot] for slot in slots}
+        for army in stranded - self._stranded:
+            log.warning("Army %s of %s is on unwalkable tile (%s, %s); moving it off at cost %s.",
+                        army.id, army.faction.name, int(army.x), int(army.y), STRANDED_MOVEMENT_COST)
+        self._stranded = stranded
+
+    def _grow(self):
+        capacity = max(64, len(self.active) * 2)
+        for name in ('pos_x', 'pos_y', 'speed', 'waypoint_x', 'waypoint_y', 'active'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
@@ -0,0 +1,174 @@
+from array import array
+import math
+
+# Longest straight segment (in tiles) that string pulling will try to create
+_MAX_SEGMENT_LENGTH = 24
+_EPSILON = 1e-9
+
+
+class CompactPath:
+    """
+    A path stored as a flat array('h') of x, y coordinates instead of a list
+    of tuples. Indexing returns (x, y) tuples, so it can be used wherever a
+    list of waypoints is expected.
+    """
+    __slots__ = ("_coords",)
+
+    def __init__(self, points=()):
+        self._coords = array('h')
+        for x, y in points:
+            self._coords.append(x)
+            self._coords.append(y)
+
+    def __len__(self):
+        return len(self._coords) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        return (self._coords[2 * index], self._coords[2 * index + 1])
+
+    def __iter__(self):
+        coords = self._coords
+        return zip(coords[0::2], coords[1::2])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"CompactPath({list(self)})"
+
+    def nbytes(self):
+        """Memory used by the coordinates, in bytes."""
+        return self._coords.itemsize * len(self._coords)
+
+
+def compress_straight_runs(path):
+    """Drops intermediate points of runs that keep the same step direction."""
+    if len(path) < 3:
+        return list(path)
+    result = [path[0]]
+    prev_dir = (path[1][0] - path[0][0], path[1][1] - path[0][1])
+    for i in range(1, len(path) - 1):
+        direction = (path[i + 1][0] - path[i][0], path[i + 1][1] - path[i][1])
+        if direction != prev_dir:
+            result.append(path[i])
+            prev_dir = direction
+    result.append(path[-1])
+    return result
+
+
+def _first_tile(start, delta):
+    """Tile coordinate the segment enters first along one axis (a start on a tile border moving back is in the lower tile)."""
+    if delta < 0:
+        return math.ceil(start) - 1
+    return math.floor(start)
+
+
+def _boundary_t(tile, start, delta):
+    """Segment parameter t at which the segment leaves `tile` along one axis (infinity if it never does)."""
+    if delta > 0:
+        return (tile + 1 - start) / delta
+    if delta < 0:
+        return (tile - start) / delta
+    return math.inf
+
+
+def _segment_cost(cost_raster, start, end):
+    """
+    Cost of walking a straight segment: the cost of every tile it crosses
+    weighted by the exact length of the segment inside that tile. Tiles are
+    walked with a grid traversal (Amanatides-Woo) that also visits the tiles
+    whose corner the segment passes through (supercover). Returns infinity if
+    any visited tile is unwalkable.
+    """
+    x0, y0 = start
+    dx = end[0] - x0
+    dy = end[1] - y0
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return 0.0
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    tile_x = _first_tile(x0, dx)
+    tile_y = _first_tile(y0, dy)
+    t_max_x = _boundary_t(tile_x, x0, dx)
+    t_max_y = _boundary_t(tile_y, y0, dy)
+
+    total = 0.0
+    t = 0.0
+    while True:
+        cost = cost_raster[tile_y, tile_x]
+        if cost == math.inf:
+            return math.inf
+        t_next = min(t_max_x, t_max_y, 1.0)
+        total += cost * (t_next - t)
+        if t_next >= 1.0:
+            break
+        if abs(t_max_x - t_max_y) <= _EPSILON:
+            # Through a tile corner: the two tiles beside it are touched too
+            if cost_raster[tile_y, tile_x + step_x] == math.inf or cost_raster[tile_y + step_y, tile_x] == math.inf:
+                return math.inf
+            tile_x += step_x
+            tile_y += step_y
+            t_max_x = _boundary_t(tile_x, x0, dx)
+            t_max_y = _boundary_t(tile_y, y0, dy)
+        elif t_max_x < t_max_y:
+            tile_x += step_x
+            t_max_x = _boundary_t(tile_x, x0, dx)
+        else:
+            tile_y += step_y
+            t_max_y = _boundary_t(tile_y, y0, dy)
+        t = t_next
+    return float(total * length)
+
+
+def smooth_path(path, cost_raster):
+    """
+    String pulling: replaces chains of waypoints by a direct segment when the
+    straight line stays on walkable tiles and is not more expensive than the
+    original chain (so roads are not abandoned for a shortcut through a swamp).
+    """
+    n = len(path)
+    if n < 3:
+        return list(path)
+
+    # Prefix sums of the original segment costs
+    prefix = [0.0]
+    for i in range(n - 1):
+        prefix.append(prefix[-1] + _segment_cost(cost_raster, path[i], path[i + 1]))
+
+    result = [path[0]]
+    anchor = 0
+    while anchor < n - 1:
+        best = anchor + 1
+        for j in range(anchor + 2, n):
+            if math.hypot(path[j][0] - path[anchor][0], path[j][1] - path[anchor][1]) > _MAX_SEGMENT_LENGTH:
+                break
+            direct = _segment_cost(cost_raster, path[anchor], path[j])
+            # Never cut across an unwalkable tile, even when the chain is infinite too (a diagonal step grazing a corner)
+            if direct == math.inf or direct > prefix[j] - prefix[anchor] + _EPSILON:
+                break
+            best = j
+        result.append(path[best])
+        anchor = best
+    return result
+
+
+def simplify_path(path, cost_raster=None):
+    """
+    Post-processes a path from find_path: compresses straight runs, smooths it
+    with line-of-sight checks against the cost raster (if given) and stores the
+    result as a CompactPath. Start and end points are always kept.
+    """
+    if path is None:
+        return None
+    points = path
+    if cost_raster is not None:
+        # Smoothing runs on the full tile chain so it can compare costs against it
+        points = smooth_path(points, cost_raster)
+    return CompactPath(compress_straight_runs(points))
@@ -1,4 +1,33 @@
 import heapq
+import time
+from .profiler import profiled
+from .metrics import METRICS
+from ..misc.enums import PathStatus
+
+# Assumed movement cost of tiles the faction has not explored yet
+UNEXPLORED_TILE_COST = 2.0
+# Safety break to prevent the game from freezing on unreachable targets
+DEFAULT_ITERATION_LIMIT = 20000
+
+
+class PathQuery:
+    """Result and statistics of one path search."""
+    __slots__ = ("status", "path", "nodes_expanded", "open_peak", "elapsed_ms")
+
+    def __init__(self, status, path=None, nodes_expanded=0, open_peak=0, elapsed_ms=0.0):
+        self.status = status
+        self.path = path # List of (x, y) tiles if FOUND, otherwise None
+        self.nodes_expanded = nodes_expanded
+        self.open_peak = open_peak # Largest size of the open set
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def found(self):
+        return self.status == PathStatus.FOUND
+
+    def __repr__(self):
+        return (f"PathQuery({self.status.name}, nodes={self.nodes_expanded}, "
+                f"open_peak={self.open_peak}, {self.elapsed_ms:.2f} ms)")
 
 
 def diagonal_distance(a, b):
@@ -8,44 +37,73 @@ def diagonal_distance(a, b):
     """
     return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
 
-def find_path(grid, start, end, path_type='fastest'):
+def find_path(grid, start, end, path_type='fastest', explored=None):
+    """
+    Finds a path from start to end (see search_path). Returns the list of
+    tiles, or None if there is no path or the search ran out of its budget.
+    """
+    return search_path(grid, start, end, path_type, explored).path
+
+@profiled("find_path")
+def search_path(grid, start, end, path_type='fastest', explored=None, iteration_limit=DEFAULT_ITERATION_LIMIT):
     """
     Finds a path from start to end on a grid using the A* algorithm.
+    If `explored` (a 2D bool array of the faction's explored tiles) is given,
+    the real cost of unexplored tiles is unknown and UNEXPLORED_TILE_COST is
+    assumed instead, so known routes are preferred.
+    Returns a PathQuery; a search that expands more than `iteration_limit`
+    nodes ends with BUDGET_EXCEEDED rather than UNREACHABLE. Every query is
+    reported to the metrics registry.
     """
+    started = time.perf_counter()
+    query = _a_star(grid, start, end, path_type, explored, iteration_limit)
+    query.elapsed_ms = (time.perf_counter() - started) * 1000.0
+    _report(query)
+    return query
+
+def _report(query):
+    METRICS.increment(_STATUS_COUNTERS[query.status])
+    METRICS.observe("path.nodes_expanded", query.nodes_expanded)
+    METRICS.observe("path.open_peak", query.open_peak)
+    METRICS.observe("path.time_ms", query.elapsed_ms)
+
+_STATUS_COUNTERS = {status: f"path.{status.name.lower()}" for status in PathStatus}
+
+def _a_star(grid, start, end, path_type, explored, iteration_limit):
     start = (int(start[0]), int(start[1]))
     end = (int(end[0]), int(end[1]))
 
     # If start and end points are the same, the path is empty.
     if start == end:
-        return []
+        return PathQuery(PathStatus.FOUND, [])
 
     width = len(grid[0])
     height = len(grid)
     
     # Check if start or end points are outside the grid or on an unwalkable tile
     if not (0 <= start[0] < width and 0 <= start[1] < height and grid[start[1]][start[0]].is_walkable):
-        return None
+        return PathQuery(PathStatus.UNREACHABLE)
     if not (0 <= end[0] < width and 0 <= end[1] < height and grid[end[1]][end[0]].is_walkable):
-        return None
+        return PathQuery(PathStatus.UNREACHABLE)
 
     open_set = []
     heapq.heappush(open_set, (0, start))
     
     came_from = {}
-    g_score = { (x, y): float('inf') for y in range(height) for x in range(width) }
-    g_score[start] = 0
-    
-    f_score = { (x, y): float('inf') for y in range(height) for x in range(width) }
-    f_score[start] = diagonal_distance(start, end)
+    # Scores of tiles not reached yet are implicitly infinite (no per-query map-sized tables)
+    g_score = {start: 0}
+    f_score = {start: diagonal_distance(start, end)}
 
-    # Safety break to prevent the game from freezing on unreachable targets
-    iteration_limit = 20000 
     iterations = 0
+    open_peak = 1
 
     while open_set:
         iterations += 1
         if iterations > iteration_limit:
-            return None # Pathfinding took too long, assume it's unreachable
+            # Pathfinding took too long: the target may still be reachable by a wider search
+            return PathQuery(PathStatus.BUDGET_EXCEEDED, None, iterations - 1, open_peak)
+        if len(open_set) > open_peak:
+            open_peak = len(open_set)
 
         _, current = heapq.heappop(open_set)
 
@@ -55,7 +113,7 @@ def find_path(grid, start, end, path_type='fastest'):
                 path.append(current)
                 current = came_from[current]
             path.append(start)
-            return path[::-1]
+            return PathQuery(PathStatus.FOUND, path[::-1], iterations, open_peak)
 
         for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]:
             neighbor = (current[0] + dx, current[1] + dy)
@@ -67,7 +125,10 @@ def find_path(grid, start, end, path_type='fastest'):
                 
                 # Determine movement cost
                 if path_type == 'fastest':
-                    cost = tile.get_movement_cost()
+                    if explored is not None and not explored[neighbor[1], neighbor[0]]:
+                        cost = UNEXPLORED_TILE_COST
+                    else:
+                        cost = tile.get_movement_cost()
                 else: # 'shortest'
                     cost = 1
                 
@@ -83,4 +144,4 @@ def find_path(grid, start, end, path_type='fastest'):
                     f_score[neighbor] = tentative_g_score + diagonal_distance(neighbor, end)
                     heapq.heappush(open_set, (f_score[neighbor], neighbor))
     
-    return None # No path found 
\ No newline at end of file
+    return PathQuery(PathStatus.UNREACHABLE, None, iterations, open_peak) # No path found 
\ No newline at end of file
@@ -0,0 +1,117 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+from .metrics import METRICS, DEFAULT_WINDOW, RollingHistogram
+
+# Completed spans kept for the Chrome trace dump
+DEFAULT_TRACE_CAPACITY = 50000
+
+
+class _Span:
+    """Context manager timing one span; one instance per name is reused."""
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append(time.perf_counter_ns())
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        profiler = self.profiler
+        start = profiler._stack.pop()
+        profiler._record(self.name, start, end - start, len(profiler._stack))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Low-overhead span profiler of the main (simulation) thread. Spans are
+    timed with perf_counter_ns; every span name keeps a rolling window of
+    durations (ms) for p50/p95/p99, and the most recent spans are kept for a
+    Chrome trace-event dump (chrome://tracing, Perfetto). The counters of the
+    metrics registry are reported next to the spans.
+    Spans opened from other threads are ignored. A disabled profiler hands out
+    a shared no-op span.
+    """
+    def __init__(self, window=DEFAULT_WINDOW, trace_capacity=DEFAULT_TRACE_CAPACITY, enabled=True, metrics=METRICS):
+        self.window = window
+        self.enabled = enabled
+        self.metrics = metrics
+        self.stats = {} # span name -> RollingHistogram of durations in ms
+        self.trace = deque(maxlen=trace_capacity) # (name, start_ns, duration_ns, depth)
+        self._spans = {}
+        self._stack = []
+        self._thread = threading.main_thread()
+
+    def span(self, name):
+        """Returns a context manager timing the enclosed block as span `name`."""
+        if not self.enabled or threading.current_thread() is not self._thread:
+            return _NULL_SPAN
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans[name] = _Span(self, name)
+        return span
+
+    def reset(self):
+        self.stats.clear()
+        self.trace.clear()
+
+    def summary(self):
+        """[(name, calls, p50_ms, p95_ms, p99_ms)] of every span, in order of first use."""
+        return [(name, stats.count) + stats.percentiles() for name, stats in self.stats.items()]
+
+    def counters(self):
+        """[(name, value)] of the metrics registry counters, sorted by name."""
+        return sorted(self.metrics.counters.items())
+
+    def dump_trace(self, path):
+        """Writes the recorded spans as Chrome trace-event JSON ("X" complete events, microseconds)."""
+        events = [{"name": name, "ph": "X", "ts": start / 1000.0, "dur": duration / 1000.0,
+                   "pid": 0, "tid": 0, "args": {"depth": depth}}
+                  for name, start, duration, depth in list(self.trace)]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        return len(events)
+
+    def _record(self, name, start, duration, depth):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = RollingHistogram(self.window)
+        stats.add(duration / 1e6)
+        self.trace.append((name, start, duration, depth))
+
+
+# Profiler shared by the game loop and the instrumented hot paths
+PROFILER = Profiler()
+
+
+def profiled(name):
+    """Decorator timing every call of a function as span `name` of the shared profiler."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+import time
+from array import array
+from typing import NamedTuple
+import numpy as np
+from .snapshot import Snapshot, write_snapshot, NO_ID
+from ..misc.enums import CommandType
+
+RECORDING_VERSION = 1
+
+# Frame durations are stored in whole milliseconds (pygame's Clock.tick resolution)
+MAX_FRAME_MS = np.iinfo(np.uint16).max
+
+COMMAND_DTYPE = np.dtype([('frame', '<u4'), ('type', 'u1'), ('a', '<f8'), ('b', '<f8')])
+DECISION_DTYPE = np.dtype([('frame', '<u4'), ('army', '<i8'), ('tactic', 'i1'), ('target', '<i8')])
+CUTOFF_DTYPE = np.dtype([('frame', '<u4'), ('ai', '<u2'), ('combat', '<u2')])
+NO_TACTIC = -1
+NO_CUTOFF = 0
+
+
+class Command(NamedTuple):
+    """A player command: what Game._handle_input made of the input, replayable without pygame events."""
+    type: CommandType
+    a: float = 0.0
+    b: float = 0.0
+
+
+class SessionRecorder:
+    """
+    Records a session compactly enough to keep it always on: the seeds, the
+    duration of every frame (2 bytes), the player commands, where the frame
+    budgets of the AI and combat schedulers cut a frame (the only wall-clock
+    dependent part of the simulation) and every AI decision (used by the
+    replay to detect desyncs). Saved in the snapshot container format.
+    """
+    def __init__(self, seed, map_seed, map_size=100, armies_per_faction=1, map_path=None):
+        self.seed = seed
+        self.map_seed = map_seed
+        self.setup = {"map_size": map_size, "armies_per_faction": armies_per_faction, "map_path": map_path}
+        self.frames = array('H') # Duration of every frame in ms
+        self.commands = []
+        self.decisions = []
+        self.cutoffs = []
+
+    @property
+    def frame(self):
+        """Index of the frame being recorded."""
+        return len(self.frames) - 1
+
+    def begin_frame(self, frame_ms):
+        self.frames.append(min(int(frame_ms), MAX_FRAME_MS))
+
+    def command(self, command):
+        self.commands.append((self.frame, int(command.type), command.a, command.b))
+
+    def decision(self, general, tactic):
+        target = general.target_army.id if general.target_army is not None else NO_ID
+        self.decisions.append((self.frame, general.army.id, NO_TACTIC if tactic is None else int(tactic), target))
+
+    def end_frame(self, ai_cutoff, combat_cutoff):
+        if ai_cutoff is not None or combat_cutoff is not None:
+            self.cutoffs.append((self.frame, ai_cutoff or NO_CUTOFF, combat_cutoff or NO_CUTOFF))
+
+    def save(self, path):
+        """Writes the recording. Returns the number of frames recorded."""
+        header = {
+            "kind": "recording",
+            "recording_version": RECORDING_VERSION,
+            "recorded_at": time.time(),
+            "seed": self.seed,
+            "map_seed": self.map_seed,
+            "setup": self.setup, # The other Game arguments the session was started with
+        }
+        sections = {
+            "frames": np.frombuffer(self.frames, dtype=np.uint16).copy() if self.frames else np.zeros(0, np.uint16),
+            "commands": np.array(self.commands, dtype=COMMAND_DTYPE),
+            "decisions": np.array(self.decisions, dtype=DECISION_DTYPE),
+            "cutoffs": np.array(self.cutoffs, dtype=CUTOFF_DTYPE),
+        }
+        write_snapshot(path, header, sections)
+        return len(self.frames)
+
+
+def load_recording(path):
+    """Opens a recording written by SessionRecorder.save (a Snapshot with the recording sections)."""
+    recording = Snapshot(path)
+    if recording.header.get("kind") != "recording":
+        raise ValueError(f"Not a session recording: {path}")
+    if recording.header["recording_version"] != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version {recording.header['recording_version']}: {path}")
+    return recording
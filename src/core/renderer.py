@@ -1,5 +1,6 @@
 import pygame
 from ..game_objects.tile import Road # Import Road to check for it
+from .profiler import profiled
 
 # TILE_SIZE можно сделать настраиваемым параметром в будущем
 TILE_SIZE = 16  # Базовый размер одного тайла в пикселях
@@ -15,6 +16,11 @@ class Renderer:
         self.map_surface = None # Surface for the pre-rendered map
         self.calculate_game_surface()
         self.political_mode = False
+        self.show_profiler = False # Оверлей профайлера (F3)
+        self._overlay_font = None
+        self._loading_font = None
+        self._overlay_lines = []
+        self._overlay_refresh_at = 0
 
     def calculate_game_surface(self):
         """
@@ -35,6 +41,10 @@ class Renderer:
     def toggle_political_mode(self):
         self.political_mode = not self.political_mode
 
+    def toggle_profiler_overlay(self):
+        self.show_profiler = not self.show_profiler
+
+    @profiled("pre_render_map")
     def pre_render_map(self, map_data, territories=None, factions=None):
         """Pre-renders the entire map to a separate surface for performance."""
         map_height = len(map_data)
@@ -113,6 +123,53 @@ class Renderer:
         # Отрисовываем игровую поверхность на главном экране
         self.screen.blit(self.game_surface, self.game_surface_rect)
 
+    def render_loading(self, share, stage):
+        """
+        Экран загрузки: полоса прогресса генерации мира и название текущего этапа.
+        """
+        if self._loading_font is None:
+            self._loading_font = pygame.font.Font(None, 28)
+        self.screen.fill((0, 0, 0))
+        screen_w, screen_h = self.screen.get_size()
+        bar_w, bar_h = min(400, screen_w - 40), 16
+        bar = pygame.Rect((screen_w - bar_w) // 2, screen_h // 2, bar_w, bar_h)
+        pygame.draw.rect(self.screen, (80, 80, 80), bar, 1)
+        pygame.draw.rect(self.screen, (200, 180, 90), (bar.left, bar.top, int(bar_w * min(1.0, share)), bar_h))
+        text = self._loading_font.render(f"{stage or 'Loading'}... {share * 100:.0f}%", True, (255, 255, 255))
+        self.screen.blit(text, (bar.left, bar.top - text.get_height() - 8))
+
+    def render_profiler_overlay(self, profiler):
+        """
+        Выводит поверх экрана p50/p95/p99 (мс) всех замеров профайлера
+        и счётчики реестра метрик.
+        Текст пересчитывается не чаще двух раз в секунду, чтобы сам оверлей
+        не искажал замеры.
+        """
+        now = pygame.time.get_ticks()
+        if now >= self._overlay_refresh_at:
+            self._overlay_refresh_at = now + 500
+            if self._overlay_font is None:
+                self._overlay_font = pygame.font.Font(None, 18)
+            rows = [("span", "calls", "p50", "p95", "p99")]
+            for name, calls, p50, p95, p99 in profiler.summary():
+                rows.append((name, str(calls), f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}"))
+            for name, value in profiler.counters():
+                rows.append((name, str(value)))
+            self._overlay_lines = [[self._overlay_font.render(cell, True, (255, 255, 255)) for cell in row] for row in rows]
+
+        # Колонки: имя замера слева, числа выровнены по правому краю своих колонок
+        columns = (4, 180, 230, 280, 330)
+        line_height = 16
+        if self._overlay_lines:
+            background = pygame.Surface((columns[-1] + 8, line_height * len(self._overlay_lines) + 8))
+            background.set_alpha(160)
+            self.screen.blit(background, (0, 0))
+        for index, row in enumerate(self._overlay_lines):
+            y = 4 + index * line_height
+            self.screen.blit(row[0], (columns[0], y))
+            for right, text in zip(columns[1:], row[1:]):
+                self.screen.blit(text, (right - text.get_width(), y))
+
     def render_map(self, camera):
         """Renders the visible part of the pre-rendered map."""
         self.game_surface.fill((25, 25, 25))  # Фон для карты
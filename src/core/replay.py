@@ -0,0 +1,154 @@
+import time
+import numpy as np
+from .game import Game
+from .log import get_logger
+from .recording import load_recording, Command, NO_TACTIC
+from .snapshot import capture_world, build_world, restore_game, SnapshotData
+from ..misc.enums import CommandType
+
+log = get_logger("replay")
+
+# Frames between the in-memory snapshots used for seeking (one minute at 60 FPS)
+DEFAULT_KEYFRAME_INTERVAL = 3600
+
+# Commands that only write files or end the session: not re-executed
+_SKIPPED_COMMANDS = frozenset((CommandType.QUIT, CommandType.QUICKSAVE, CommandType.DUMP_TRACE))
+# Commands that replace the world with a saved one, which the recording does not contain
+_LOAD_COMMANDS = frozenset((CommandType.QUICKLOAD, CommandType.LOAD_AUTOSAVE))
+
+
+class Replay:
+    """
+    Re-runs a recorded session headlessly as fast as the simulation allows:
+    the game is rebuilt from the recorded seeds, then every frame executes
+    the recorded commands and advances the simulation with the recorded frame
+    duration and budget cutoffs. Nothing is rendered.
+
+    Every `keyframe_interval` frames the state is kept as an in-memory
+    snapshot; seek() restores the nearest keyframe before the target frame and
+    simulates the rest. The AI decisions are compared with the recorded ones;
+    the first frame where they differ is reported as `desync_frame`.
+    """
+    def __init__(self, path, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL, text_log=False):
+        recording = load_recording(path)
+        header = recording.header
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.frames = np.array(recording["frames"], dtype=np.float64) / 1000.0 # Frame durations in seconds
+        self.commands = _by_frame(recording["commands"],
+                                  lambda row: Command(CommandType(row[1]), row[2], row[3]))
+        self.decisions = _by_frame(recording["decisions"], lambda row: row[1:])
+        self.cutoffs = {frame: (ai or None, combat or None)
+                        for frame, ai, combat in recording["cutoffs"].tolist()}
+
+        self.game = Game(map_seed=header["map_seed"], seed=header["seed"], headless=True, **header.get("setup", {}))
+        self._configure(text_log)
+        self.frame = 0 # Next frame to simulate
+        self.keyframes = {0: self._capture()}
+        self.desync_frame = None
+        self.stopped_at = None # Frame of a load command the replay cannot follow
+        self._frame_decisions = []
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def world(self):
+        return self.game.world
+
+    def _configure(self, text_log):
+        game = self.game
+        # The recorded cutoffs replace the frame budgets; wall-clock dependent parts are off
+        game.ai_scheduler.frame_budget_ms = None
+        game.combat_scheduler.frame_budget_ms = None
+        game.profile_reload_interval = float('inf')
+        game.autosave.enabled = False
+        game.profiler.enabled = False
+        if not text_log:
+            game.world.events.views.clear()
+        game.ai_scheduler.on_decision = self._on_decision
+
+    def _on_decision(self, general, tactic):
+        target = general.target_army.id if general.target_army is not None else -1
+        self._frame_decisions.append((general.army.id, NO_TACTIC if tactic is None else int(tactic), target))
+
+    def step(self):
+        """Simulates the next frame. Returns False at the end of the recording (or at a load it cannot follow)."""
+        frame = self.frame
+        if frame >= len(self.frames) or self.stopped_at is not None:
+            return False
+        game = self.game
+        for command in self.commands.get(frame, ()):
+            if command.type in _LOAD_COMMANDS:
+                self.stopped_at = frame
+                log.warning("Frame %s: the session loaded a saved game; the replay ends here.", frame)
+                return False
+            if command.type not in _SKIPPED_COMMANDS:
+                game.execute_command(command)
+
+        self._frame_decisions = []
+        ai_cutoff, combat_cutoff = self.cutoffs.get(frame, (None, None))
+        game.step(self.frames[frame], ai_cutoff, combat_cutoff)
+        if self.desync_frame is None and self._frame_decisions != self.decisions.get(frame, []):
+            self.desync_frame = frame
+            log.warning("Replay desync at frame %s: AI decisions %s, recorded %s.", frame, self._frame_decisions,
+                        self.decisions.get(frame, []))
+
+        self.frame += 1
+        if self.frame % self.keyframe_interval == 0 and self.frame not in self.keyframes:
+            self.keyframes[self.frame] = self._capture()
+        return True
+
+    def run(self, until=None):
+        """Simulates up to frame `until` (the end by default). Returns the number of frames simulated."""
+        until = len(self.frames) if until is None else min(until, len(self.frames))
+        start = self.frame
+        while self.frame < until and self.step():
+            pass
+        return self.frame - start
+
+    def seek(self, frame):
+        """
+        Jumps to frame `frame`: restores the nearest keyframe at or before it
+        (unless simulating on from the current frame is shorter) and simulates
+        the remaining frames.
+        """
+        frame = max(0, min(frame, len(self.frames)))
+        keyframe = max(k for k in self.keyframes if k <= frame)
+        if frame < self.frame or keyframe > self.frame:
+            self._restore(keyframe)
+        self.run(frame)
+        return self.frame
+
+    def _capture(self):
+        return SnapshotData(*capture_world(self.game.world, self.game))
+
+    def _restore(self, frame):
+        game = self.game
+        world, snapshot = build_world(self.keyframes[frame])
+        world.events = game.world.events
+        restore_game(game, world, snapshot)
+        game.ai_scheduler.on_decision = self._on_decision
+        self.frame = frame
+        self.stopped_at = None
+
+
+def _by_frame(rows, convert):
+    """Groups the rows of a recording section by their frame number: frame -> [convert(row)]."""
+    grouped = {}
+    for row in rows.tolist():
+        grouped.setdefault(row[0], []).append(convert(row))
+    return grouped
+
+
+def replay(path, until=None):
+    """Replays a recording to its end (or frame `until`) and logs how fast it ran. Returns the Replay."""
+    session = Replay(path)
+    start = time.perf_counter()
+    frames = session.run(until)
+    elapsed = time.perf_counter() - start
+    simulated = float(session.frames[:session.frame].sum())
+    log.info("Replayed %s frames (%.0f s of play) in %.2f s (%.0fx).%s", frames, simulated, elapsed,
+             simulated / elapsed if elapsed > 0 else 0.0,
+             "" if session.desync_frame is None else f" Desync at frame {session.desync_frame}.")
+    return session
@@ -0,0 +1,619 @@
+import json
+import os
+import random
+import time
+import numpy as np
+from collections.abc import Sequence
+from .world import GameWorld
+from .combat import Combat
+from .combat_scheduler import CombatScheduler
+from .terrain_config import TERRAIN_TYPES
+from ..game_objects.army import Army
+from ..game_objects.unit import Unit, get_unit_type_record
+from ..game_objects.faction import Faction
+from ..game_objects.territory import Territory
+from ..game_objects.tile import Tile, Road, Bridge, Trap
+from ..ai.general_ai import GeneralAI
+from ..ai.ai_scheduler import AIScheduler
+from ..misc.enums import Stance, CombatType, Tactic
+
+# File layout: MAGIC, uint32 format version, uint32 header length, JSON header,
+# then the array sections, each starting at a multiple of SECTION_ALIGNMENT.
+# The header describes every section (dtype, shape, offset), so sections can be
+# memory-mapped directly.
+MAGIC = b"EWCSNAP\0"
+SNAPSHOT_VERSION = 1
+SECTION_ALIGNMENT = 64
+NO_ID = -1
+
+# Features stored as bits of the "features" section when they have default parameters
+_FEATURE_BITS = ((Road, 1), (Bridge, 2), (Trap, 4))
+_DEFAULT_FEATURES = {cls: vars(cls()) for cls, _ in _FEATURE_BITS}
+_FEATURE_CLASSES = {cls.__name__: cls for cls, _ in _FEATURE_BITS}
+
+_TERRAIN_KEYS = sorted(TERRAIN_TYPES)
+_STANCES = list(Stance)
+_COMBAT_TYPES = list(CombatType)
+
+ARMY_DTYPE = np.dtype([
+    ('id', '<i8'), ('faction', '<i4'), ('x', '<f8'), ('y', '<f8'), ('speed', '<f8'),
+    ('stance', 'u1'), ('in_combat', '?'), ('collision_radius', '<f8'), ('target', '<i8'),
+    ('unit_offset', '<i8'), ('unit_count', '<i4'), ('path_offset', '<i8'), ('path_length', '<i4'),
+    ('path_index', '<i4'),
+])
+UNIT_DTYPE = np.dtype([('type', '<u2'), ('hp', '<f8')])
+LAST_SEEN_DTYPE = np.dtype([('faction', '<i4'), ('army', '<i8'), ('x', '<f8'), ('y', '<f8'), ('time', '<f8')])
+COMBAT_DTYPE = np.dtype([('type', 'u1'), ('round', '<i4'), ('due', '<f8')])
+COMBAT_MEMBER_DTYPE = np.dtype([('combat', '<i4'), ('side', 'u1'), ('army', '<i8')])
+GENERAL_DTYPE = np.dtype([
+    ('army', '<i8'), ('profile', '<i4'), ('overrides', '<i4'), ('target', '<i8'), ('tactic', 'i1'),
+    ('last_recalc', '<f8'), ('path_budget', '<i8'), ('think_count', '<i8'), ('total_think', '<f8'),
+    ('last_think', '<f8'), ('max_think', '<f8'), ('due', '<f8'),
+])
+UNREACHABLE_DTYPE = np.dtype([('general', '<i4'), ('army', '<i8'), ('time', '<f8')])
+INFLUENCE_DTYPE = np.dtype([('army', '<i8'), ('faction', '<i4'), ('x', '<i4'), ('y', '<i4'), ('strength', '<f8')])
+
+
+# ---- Map encoding ----
+
+def _encode_features(features, index, extras):
+    """Bitmask of default features of a tile; features with other parameters go to `extras`."""
+    bits = 0
+    for feature in features:
+        cls = type(feature)
+        if cls in _DEFAULT_FEATURES and vars(feature) == _DEFAULT_FEATURES[cls]:
+            bits |= dict(_FEATURE_BITS)[cls]
+        else:
+            extras.setdefault(str(index), []).append({"class": cls.__name__, "state": vars(feature)})
+    return bits
+
+
+def encode_map(map_data):
+    """
+    Encodes the tile grid as (height, width) arrays: terrain index (into the
+    sorted TERRAIN_TYPES keys), territory id (-1 for none) and a feature
+    bitmask. Returns (terrain, territory, features, extras); `extras` holds the
+    features with non-default parameters, keyed by flat tile index.
+    Rows of a LazyMapData that were never materialized are copied from its arrays.
+    """
+    height = len(map_data)
+    width = len(map_data[0]) if height else 0
+    terrain = np.empty((height, width), dtype=np.uint8)
+    territory = np.empty((height, width), dtype=np.int32)
+    features = np.zeros((height, width), dtype=np.uint8)
+    extras = {}
+    terrain_index = {key: i for i, key in enumerate(_TERRAIN_KEYS)}
+    lazy = map_data if isinstance(map_data, LazyMapData) else None
+
+    for y in range(height):
+        if lazy is not None and not lazy.is_materialized(y):
+            terrain[y], territory[y], features[y] = lazy.terrain[y], lazy.territory[y], lazy.features[y]
+            extras.update(lazy.extras_of_row(y))
+            continue
+        row = map_data[y]
+        terrain[y] = [terrain_index[tile.base_terrain.key] for tile in row]
+        territory[y] = [NO_ID if tile.territory_id is None else tile.territory_id for tile in row]
+        for x, tile in enumerate(row):
+            if tile.features:
+                features[y, x] = _encode_features(tile.features, y * width + x, extras)
+    return terrain, territory, features, extras
+
+
+def encode_tiles(map_data, coordinates):
+    """
+    Encodes single tiles given as (x, y): returns (flat indices, terrain, territory,
+    features, extras), with the same encoding as encode_map.
+    """
+    width = len(map_data[0]) if len(map_data) else 0
+    terrain_index = {key: i for i, key in enumerate(_TERRAIN_KEYS)}
+    coordinates = sorted(coordinates, key=lambda xy: (xy[1], xy[0]))
+    indices = np.array([y * width + x for x, y in coordinates], dtype=np.int64)
+    terrain = np.empty(len(coordinates), dtype=np.uint8)
+    territory = np.empty(len(coordinates), dtype=np.int32)
+    features = np.zeros(len(coordinates), dtype=np.uint8)
+    extras = {}
+    for i, (x, y) in enumerate(coordinates):
+        tile = map_data[y][x]
+        terrain[i] = terrain_index[tile.base_terrain.key]
+        territory[i] = NO_ID if tile.territory_id is None else tile.territory_id
+        if tile.features:
+            features[i] = _encode_features(tile.features, int(indices[i]), extras)
+    return indices, terrain, territory, features, extras
+
+
+class LazyMapData(Sequence):
+    """
+    map_data backed by the snapshot arrays: rows of Tile objects are created
+    on first access, so a loaded world does not pay for tiles it never reads.
+    Behaves like the list of rows produced by generate_map.
+    """
+    def __init__(self, terrain, territory, features, extras):
+        self.terrain = terrain
+        self.territory = territory
+        self.features = features
+        self.extras = extras
+        self._extras_by_row = {}
+        width = terrain.shape[1] if terrain.ndim == 2 else 0
+        for key in extras:
+            self._extras_by_row.setdefault(int(key) // width, []).append(key)
+        self._rows = [None] * len(terrain)
+        self._terrains = [TERRAIN_TYPES[key] for key in _TERRAIN_KEYS]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [self[i] for i in range(*y.indices(len(self)))]
+        row = self._rows[y]
+        if row is None:
+            row = self._rows[y] = self._build_row(y if y >= 0 else y + len(self))
+        return row
+
+    def is_materialized(self, y):
+        return self._rows[y] is not None
+
+    def extras_of_row(self, y):
+        return {key: self.extras[key] for key in self._extras_by_row.get(y, ())}
+
+    def _build_row(self, y):
+        terrains = self._terrains
+        width = self.terrain.shape[1]
+        territory = self.territory[y].tolist()
+        row = [Tile(terrains[t], None, None if territory[x] == NO_ID else territory[x])
+               for x, t in enumerate(self.terrain[y].tolist())]
+        for x in np.flatnonzero(self.features[y]).tolist():
+            bits = int(self.features[y, x])
+            row[x].features = [cls() for cls, bit in _FEATURE_BITS if bits & bit]
+        for key in self._extras_by_row.get(y, ()):
+            for extra in self.extras[key]:
+                cls = _FEATURE_CLASSES[extra["class"]]
+                feature = cls.__new__(cls)
+                vars(feature).update(extra["state"])
+                row[int(key) % width].features.append(feature)
+        return row
+
+
+# ---- File format ----
+
+def write_snapshot(path, header, sections):
+    """Writes the header and the named arrays; sections are aligned so they can be memory-mapped."""
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        sections[name] = array
+        layout[name] = {"dtype": _dtype_to_json(array.dtype), "shape": list(array.shape), "offset": offset,
+                        "nbytes": array.nbytes}
+        offset += -(-array.nbytes // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+    header = dict(header, version=SNAPSHOT_VERSION, sections=layout)
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = len(MAGIC) + 8 + len(header_bytes)
+    data_start = -(-prefix // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+    header["data_start"] = data_start
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.array([SNAPSHOT_VERSION, len(header_bytes)], dtype='<u4').tobytes())
+        file.write(header_bytes)
+        for name, array in sections.items():
+            file.seek(data_start + layout[name]["offset"])
+            array.tofile(file)
+        file.truncate(data_start + offset)
+    os.replace(tmp_path, path) # A crash while saving never leaves a half-written snapshot behind
+
+
+class Snapshot:
+    """
+    An opened snapshot file: the JSON header plus its sections, memory-mapped
+    (read-only) on first access.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a snapshot file: {path}")
+            version, header_length = np.frombuffer(file.read(8), dtype='<u4').tolist()
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION}): {path}")
+            self.header = json.loads(file.read(header_length))
+        prefix = len(MAGIC) + 8 + header_length
+        self.data_start = -(-prefix // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+        self._arrays = {}
+
+    def __getitem__(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            section = self.header["sections"][name]
+            dtype = _dtype_from_json(section["dtype"])
+            shape = tuple(section["shape"])
+            if section["nbytes"] == 0:
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                array = np.memmap(self.path, dtype=dtype, mode='r', offset=self.data_start + section["offset"],
+                                  shape=shape)
+            self._arrays[name] = array
+        return array
+
+
+class SnapshotData:
+    """Snapshot kept in memory (header and sections), e.g. a base snapshot with its deltas applied."""
+    def __init__(self, header, sections):
+        self.header = dict(header, sections={name: None for name in sections})
+        self.sections = sections
+
+    def __getitem__(self, name):
+        return self.sections[name]
+
+
+# ---- World ----
+
+def save_world(path, world, game=None):
+    """
+    Saves the world (and, with `game`, its AI generals and scheduler state)
+    to a snapshot file. Returns the number of bytes written.
+    """
+    header, sections = capture_world(world, game)
+    write_snapshot(path, header, sections)
+    return os.path.getsize(path)
+
+
+def capture_world(world, game=None):
+    """Encodes the whole world as (header, sections), ready for write_snapshot."""
+    sections = {}
+    terrain, territory, features, feature_extras = encode_map(world.map_data)
+    sections.update(terrain=terrain, territory=territory, features=features)
+    # Copies: the sections never share memory with the live world, so they can be written from another thread
+    for name in ("movement_cost_raster", "defense_bonus_raster"):
+        if getattr(world, name) is not None:
+            sections[name] = getattr(world, name).copy()
+    if world.knowledge.vision_radius is not None:
+        sections["vision_radius"] = world.knowledge.vision_radius.copy()
+
+    header, state_sections = capture_state(world, game)
+    # Influence fields as of the last update (they lag behind the armies by up to UPDATE_INTERVAL)
+    faction_index = faction_index_of(world)
+    fields = [(faction_index[id(faction)], field) for faction, field in world.influence.strength.items()
+              if id(faction) in faction_index]
+    header["influence_factions"] = [slot for slot, _ in fields]
+    sections["influence_fields"] = np.array([field for _, field in fields], dtype=np.float32) \
+        .reshape(len(fields), world.height, world.width)
+    army_rows, units, paths, type_keys = encode_armies(world.armies, faction_index_of(world))
+    sections.update(state_sections, armies=army_rows, units=units, paths=paths)
+    header.update(width=world.width, height=world.height, terrain_keys=_TERRAIN_KEYS, unit_types=type_keys,
+                  feature_extras=feature_extras)
+    return header, sections
+
+
+def _factions_of(world):
+    """The world's factions followed by factions that only own armies; their order defines faction indices."""
+    factions = list(world.factions)
+    for army in world.armies:
+        if army.faction not in factions:
+            factions.append(army.faction)
+    return factions
+
+
+def faction_index_of(world):
+    """id(faction) -> index into the "factions" list of a header captured from `world`."""
+    return {id(faction): index for index, faction in enumerate(_factions_of(world))}
+
+
+def encode_armies(armies, faction_index):
+    """
+    Flat arrays of the given armies: one ARMY_DTYPE row per army, their units
+    (UNIT_DTYPE, referenced by unit_offset/unit_count) and path waypoints
+    (referenced by path_offset/path_length). Returns (rows, units, paths, unit type keys).
+    """
+    type_keys = sorted({unit.type_record.unit_type for army in armies for unit in army.units})
+    type_index = {key: i for i, key in enumerate(type_keys)}
+    stance_index = {stance: i for i, stance in enumerate(_STANCES)}
+    army_rows = np.zeros(len(armies), dtype=ARMY_DTYPE)
+    unit_counts = [len(army.units) for army in armies]
+    path_lengths = [len(army.path) for army in armies]
+    army_rows['id'] = [army.id for army in armies]
+    army_rows['faction'] = [faction_index[id(army.faction)] for army in armies]
+    army_rows['x'] = [army.x for army in armies]
+    army_rows['y'] = [army.y for army in armies]
+    army_rows['speed'] = [army.speed for army in armies]
+    army_rows['stance'] = [stance_index[army.stance] for army in armies]
+    army_rows['in_combat'] = [army.in_combat for army in armies]
+    army_rows['collision_radius'] = [army.collision_radius for army in armies]
+    army_rows['target'] = [army.target_entity.id if army.target_entity is not None else NO_ID for army in armies]
+    army_rows['unit_count'] = unit_counts
+    army_rows['unit_offset'] = np.concatenate(([0], np.cumsum(unit_counts)[:-1])) if armies else []
+    army_rows['path_length'] = path_lengths
+    army_rows['path_offset'] = np.concatenate(([0], np.cumsum(path_lengths)[:-1])) if armies else []
+    army_rows['path_index'] = [army.path_index for army in armies]
+    units = np.zeros(sum(unit_counts), dtype=UNIT_DTYPE)
+    units['type'] = [type_index[unit.type_record.unit_type] for army in armies for unit in army.units]
+    units['hp'] = [unit.hp for army in armies for unit in army.units]
+    paths = np.array([point for army in armies for point in army.path], dtype=np.float64).reshape(-1, 2)
+    return army_rows, units, paths, type_keys
+
+
+def capture_state(world, game=None):
+    """
+    The part of the world that is small and changes all the time: clock,
+    factions and territories, fog of war, combats, RNG state and (with `game`)
+    the AI generals and schedulers. Returns (header, sections); armies and map
+    are not included.
+    """
+    factions = _factions_of(world)
+    faction_index = faction_index_of(world)
+    sections = {}
+
+    # What every faction knows
+    knowledge = world.knowledge
+    known_factions = factions if knowledge.vision_radius is not None else []
+    if known_factions:
+        sections["explored"] = np.array([knowledge.of(faction).explored for faction in known_factions], dtype=bool) \
+            .reshape(len(known_factions), *knowledge.vision_radius.shape)
+    last_seen = [(faction_index[id(faction)], army.id, x, y, seen_time)
+                 for faction in known_factions
+                 for army, (x, y, seen_time) in knowledge.of(faction).last_seen.items()]
+    sections["last_seen"] = np.array(last_seen, dtype=LAST_SEEN_DTYPE)
+
+    # Active combats, their participants and round schedule
+    combats = list(world.engagements)
+    combat_rows = np.zeros(len(combats), dtype=COMBAT_DTYPE)
+    members = []
+    for index, combat in enumerate(combats):
+        due = game.combat_scheduler.due_time(combat) if game is not None else None
+        combat_rows[index] = (_COMBAT_TYPES.index(combat.combat_type), combat.round_number,
+                              np.nan if due is None else due)
+        members.extend((index, side_index, army.id) for side_index, side in enumerate(combat.sides) for army in side)
+    sections.update(combats=combat_rows, combat_members=np.array(members, dtype=COMBAT_MEMBER_DTYPE))
+
+    # What the influence fields are made of, including deposits of armies removed since the last update
+    deposits = [(army.id, faction_index.get(id(army.faction), NO_ID), x, y, strength)
+                for army, (x, y, strength) in world.influence.deposits.items()]
+    sections["influence_deposits"] = np.array(deposits, dtype=INFLUENCE_DTYPE)
+
+    header = {
+        "saved_at": time.time(),
+        "time": world.time,
+        "next_army_id": world.next_army_id,
+        "factions": [{"name": faction.name, "color": faction.color} for faction in factions],
+        "world_factions": len(world.factions),
+        "known_factions": [faction_index[id(faction)] for faction in known_factions],
+        "territories": [{"id": t.id, "name": t.name,
+                         "owner": faction_index.get(id(t.owner_faction)) if t.owner_faction else None}
+                        for t in world.territories],
+        "random_state": _encode_random_state(random.getstate()),
+        "influence_schedule": list(world.influence.schedule),
+    }
+    if game is not None:
+        _save_game_state(game, header, sections)
+    return header, sections
+
+
+def _save_game_state(game, header, sections):
+    generals = game.ai_generals
+    profiles = sorted({general.profile_name for general in generals})
+    overrides = [general.overrides for general in generals if general.overrides]
+    rows = np.zeros(len(generals), dtype=GENERAL_DTYPE)
+    unreachable = []
+    override_index = 0
+    for index, general in enumerate(generals):
+        due = game.ai_scheduler.due_time(general)
+        if general.overrides:
+            override_slot = override_index
+            override_index += 1
+        else:
+            override_slot = NO_ID
+        rows[index] = (general.army.id, profiles.index(general.profile_name), override_slot,
+                       general.target_army.id if general.target_army is not None else NO_ID, int(general.tactic),
+                       general.last_recalc_time, general.path_budget, general.think_count,
+                       general.total_think_time, general.last_think_time, general.max_think_time,
+                       np.nan if due is None else due)
+        unreachable.extend((index, army_id, marked) for army_id, marked in general.unreachable_targets.items())
+    sections.update(generals=rows, unreachable=np.array(unreachable, dtype=UNREACHABLE_DTYPE))
+    header.update(profiles=profiles, overrides=overrides, ai_clock=game.ai_scheduler.clock,
+                  combat_clock=game.combat_scheduler.clock, map_seed=getattr(game, "map_seed", None),
+                  ai_phase=game.ai_scheduler._phase_index, combat_phase=game.combat_scheduler._phase_index)
+
+
+def _dtype_to_json(dtype):
+    """JSON form of a dtype: its string for plain dtypes, [[name, string], ...] for structured ones."""
+    if dtype.names is None:
+        return dtype.str
+    return [[name, dtype.fields[name][0].str] for name in dtype.names]
+
+
+def _dtype_from_json(value):
+    if isinstance(value, str):
+        return np.dtype(value)
+    return np.dtype([(name, type_string) for name, type_string in value])
+
+
+def _encode_random_state(state):
+    version, internal, gauss = state
+    return [version, list(internal), gauss]
+
+
+def load_world(path):
+    """
+    Loads a snapshot into a new GameWorld. Tiles are created lazily
+    (LazyMapData), the rasters and fog-of-war layers are copied straight from
+    the file, and the influence fields are restored as of their last update.
+    Returns (world, snapshot); pass both to restore_game to bring back the AI
+    as well.
+    """
+    return build_world(Snapshot(path))
+
+
+def build_world(snapshot):
+    """Builds a GameWorld from an opened Snapshot (or SnapshotData). Returns (world, snapshot)."""
+    header = snapshot.header
+    world = GameWorld(width=header["width"], height=header["height"])
+    world.time = header["time"]
+
+    factions = [Faction(f["name"], tuple(f["color"]) if isinstance(f["color"], list) else f["color"])
+                for f in header["factions"]]
+    world.factions = factions[:header["world_factions"]]
+    world.map_data = LazyMapData(np.array(snapshot["terrain"]), np.array(snapshot["territory"]),
+                                 np.array(snapshot["features"]), header["feature_extras"])
+    territories = []
+    for entry in header["territories"]:
+        territory = Territory(entry["id"], entry["name"])
+        territory.owner_faction = factions[entry["owner"]] if entry["owner"] is not None else None
+        territories.append(territory)
+    _attach_territory_tiles(territories, world.map_data.territory)
+    world.territories = territories
+
+    sections = header["sections"]
+    if "movement_cost_raster" in sections:
+        world.movement_cost_raster = np.array(snapshot["movement_cost_raster"])
+    if "defense_bonus_raster" in sections:
+        world.defense_bonus_raster = np.array(snapshot["defense_bonus_raster"])
+    if "vision_radius" in sections:
+        world.knowledge.vision_radius = np.array(snapshot["vision_radius"])
+        explored = snapshot["explored"]
+        for layer, faction_slot in enumerate(header["known_factions"]):
+            world.knowledge.of(factions[faction_slot]).explored[:] = explored[layer]
+
+    armies = _load_armies(snapshot, factions, header["unit_types"])
+    by_id = {army.id: army for army in armies}
+    for army, target in zip(armies, snapshot["armies"]['target'].tolist()):
+        army.target_entity = by_id.get(target)
+    world.add_armies(armies)
+    world.next_army_id = max(world.next_army_id, header.get("next_army_id", 0))
+    for faction in factions:
+        faction.armies = [army for army in armies if army.faction is faction]
+
+    for row in snapshot["last_seen"].tolist():
+        faction_slot, army_id, x, y, seen_time = row
+        army = by_id.get(army_id)
+        if army is not None:
+            world.knowledge.of(factions[faction_slot]).last_seen[army] = (x, y, seen_time)
+    world.knowledge.clock = world.time
+
+    # Combats: participants in side order, lead army first
+    combat_sides = [([], []) for _ in range(len(snapshot["combats"]))]
+    for combat_slot, side, army_id in snapshot["combat_members"].tolist():
+        combat_sides[combat_slot][side].append(by_id[army_id])
+    for (combat_type, round_number, _due), sides in zip(snapshot["combats"].tolist(), combat_sides):
+        world.engagements.add(Combat.restore(sides, world, _COMBAT_TYPES[combat_type], round_number))
+
+    if "influence_schedule" in header and world.movement_cost_raster is not None:
+        _restore_influence(world, snapshot, factions, by_id)
+    elif world.movement_cost_raster is not None:
+        world.build_influence()
+    random.setstate((header["random_state"][0], tuple(header["random_state"][1]), header["random_state"][2]))
+    return world, snapshot
+
+
+class _RemovedArmy:
+    """Stands in for an army removed after the last influence update, whose deposit is still in the fields."""
+    __slots__ = ("id", "faction")
+
+    def __init__(self, army_id, faction):
+        self.id = army_id
+        self.faction = faction
+
+
+def _restore_influence(world, snapshot, factions, by_id):
+    """Restores the influence fields as saved (or rebuilds them from the saved deposits) and their update schedule."""
+    header = snapshot.header
+    deposits = {}
+    for army_id, faction_slot, x, y, strength in snapshot["influence_deposits"].tolist():
+        army = by_id.get(army_id)
+        if army is None:
+            army = _RemovedArmy(army_id, factions[faction_slot] if faction_slot != NO_ID else None)
+        deposits[army] = (x, y, strength)
+    fields = None
+    if "influence_fields" in header["sections"]:
+        fields = {factions[slot]: np.array(field)
+                  for slot, field in zip(header["influence_factions"], snapshot["influence_fields"])}
+    world.influence.restore(deposits, tuple(header["influence_schedule"]), fields)
+
+
+def _attach_territory_tiles(territories, territory_raster):
+    """Territory.tiles lists, built from the territory id raster with one sort instead of a loop over tiles."""
+    flat = territory_raster.ravel()
+    order = np.argsort(flat, kind='stable')
+    ids, starts = np.unique(flat[order], return_index=True)
+    bounds = dict(zip(ids.tolist(), zip(starts.tolist(), np.append(starts[1:], len(flat)).tolist())))
+    width = territory_raster.shape[1]
+    for territory in territories:
+        start, end = bounds.get(territory.id, (0, 0))
+        indices = order[start:end]
+        territory.tiles = list(zip((indices % width).tolist(), (indices // width).tolist()))
+
+
+def _load_armies(snapshot, factions, unit_types):
+    records = [get_unit_type_record(key) for key in unit_types]
+    unit_rows = snapshot["units"]
+    unit_types_column = unit_rows['type'].tolist()
+    unit_hp = unit_rows['hp'].tolist()
+    paths = snapshot["paths"].tolist()
+    armies = []
+    for row in snapshot["armies"].tolist():
+        (army_id, faction, x, y, speed, stance, in_combat, collision_radius, _target,
+         unit_offset, unit_count, path_offset, path_length, path_index) = row
+        units = [Unit.restore(records[unit_types_column[i]], unit_hp[i])
+                 for i in range(unit_offset, unit_offset + unit_count)]
+        army = Army(factions[faction], x, y, units)
+        army.id = army_id
+        army.speed = speed
+        army.stance = _STANCES[stance]
+        army.in_combat = in_combat
+        army.collision_radius = collision_radius
+        army.path = [tuple(point) for point in paths[path_offset:path_offset + path_length]]
+        army.path_index = path_index
+        armies.append(army)
+    return armies
+
+
+def restore_game(game, world, snapshot):
+    """
+    Puts a loaded world into a Game: replaces its world, re-creates the AI
+    generals with their state and restores both schedulers.
+    """
+    header = snapshot.header
+    game.world = world
+    game.combat_scheduler = CombatScheduler(tick_rate=game.combat_scheduler.tick_rate,
+                                            frame_budget_ms=game.combat_scheduler.frame_budget_ms)
+    game.combat_scheduler.clock = header.get("combat_clock", world.time)
+    game.combat_scheduler._phase_index = header.get("combat_phase", 0)
+    # The engagement index keeps insertion order, which is the order of the combats section
+    for combat, due in zip(list(world.engagements), snapshot["combats"]['due'].tolist()):
+        game.combat_scheduler.add(combat, None if np.isnan(due) else due)
+
+    game.ai_scheduler = AIScheduler(game.ai_scheduler.frame_budget_ms, game.ai_scheduler.batch_size)
+    game.ai_scheduler.clock = header.get("ai_clock", world.time)
+    game.ai_scheduler._phase_index = header.get("ai_phase", 0)
+    game.ai_generals = []
+    if "generals" not in header["sections"]:
+        return
+    by_id = {army.id: army for army in world.armies}
+    profiles = header["profiles"]
+    overrides = header["overrides"]
+    generals = []
+    for row in snapshot["generals"].tolist():
+        (army_id, profile, override_slot, target, tactic, last_recalc, path_budget, think_count,
+         total_think, last_think, max_think, due) = row
+        army = by_id.get(army_id)
+        if army is None:
+            generals.append(None) # Keeps the slots of the unreachable section aligned
+            continue
+        general = GeneralAI(profiles[profile], army, overrides[override_slot] if override_slot != NO_ID else None)
+        general.target_army = by_id.get(target)
+        general.tactic = Tactic(tactic)
+        general.last_recalc_time = last_recalc
+        general.path_budget = path_budget
+        general.think_count = think_count
+        general.total_think_time = total_think
+        general.last_think_time = last_think
+        general.max_think_time = max_think
+        generals.append(general)
+        game.ai_generals.append(general)
+        game.ai_scheduler.add(general, None if np.isnan(due) else due)
+    for general_slot, army_id, marked in snapshot["unreachable"].tolist():
+        general = generals[general_slot]
+        if general is None:
+            continue
+        general.unreachable_targets[army_id] = marked
+        general._next_unreachable_expiry = min(general._next_unreachable_expiry, marked + general.unreachable_cooldown)
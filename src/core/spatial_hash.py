@@ -0,0 +1,236 @@
+import heapq
+import itertools
+
+# Соседние ячейки "впереди" текущей: при обходе всех ячеек каждая пара соседей
+# проверяется ровно один раз.
+_FORWARD_NEIGHBORS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+# Смещения ячеек по кольцам (кольцо r — граница квадрата со стороной 2r + 1)
+_RING_OFFSETS = [((0, 0),)]
+
+
+def _ring_offsets(ring):
+    """Возвращает смещения ячеек кольца `ring` вокруг центральной ячейки (кэшируются)."""
+    while len(_RING_OFFSETS) <= ring:
+        r = len(_RING_OFFSETS)
+        offsets = [(dx, -r) for dx in range(-r, r + 1)] + [(dx, r) for dx in range(-r, r + 1)]
+        offsets += [(-r, dy) for dy in range(-r + 1, r)] + [(r, dy) for dy in range(-r + 1, r)]
+        _RING_OFFSETS.append(tuple(offsets))
+    return _RING_OFFSETS[ring]
+
+
+class SpatialHash:
+    """
+    Равномерная сетка-индекс армий: армии раскладываются по ячейкам размера
+    `cell_size` тайлов. Запросы столкновений проверяют только соседние ячейки,
+    а не все армии мира.
+
+    Размер ячейки должен быть не меньше максимальной дистанции столкновения,
+    иначе соседние по ячейкам армии могут быть пропущены.
+    """
+    def __init__(self, cell_size=2.0):
+        self.cell_size = cell_size
+        self._cells = {}  # (cx, cy) -> {army: None} (словарь как упорядоченное множество)
+        self._army_cells = {}  # army -> (cx, cy)
+        self._order = {}  # army -> порядковый номер добавления (для стабильного порядка пар)
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._army_cells)
+
+    def __contains__(self, army):
+        return army in self._army_cells
+
+    def cell_of(self, x, y):
+        """Возвращает координаты ячейки для точки мира."""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, army):
+        """Добавляет армию в индекс."""
+        if army in self._army_cells:
+            self.move(army)
+            return
+        cell = self.cell_of(army.x, army.y)
+        self._army_cells[army] = cell
+        self._order[army] = next(self._counter)
+        self._cells.setdefault(cell, {})[army] = None
+
+    def remove(self, army):
+        """Удаляет армию из индекса."""
+        cell = self._army_cells.pop(army, None)
+        if cell is None:
+            return
+        self._order.pop(army, None)
+        bucket = self._cells[cell]
+        del bucket[army]
+        if not bucket:
+            del self._cells[cell]
+
+    def move(self, army):
+        """Обновляет ячейку армии после перемещения. Дёшево, если ячейка не изменилась."""
+        old_cell = self._army_cells.get(army)
+        if old_cell is None:
+            return
+        new_cell = self.cell_of(army.x, army.y)
+        if new_cell == old_cell:
+            return
+        bucket = self._cells[old_cell]
+        del bucket[army]
+        if not bucket:
+            del self._cells[old_cell]
+        self._army_cells[army] = new_cell
+        self._cells.setdefault(new_cell, {})[army] = None
+
+    def query_radius(self, x, y, radius):
+        """Возвращает армии, находящиеся не дальше `radius` тайлов от точки (x, y)."""
+        min_cx, min_cy = self.cell_of(x - radius, y - radius)
+        max_cx, max_cy = self.cell_of(x + radius, y + radius)
+        radius_sq = radius * radius
+        result = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self._cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for army in bucket:
+                    if (army.x - x) ** 2 + (army.y - y) ** 2 <= radius_sq:
+                        result.append(army)
+        return result
+
+    def nearest(self, x, y, k=1, predicate=None, max_radius=None):
+        """
+        Возвращает до `k` ближайших к точке армий в виде списка (дистанция, армия),
+        отсортированного по дистанции. `predicate(army)` отсекает неподходящих,
+        `max_radius` ограничивает поиск. Ячейки обходятся кольцами от центра;
+        если колец становится больше, чем занятых ячеек, оставшиеся ячейки
+        просматриваются напрямую (разреженный мир).
+        """
+        if not self._cells or k <= 0:
+            return []
+        cells = self._cells
+        cell_size = self.cell_size
+        cx, cy = self.cell_of(x, y)
+        best = []  # Куча (-дистанция, порядок, армия) из k лучших
+        order = self._order
+        examined = 0
+
+        ring = 0
+        while True:
+            for dx, dy in _ring_offsets(ring):
+                bucket = cells.get((cx + dx, cy + dy))
+                if not bucket:
+                    continue
+                for army in bucket:
+                    if predicate is not None and not predicate(army):
+                        continue
+                    distance = ((army.x - x) ** 2 + (army.y - y) ** 2) ** 0.5
+                    if max_radius is not None and distance > max_radius:
+                        continue
+                    item = (-distance, -order[army], army)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            examined += len(_ring_offsets(ring))
+
+            # Всё, что дальше этого кольца, находится не ближе расстояния от точки до его внешней границы
+            reach = min(x - (cx - ring) * cell_size, (cx + ring + 1) * cell_size - x,
+                        y - (cy - ring) * cell_size, (cy + ring + 1) * cell_size - y)
+            if len(best) == k and -best[0][0] <= reach:
+                break
+            if max_radius is not None and reach > max_radius:
+                break
+            if examined >= len(cells):
+                # Колец больше, чем занятых ячеек: досматриваем оставшиеся ячейки напрямую
+                for (bx, by), bucket in cells.items():
+                    if max(abs(bx - cx), abs(by - cy)) <= ring:
+                        continue
+                    for army in bucket:
+                        if predicate is not None and not predicate(army):
+                            continue
+                        distance = ((army.x - x) ** 2 + (army.y - y) ** 2) ** 0.5
+                        if max_radius is not None and distance > max_radius:
+                            continue
+                        item = (-distance, -order[army], army)
+                        if len(best) < k:
+                            heapq.heappush(best, item)
+                        elif item > best[0]:
+                            heapq.heapreplace(best, item)
+                break
+            ring += 1
+
+        return [(-neg_distance, army) for neg_distance, _, army in sorted(best, reverse=True)]
+
+    def candidate_pairs(self):
+        """
+        Перебирает пары армий из одной или соседних ячеек — кандидатов на
+        столкновение. Каждая пара выдаётся один раз, в порядке добавления армий.
+        """
+        order = self._order
+        for (cx, cy), bucket in list(self._cells.items()):
+            armies = list(bucket)
+            for i, army1 in enumerate(armies):
+                for army2 in armies[i + 1:]:
+                    yield (army1, army2) if order[army1] < order[army2] else (army2, army1)
+            for dx, dy in _FORWARD_NEIGHBORS:
+                neighbor = self._cells.get((cx + dx, cy + dy))
+                if not neighbor:
+                    continue
+                for army1 in armies:
+                    for army2 in list(neighbor):
+                        yield (army1, army2) if order[army1] < order[army2] else (army2, army1)
+
+
+class FactionSpatialIndex:
+    """
+    Индекс армий по фракциям: отдельная сетка `SpatialHash` на каждую фракцию.
+    Используется ИИ для поиска вражеских целей — запрос к сеткам вражеских
+    фракций не перебирает свои армии. Общий для всех генералов и обновляется
+    вместе с перемещением армий.
+    """
+    def __init__(self, cell_size=8.0):
+        self.cell_size = cell_size
+        self._by_faction = {}  # faction -> SpatialHash
+
+    def insert(self, army):
+        index = self._by_faction.get(army.faction)
+        if index is None:
+            index = self._by_faction[army.faction] = SpatialHash(self.cell_size)
+        index.insert(army)
+
+    def remove(self, army):
+        index = self._by_faction.get(army.faction)
+        if index is not None:
+            index.remove(army)
+
+    def move(self, army):
+        index = self._by_faction.get(army.faction)
+        if index is not None:
+            index.move(army)
+
+    def nearest_enemies(self, army, k=1, exclude_ids=None, max_radius=None):
+        """
+        Возвращает до `k` ближайших вражеских армий как список (дистанция, армия).
+        Армии с id из `exclude_ids` (например, недостижимые цели) пропускаются.
+        """
+        predicate = None
+        if exclude_ids:
+            predicate = lambda other: other.id not in exclude_ids
+        found = []
+        for faction, index in self._by_faction.items():
+            if faction == army.faction:
+                continue
+            found.extend(index.nearest(army.x, army.y, k, predicate, max_radius))
+        found.sort(key=lambda item: item[0])
+        return found[:k]
+
+    def enemies_within(self, army, radius, exclude_ids=None):
+        """Возвращает вражеские армии в радиусе `radius` тайлов."""
+        result = []
+        for faction, index in self._by_faction.items():
+            if faction == army.faction:
+                continue
+            for other in index.query_radius(army.x, army.y, radius):
+                if not exclude_ids or other.id not in exclude_ids:
+                    result.append(other)
+        return result
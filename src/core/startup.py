@@ -0,0 +1,119 @@
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# How many imports the report lists (by cumulative time)
+REPORT_IMPORTS = 15
+
+
+class ImportTimer:
+    """
+    Times first imports the way `python -X importtime` does: for every module
+    imported while the timer is installed, the cumulative time (including the
+    modules it imports) and the self time. Works by wrapping builtins.__import__,
+    so only import statements are seen (not importlib.import_module), and only
+    those of the thread that installed it.
+    """
+    def __init__(self):
+        self.records = [] # (name, self_ms, cumulative_ms, depth) in completion order
+        self._stack = [] # Time spent in nested imports of the imports in progress
+        self._original = None
+        self._thread = None
+
+    def __enter__(self):
+        self._original = builtins.__import__
+        self._thread = threading.get_ident()
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original
+        return False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original
+        if threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+        full_name = name
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            try:
+                full_name = importlib.util.resolve_name("." * level + name, package)
+            except ImportError:
+                return original(name, globals, locals, fromlist, level)
+        if full_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.records.append((full_name, (cumulative - nested) * 1000.0, cumulative * 1000.0, len(self._stack)))
+
+    def slowest(self, count=REPORT_IMPORTS):
+        """The `count` imports with the largest cumulative time."""
+        return sorted(self.records, key=lambda record: record[2], reverse=True)[:count]
+
+
+class StartupTimer:
+    """
+    Wall-clock timeline of the startup: stages (imports, window, map
+    generation, pre-render...) and marks (first frame, world ready), measured
+    from when this module was imported. Stages may run in the map loading
+    thread. Always recorded (it is a handful of entries); report() logs the
+    breakdown when `enabled` (main.py --startup-timing).
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.stages = [] # (name, start_s, duration_s, thread name)
+        self.marks = [] # (name, time_s)
+        self.imports = None # ImportTimer of the startup imports, if they were timed
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, start - self.origin, time.perf_counter() - start,
+                                threading.current_thread().name))
+
+    def mark(self, name):
+        """Records that `name` happened now; only the first mark of a name is kept."""
+        if all(mark != name for mark, _ in self.marks):
+            self.marks.append((name, self.elapsed()))
+
+    def time_imports(self):
+        """Returns an ImportTimer for the startup imports (install it with `with`); report() includes its results."""
+        self.imports = ImportTimer()
+        return self.imports
+
+    def report(self, log):
+        """Logs the startup breakdown if enabled."""
+        if not self.enabled:
+            return
+        lines = ["Startup timing (ms since start):", f"{'stage':<32}{'start':>9}{'duration':>10}  thread"]
+        for name, start, duration, thread in sorted(self.stages, key=lambda stage: stage[1]):
+            lines.append(f"{name:<32}{start * 1000:>9.1f}{duration * 1000:>10.1f}  {thread}")
+        for name, at in self.marks:
+            lines.append(f"{name:<32}{at * 1000:>9.1f}")
+        if self.imports is not None and self.imports.records:
+            lines.append("Slowest imports (self | cumulative ms):")
+            for name, self_ms, cumulative_ms, depth in self.imports.slowest():
+                lines.append(f"{self_ms:>9.1f} | {cumulative_ms:>9.1f} | {'  ' * depth}{name}")
+        log.info("%s", "\n".join(lines))
+
+
+STARTUP = StartupTimer()
@@ -31,33 +31,33 @@ TERRAIN_TYPES = {
                     unit_modifiers={"light_cavalry": {"attack_bonus": 2}, "horse_archer": {"attack_bonus": 1}}, key="STEPPE"),
 
     # --- Леса ---
-    "CONIFEROUS_FOREST": Terrain(name="Coniferous Forest", movement_cost=2.0, defense_bonus=5, color=(0, 100, 0),
+    "CONIFEROUS_FOREST": Terrain(name="Coniferous Forest", movement_cost=2.0, defense_bonus=5, visibility_modifier=0.6, color=(0, 100, 0),
                                unit_modifiers={"light_cavalry": {"attack_bonus": -2, "defense_bonus": -1},
                                                "heavy_cavalry": {"attack_bonus": -5, "defense_bonus": -3}}, key="CONIFEROUS_FOREST"),
-    "DECIDUOUS_FOREST": Terrain(name="Deciduous Forest", movement_cost=2.5, defense_bonus=7, color=(34, 139, 34),
+    "DECIDUOUS_FOREST": Terrain(name="Deciduous Forest", movement_cost=2.5, defense_bonus=7, visibility_modifier=0.5, color=(34, 139, 34),
                                 unit_modifiers={"light_cavalry": {"attack_bonus": -4, "defense_bonus": -2},
                                                 "heavy_cavalry": {"attack_bonus": -7, "defense_bonus": -5},
                                                 "horse_archer": {"attack_bonus": -3}}, key="DECIDUOUS_FOREST"),
-    "DARK_FOREST": Terrain(name="Dark Forest", movement_cost=3.5, defense_bonus=10, color=(0, 51, 0), key="DARK_FOREST"),
-    "WOODLAND": Terrain(name="Woodland", movement_cost=1.2, defense_bonus=3, color=(85, 107, 47),
+    "DARK_FOREST": Terrain(name="Dark Forest", movement_cost=3.5, defense_bonus=10, visibility_modifier=0.4, color=(0, 51, 0), key="DARK_FOREST"),
+    "WOODLAND": Terrain(name="Woodland", movement_cost=1.2, defense_bonus=3, visibility_modifier=0.8, color=(85, 107, 47),
                       unit_modifiers={"archer": {"attack_bonus": 1, "defense_bonus": 2},
                                       "spearman": {"defense_bonus": 1}}, key="WOODLAND"),
 
     # --- Горы ---
-    "HILLS": Terrain(name="Hills", movement_cost=3.0, defense_bonus=8, color=(139, 137, 112),
+    "HILLS": Terrain(name="Hills", movement_cost=3.0, defense_bonus=8, visibility_modifier=1.5, color=(139, 137, 112),
                    unit_modifiers={"archer": {"attack_bonus": 3},
                                    "crossbowman": {"attack_bonus": 2},
                                    "slinger": {"attack_bonus": 2}}, key="HILLS"),
-    "ROCKS": Terrain(name="Rocks", movement_cost=4.0, defense_bonus=12, color=(105, 105, 105),
+    "ROCKS": Terrain(name="Rocks", movement_cost=4.0, defense_bonus=12, visibility_modifier=1.25, color=(105, 105, 105),
                    unit_modifiers={"heavy_infantry": {"defense_bonus": 3}, "shieldman": {"defense_bonus": 5}}, key="ROCKS"),
-    "GORGE": Terrain(name="Gorge", movement_cost=1.4, defense_bonus=3, color=(160, 141, 106), key="GORGE"),
-    "PLATEAU": Terrain(name="Plateau", movement_cost=1.8, defense_bonus=10, color=(189, 169, 124),
+    "GORGE": Terrain(name="Gorge", movement_cost=1.4, defense_bonus=3, visibility_modifier=0.7, color=(160, 141, 106), key="GORGE"),
+    "PLATEAU": Terrain(name="Plateau", movement_cost=1.8, defense_bonus=10, visibility_modifier=1.5, color=(189, 169, 124),
                      unit_modifiers={"archer": {"attack_bonus": 2}, "crossbowman": {"attack_bonus": 3}}, key="PLATEAU"),
 
     # --- Водоемы и болота ---
     "SHALLOW_RIVER": Terrain(name="Shallow River", movement_cost=3.5, defense_bonus=-5, color=(100, 180, 230),
                            unit_modifiers={"heavy_infantry": {"defense_bonus": -5}, "heavy_cavalry": {"defense_bonus": -7}}, key="SHALLOW_RIVER"),
-    "SWAMP": Terrain(name="Swamp", movement_cost=5.0, defense_bonus=1, color=(82, 95, 83),
+    "SWAMP": Terrain(name="Swamp", movement_cost=5.0, defense_bonus=1, visibility_modifier=0.8, color=(82, 95, 83),
                    unit_modifiers={"heavy_infantry": {"attack_bonus": -3, "defense_bonus": -5},
                                    "heavy_cavalry": {"attack_bonus": -5, "defense_bonus": -8},
                                    "light_infantry": {"defense_bonus": 1}}, key="SWAMP"),
@@ -65,7 +65,7 @@ TERRAIN_TYPES = {
     # --- Городские территории (как базовый ландшафт) ---
     "VILLAGE": Terrain(name="Village", movement_cost=1.0, defense_bonus=10, color=(222, 184, 135), key="VILLAGE"),
     "TOWN": Terrain(name="Town", movement_cost=1.0, defense_bonus=15, color=(192, 192, 192), key="TOWN"),
-    "CASTLE": Terrain(name="Castle", movement_cost=1.0, defense_bonus=25, color=(128, 128, 128), key="CASTLE"),
+    "CASTLE": Terrain(name="Castle", movement_cost=1.0, defense_bonus=25, visibility_modifier=1.5, color=(128, 128, 128), key="CASTLE"),
     "RUINS": Terrain(name="Ruins", movement_cost=1.3, defense_bonus=8, color=(112, 128, 144),
                    unit_modifiers={"spearman": {"defense_bonus": 3}, "archer": {"defense_bonus": 2}}, key="RUINS"),
 
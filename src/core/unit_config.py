@@ -10,6 +10,7 @@
 # Структура:
 #   "ID_ЮНИТА": {
 #       "name": "Название",
+#       "category": "infantry" | "cavalry" | "ranged" — род войск (используется ИИ),
 #       "description": "Описание",
 #       "base_hp": Базовое здоровье одной единицы,
 #       "base_attack": Базовая атака,
@@ -25,6 +26,7 @@ UNIT_TYPES = {
     # --- Пехота ---
     "militia": {
         "name": "Ополченец",
+        "category": "infantry",
         "description": "Плохо обученный и снаряженный, но дешевый юнит. Эффективен только в большом количестве.",
         "base_hp": 80,
         "base_attack": 4,
@@ -35,6 +37,7 @@ UNIT_TYPES = {
     },
     "spearman": {
         "name": "Копейщик",
+        "category": "infantry",
         "description": "Дисциплинированный пехотинец, обученный борьбе с кавалерией.",
         "base_hp": 100,
         "base_attack": 5,
@@ -45,6 +48,7 @@ UNIT_TYPES = {
     },
     "swordsman": {
         "name": "Мечник",
+        "category": "infantry",
         "description": "Универсальный пехотинец, хорош против другой пехоты.",
         "base_hp": 120,
         "base_attack": 6,
@@ -55,6 +59,7 @@ UNIT_TYPES = {
     },
     "axeman": {
         "name": "Топорщик",
+        "category": "infantry",
         "description": "Эффективен против тяжелобронированных целей, но сам уязвим.",
         "base_hp": 110,
         "base_attack": 7,
@@ -65,6 +70,7 @@ UNIT_TYPES = {
     },
      "shieldman": {
         "name": "Щитоносец",
+        "category": "infantry",
         "description": "Тяжелый пехотинец с огромным щитом, отличная защита, но низкая атака.",
         "base_hp": 150,
         "base_attack": 2,
@@ -77,6 +83,7 @@ UNIT_TYPES = {
     # --- Кавалерия ---
     "light_cavalry": {
         "name": "Легкая кавалерия",
+        "category": "cavalry",
         "description": "Быстрый юнит для разведки и атак на фланги, эффективен против стрелков и легкой пехоты.",
         "base_hp": 90,
         "base_attack": 6,
@@ -87,6 +94,7 @@ UNIT_TYPES = {
     },
     "heavy_cavalry": {
         "name": "Тяжелая кавалерия",
+        "category": "cavalry",
         "description": "Мощный удар, способный прорвать строй врага. Уязвимы для копейщиков.",
         "base_hp": 140,
         "base_attack": 8,
@@ -97,6 +105,7 @@ UNIT_TYPES = {
     },
     "horse_archer": {
         "name": "Конный лучник",
+        "category": "cavalry",
         "description": "Мобильный стрелок, способный изматывать врага постоянными атаками.",
         "base_hp": 80,
         "base_attack": 5, # Атака считается дальней
@@ -109,6 +118,7 @@ UNIT_TYPES = {
     # --- Стрелки ---
     "archer": {
         "name": "Лучник",
+        "category": "ranged",
         "description": "Стрелок, эффективный на расстоянии, но очень уязвимый в ближнем бою.",
         "base_hp": 70,
         "base_attack": 5, # Атака считается дальней
@@ -119,6 +129,7 @@ UNIT_TYPES = {
     },
     "crossbowman": {
         "name": "Арбалетчик",
+        "category": "ranged",
         "description": "Медленный, но мощный стрелок, способный пробивать тяжелую броню.",
         "base_hp": 85,
         "base_attack": 7, # Атака считается дальней
@@ -129,6 +140,7 @@ UNIT_TYPES = {
     },
     "slinger": {
         "name": "Пращник",
+        "category": "ranged",
         "description": "Дешевый и быстрый стрелок с низкой дальностью и уроном.",
         "base_hp": 60,
         "base_attack": 3, # Атака считается дальней
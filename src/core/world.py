@@ -1,6 +1,13 @@
+import numpy as np
 from ..game_objects.faction import Faction
 from ..game_objects.army import Army
 from ..game_objects.unit import Unit
+from .spatial_hash import SpatialHash, FactionSpatialIndex
+from .engagement_index import EngagementIndex
+from .movement import MovementSystem, build_movement_cost_raster
+from .knowledge import KnowledgeMap, vision_radius_of
+from .influence_map import InfluenceMap
+from .events import EventRecorder, TextLogView
 
 class GameWorld:
     """
@@ -9,10 +16,76 @@ class GameWorld:
     def __init__(self, width, height):
         self.width = width
         self.height = height
+        self.time = 0.0 # Game time in seconds (does not advance while paused)
         self.map_data = [] # Should be filled by a generator
         self.factions = []
         self.armies = []
         self.territories = []
+        self.next_army_id = 1 # Armies are numbered in order of arrival, so ids repeat between runs and replays
+        # Grid index of armies by position, used for collision queries
+        self.army_index = SpatialHash(cell_size=2.0)
+        # Per-faction grid index shared by all AI generals for target search.
+        # Its cell size must be a multiple of army_index's (see update_army_position).
+        self.target_index = FactionSpatialIndex(cell_size=8.0)
+        # Active combats indexed by participating army and by pair of opponents
+        self.engagements = EngagementIndex()
+        # Movement cost of every tile as a NumPy array, built from map_data
+        self.movement_cost_raster = None
+        # Terrain defense bonus of every tile as a NumPy array, used by AI target scoring
+        self.defense_bonus_raster = None
+        # Moves all armies in one vectorized step per frame
+        self.movement = MovementSystem(self)
+        # Per-faction fog of war: explored/visible tiles and last-seen enemies
+        self.knowledge = KnowledgeMap(self)
+        # Per-faction strength/threat fields, updated at a low frequency
+        self.influence = InfluenceMap(self)
+        # Structured journal of combat and movement events; the text logs are a view of it
+        self.events = EventRecorder()
+        self.events.views.append(TextLogView())
+        # Changes since the last autosave checkpoint (armies carry their own `dirty` flag)
+        self.dirty_tiles = set() # (x, y) of tiles changed through tile_changed
+        self.removed_army_ids = [] # ids of armies removed from the world
+
+    def build_movement_cost_raster(self):
+        """(Re)builds the movement cost raster. Call after map_data changes."""
+        self.movement_cost_raster = build_movement_cost_raster(self.map_data)
+
+    def build_defense_bonus_raster(self):
+        """(Re)builds the defense bonus raster. Call after map_data changes."""
+        self.defense_bonus_raster = np.array([[tile.get_defense_bonus() for tile in row] for row in self.map_data],
+                                             dtype=np.float64)
+
+    def build_knowledge(self):
+        """(Re)builds the factions' knowledge layers. Call after map_data changes."""
+        self.knowledge.build()
+
+    def build_influence(self):
+        """(Re)builds the influence fields. Call after map_data changes."""
+        self.influence.build()
+
+    def tile_changed(self, x, y):
+        """
+        Call after changing a tile of map_data (terrain or features): updates
+        the rasters and the influence fields at that tile and marks it for the
+        next autosave delta.
+        """
+        tile = self.map_data[y][x]
+        if self.movement_cost_raster is not None:
+            self.movement_cost_raster[y, x] = tile.get_movement_cost()
+            self.influence.tile_changed(x, y)
+        if self.defense_bonus_raster is not None:
+            self.defense_bonus_raster[y, x] = tile.get_defense_bonus()
+        if self.knowledge.vision_radius is not None:
+            self.knowledge.vision_radius[y, x] = vision_radius_of(tile)
+        self.dirty_tiles.add((x, y))
+
+    def update_army_position(self, army):
+        """
+        Keeps the spatial indices in sync after an army has moved.
+        Only needs to be called when the army changed its army_index cell.
+        """
+        self.army_index.move(army)
+        self.target_index.move(army)
 
     def add_faction(self, faction: Faction):
         """Adds a faction to the world."""
@@ -22,12 +95,37 @@ class GameWorld:
     def add_army(self, army: Army):
         """Adds an army to the world."""
         if army not in self.armies:
+            army.id = self.next_army_id
+            self.next_army_id += 1
             self.armies.append(army)
+            self.army_index.insert(army)
+            self.target_index.insert(army)
+            self.movement.register(army)
+            self.knowledge.add_army(army)
+
+    def add_armies(self, armies):
+        """
+        Adds many new armies at once (e.g. restoring a snapshot), without a
+        membership check per army. The armies keep their ids.
+        """
+        armies = list(armies)
+        self.armies.extend(armies)
+        self.next_army_id = max([self.next_army_id] + [army.id + 1 for army in armies])
+        for army in armies:
+            self.army_index.insert(army)
+            self.target_index.insert(army)
+            self.movement.register(army)
+            self.knowledge.add_army(army)
 
     def remove_army(self, army: Army):
         """Removes an army from the world."""
         if army in self.armies:
             self.armies.remove(army)
+            self.removed_army_ids.append(army.id)
+        self.army_index.remove(army)
+        self.target_index.remove(army)
+        self.movement.unregister(army)
+        self.knowledge.remove_army(army)
         # Also remove from faction's list if it's still there
         if hasattr(army, 'faction') and army.faction and hasattr(army.faction, 'armies') and army in army.faction.armies:
             army.faction.armies.remove(army)
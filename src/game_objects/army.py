@@ -1,36 +1,40 @@
 import itertools
 from .unit import Unit
-from ..core.log import log
+from ..core.log import get_logger
+from ..core.movement import STRANDED_MOVEMENT_COST
 from ..core.pathfinding import find_path
 from ..misc.enums import Stance
 
+log = get_logger("movement")
+
 class Army:
     """Represents a group of units, controlled by a faction."""
     
     def __init__(self, faction, x, y, units=None):
-        self.id = id(self)
+        self.id = id(self) # Replaced by a sequential id when the army is added to a world
+        self.dirty = True # Changed since the last autosave checkpoint (see Autosave)
         self.faction = faction
         self.x = x
         self.y = y
-        self.units = units if units is not None else []
+        self.units = units if units is not None else [] # Also initializes the cached aggregates
         self.target_entity = None # The army object we are targeting
         self.path = [] # list of (x, y) tuples for movement
+        self.path_index = 0 # Cursor to the current waypoint in self.path
         self.speed = 5.0 # tiles per second
+        self._movement_system = None # Batch movement system the army is registered in, if any
         self.in_combat = False
         self.stance = Stance.IDLE
         self.collision_radius = 0.75 # tiles
-        # Для антиспама логирования: запоминаем последний тайл, в котором уже писали лог
-        self._last_logged_tile = (int(self.x), int(self.y))
 
     def set_target(self, target_entity):
         """Sets a target entity for the army and clears any existing path."""
         self.target_entity = target_entity
-        self.path = [] # Clear path when new target is set
         self.stance = Stance.IDLE
+        self._assign_path([]) # Clear path when new target is set
         if target_entity:
-            log.debug(f"Army {self.id} of {self.faction.name} is now targeting army {target_entity.id}.")
+            log.debug("Army %s of %s is now targeting army %s.", self.id, self.faction.name, target_entity.id)
         else:
-            log.debug(f"Army {self.id} of {self.faction.name} has cleared its target.")
+            log.debug("Army %s of %s has cleared its target.", self.id, self.faction.name)
 
     def set_path(self, path):
         """
@@ -38,22 +42,64 @@ class Army:
         If the army is already moving, it tries to update the path smoothly.
         """
         if not path:
-            self.path = []
             self.stance = Stance.IDLE
+            self._assign_path([])
             return
 
         # Smooth path update
-        if self.path and len(self.path) > 1 and len(path) > 1:
+        if len(self.path) - self.path_index > 1 and len(path) > 1:
             # If we are heading to the same next waypoint, just update the rest of the path
-            if self.path[0] == path[0]:
-                self.path = path
+            if self.path[self.path_index] == path[0]:
+                self._assign_path(path)
                 return
 
         # Full path reset
-        self.path = path
         self.stance = Stance.MOVING
+        self._assign_path(path)
         # This log can be spammy, so it's commented out for now.
-        # log.debug(f"Army {self.id} received a path of {len(path)} steps and is now {self.stance}.")
+        # log.debug("Army %s received a path of %s steps and is now %s.", self.id, len(path), self.stance)
+
+    def _assign_path(self, path):
+        """Replaces the path, resets the waypoint cursor and notifies the movement system."""
+        self.path = path
+        self.path_index = 0
+        self.dirty = True
+        self._notify_movement()
+
+    def _notify_movement(self):
+        if self._movement_system is not None:
+            self._movement_system.refresh(self)
+
+    @property
+    def in_combat(self):
+        return self._in_combat
+
+    @in_combat.setter
+    def in_combat(self, value):
+        self._in_combat = value
+        self.dirty = True
+        self._notify_movement()
+
+    @property
+    def has_path(self):
+        """True if there are waypoints left to walk."""
+        return self.path_index < len(self.path)
+
+    @property
+    def current_waypoint(self):
+        """The waypoint the army is currently heading to, or None."""
+        return self.path[self.path_index] if self.path_index < len(self.path) else None
+
+    def advance_waypoint(self):
+        """Moves the cursor to the next waypoint. Returns False when the path is complete."""
+        self.path_index += 1
+        self.dirty = True
+        if self.path_index < len(self.path):
+            return True
+        log.debug("Army %s has completed its path.", self.id)
+        self.target_entity = None # Path is complete
+        self.stance = Stance.IDLE
+        return False
 
     def get_distance_to(self, other_army):
         """Calculates the distance to another army."""
@@ -61,90 +107,150 @@ class Army:
 
     def get_total_attribute(self, attribute):
         """Calculates the sum of a given attribute for all units in the army."""
+        if attribute in self._CACHED_ATTRIBUTES:
+            return getattr(self, self._CACHED_ATTRIBUTES[attribute])
         return sum(getattr(unit, attribute) for unit in self.units)
 
+    # ---- Units and cached aggregates ----
+    # Aggregates are maintained incrementally. Change the composition only through
+    # add_unit/remove_unit/damage_unit/remove_dead_units (or by assigning `units`,
+    # which recalculates everything), not by mutating the list in place.
+    _CACHED_ATTRIBUTES = {'hp': '_total_hp', 'max_hp': '_max_hp', 'attack': '_attack_power', 'defense': '_defense_power'}
+
+    @property
+    def units(self):
+        """List of units in the army. Treat as read-only; see the helpers below."""
+        return self._units
+
+    @units.setter
+    def units(self, units):
+        self._units = list(units)
+        self.recalculate_aggregates()
+
+    def recalculate_aggregates(self):
+        """Recomputes all cached aggregates from scratch."""
+        self._total_hp = 0
+        self._max_hp = 0
+        self._attack_power = 0
+        self._defense_power = 0
+        self.unit_counts = {}
+        for unit in self._units:
+            self._count_unit(unit, 1)
+
+    def _count_unit(self, unit, sign):
+        self.dirty = True
+        self._total_hp += sign * unit.hp
+        self._max_hp += sign * unit.max_hp
+        self._attack_power += sign * unit.attack
+        self._defense_power += sign * unit.defense
+        count = self.unit_counts.get(unit.unit_type, 0) + sign
+        if count:
+            self.unit_counts[unit.unit_type] = count
+        else:
+            del self.unit_counts[unit.unit_type]
+
+    def add_unit(self, unit):
+        """Adds a unit to the army."""
+        self._units.append(unit)
+        self._count_unit(unit, 1)
+
+    def remove_unit(self, unit):
+        """Removes a unit from the army."""
+        self._units.remove(unit)
+        self._count_unit(unit, -1)
+
+    def damage_unit(self, unit, damage):
+        """Applies damage to one of the army's units, keeping total HP in sync."""
+        unit.hp -= damage
+        self._total_hp -= damage
+        self.dirty = True
+
+    def remove_dead_units(self):
+        """Removes units with hp <= 0 and returns the list of removed units."""
+        dead_units = [unit for unit in self._units if unit.hp <= 0]
+        if dead_units:
+            self._units = [unit for unit in self._units if unit.hp > 0]
+            for unit in dead_units:
+                self._count_unit(unit, -1)
+        return dead_units
+
     def take_damage(self, total_damage):
-        """Distributes damage among units in the army."""
-        if not self.units:
+        """Distributes damage evenly among units in the army and returns the units lost."""
+        if not self._units:
             return []
 
-        damage_per_unit = total_damage / len(self.units)
-        lost_units = []
-        
-        # Take a copy of the list to modify it while iterating
-        for unit in list(self.units):
-            lost_unit = unit.take_damage(damage_per_unit)
-            if lost_unit:
-                lost_units.append(lost_unit)
-                self.units.remove(unit)
-        return lost_units
+        damage_per_unit = total_damage / len(self._units)
+        for unit in self._units:
+            self.damage_unit(unit, damage_per_unit)
+        return self.remove_dead_units()
 
     def update(self, delta_time, world):
-        """Updates the army's position based on its path."""
-        if self.in_combat or not self.path:
+        """
+        Updates the army's position based on its path.
+        Per-army fallback: the game moves registered armies in bulk via MovementSystem.
+        """
+        if self.in_combat or not self.has_path:
             return
 
-        target_x, target_y = self.path[0]
+        target_x, target_y = self.path[self.path_index]
         
         dx = target_x - self.x
         dy = target_y - self.y
         distance = (dx**2 + dy**2)**0.5
 
         if distance == 0:
-             # We might be exactly on the waypoint, pop and continue
-            self.path.pop(0)
-            if not self.path:
-                log.debug(f"Army {self.id} has completed its path.")
-                self.target_entity = None # Path is complete
-                self.stance = Stance.IDLE
+             # We might be exactly on the waypoint, advance and continue
+            self.advance_waypoint()
             return
 
         # Get the tile we are currently on
         current_tile_x, current_tile_y = int(self.x), int(self.y)
         tile = world.map_data[current_tile_y][current_tile_x]
         
-        # Calculate movement speed considering terrain cost
-        move_speed = self.speed * delta_time / tile.get_movement_cost()
+        # Calculate movement speed considering terrain cost (an unwalkable tile must not stop the army for good)
+        cost = tile.get_movement_cost()
+        if cost == float('inf'):
+            cost = STRANDED_MOVEMENT_COST
+        move_speed = self.speed * delta_time / cost
 
         if move_speed >= distance:
             # We can reach the waypoint in this frame
             self.x = target_x
             self.y = target_y
-            self.path.pop(0)
-            if not self.path:
-                log.debug(f"Army {self.id} has completed its path.")
-                self.target_entity = None # Path is complete
-                self.stance = Stance.IDLE
+            self.advance_waypoint()
         else:
             # Move towards the waypoint
             self.x += (dx / distance) * move_speed
             self.y += (dy / distance) * move_speed
 
-        # ---- Логирование позиции (только при смене тайла) ----
-        current_tile = (int(self.x), int(self.y))
-        if current_tile != self._last_logged_tile:
-            self._last_logged_tile = current_tile
-            log.debug(f"Army {self.id} moved to tile {current_tile} (Faction: {self.faction.name}).")
+        self.dirty = True
+        # Keep the world's spatial index (and batch movement state, if any) in sync
+        world.update_army_position(self)
+        self._notify_movement()
+
+        # ---- Событие смены тайла ----
+        if (int(self.x), int(self.y)) != (current_tile_x, current_tile_y):
+            world.events.army_moved_tile(world.time, self)
 
     @property
     def total_hp(self):
         """Total HP of all units in the army."""
-        return sum(unit.hp for unit in self.units)
+        return self._total_hp
     
     @property
     def max_hp(self):
         """Maximum possible HP of all units in the army."""
-        return sum(unit.max_hp for unit in self.units)
+        return self._max_hp
 
     @property
     def attack_power(self):
         """Total attack power of the army."""
-        return self.get_total_attribute('attack')
+        return self._attack_power
 
     @property
     def defense_power(self):
         """Total defense power of the army."""
-        return self.get_total_attribute('defense')
+        return self._defense_power
 
     @property
     def is_destroyed(self):
@@ -1,24 +1,171 @@
+from typing import NamedTuple
 from ..core.unit_config import UNIT_TYPES
 
+
+class UnitTypeRecord(NamedTuple):
+    """
+    Immutable stats of one unit type, built once from unit_config and shared
+    by every unit of that type.
+    """
+    unit_type: str
+    name: str
+    max_hp: int
+    attack: int
+    defense: int
+    counters: frozenset
+    countered_by: frozenset
+    category: str = "infantry"
+
+
+# Interned records: unit type id -> UnitTypeRecord
+_TYPE_RECORDS = {}
+
+
+def get_unit_type_record(unit_type: str) -> UnitTypeRecord:
+    """Returns the shared stats record for a unit type, creating it on first use."""
+    record = _TYPE_RECORDS.get(unit_type)
+    if record is None:
+        if unit_type not in UNIT_TYPES:
+            raise ValueError(f"Unknown unit type: {unit_type}")
+        config = UNIT_TYPES[unit_type]
+        record = UnitTypeRecord(
+            unit_type=unit_type,
+            name=config["name"],
+            max_hp=config["base_hp"],
+            attack=config["base_attack"],
+            defense=config["base_defense"],
+            counters=frozenset(config.get("counters", [])),
+            countered_by=frozenset(config.get("countered_by", [])),
+            category=config.get("category", "infantry"),
+        )
+        _TYPE_RECORDS[unit_type] = record
+    return record
+
+
 class Unit:
     """
     The base class for all combat units in the game.
-    It initializes its attributes based on a unit type from unit_config.
+    Only the per-instance state (current hp and the type record) is stored on
+    the unit; all base stats are read from the shared type record.
     """
+    __slots__ = ("hp", "type_record")
+
     def __init__(self, unit_type: str):
-        if unit_type not in UNIT_TYPES:
-            raise ValueError(f"Unknown unit type: {unit_type}")
+        self.type_record = get_unit_type_record(unit_type)
+        self.hp = self.type_record.max_hp
 
-        config = UNIT_TYPES[unit_type]
+    @classmethod
+    def restore(cls, type_record: UnitTypeRecord, hp):
+        """Recreates a unit with the given state (e.g. from a world snapshot) without a registry lookup."""
+        unit = cls.__new__(cls)
+        unit.type_record = type_record
+        unit.hp = hp
+        return unit
+
+    @property
+    def unit_type(self):
+        return self.type_record.unit_type
+
+    @property
+    def name(self):
+        return self.type_record.name
+
+    @property
+    def max_hp(self):
+        return self.type_record.max_hp
+
+    @property
+    def attack(self):
+        return self.type_record.attack
+
+    @property
+    def defense(self):
+        return self.type_record.defense
+
+    @property
+    def category(self):
+        return self.type_record.category
+
+    @property
+    def counters(self):
+        return self.type_record.counters
+
+    @property
+    def countered_by(self):
+        return self.type_record.countered_by
+
+    def __repr__(self):
+        return f"Unit(type={self.unit_type}, hp={self.hp}/{self.max_hp})"
+
+
+class Regiment:
+    """
+    Compact representation of many identical units: the unit type, how many
+    units are alive and their shared hp pool. Damage drains the pool, and a
+    unit is lost each time the pool drops below the hp of the remaining units.
+    """
+    __slots__ = ("type_record", "count", "hp_pool")
+
+    def __init__(self, unit_type: str, count: int, hp_pool=None):
+        self.type_record = get_unit_type_record(unit_type)
+        self.count = count
+        self.hp_pool = hp_pool if hp_pool is not None else count * self.type_record.max_hp
+
+    @classmethod
+    def from_units(cls, units):
+        """Groups a list of units into regiments, one per unit type."""
+        regiments = {}
+        for unit in units:
+            regiment = regiments.get(unit.unit_type)
+            if regiment is None:
+                regiment = regiments[unit.unit_type] = cls(unit.unit_type, 0, 0)
+            regiment.count += 1
+            regiment.hp_pool += unit.hp
+        return list(regiments.values())
+
+    def to_units(self):
+        """Expands the regiment back into individual units, spreading the hp pool evenly."""
+        units = [Unit(self.unit_type) for _ in range(self.count)]
+        if units:
+            hp_per_unit, remainder = divmod(self.hp_pool, self.count)
+            for i, unit in enumerate(units):
+                unit.hp = hp_per_unit + (1 if i < remainder else 0)
+        return units
+
+    @property
+    def unit_type(self):
+        return self.type_record.unit_type
+
+    @property
+    def max_hp(self):
+        return self.count * self.type_record.max_hp
+
+    @property
+    def attack(self):
+        return self.count * self.type_record.attack
+
+    @property
+    def defense(self):
+        return self.count * self.type_record.defense
+
+    @property
+    def is_destroyed(self):
+        return self.count <= 0
+
+    def take_damage(self, damage):
+        """Applies damage to the hp pool and returns the number of units lost."""
+        if self.count <= 0:
+            return 0
+        self.hp_pool = max(0, self.hp_pool - damage)
+        unit_hp = self.type_record.max_hp
+        # Number of units still alive: every started block of unit hp keeps one unit standing
+        alive = min(self.count, int(-(-self.hp_pool // unit_hp)))
+        lost = self.count - alive
+        self.count = alive
+        return lost
 
-        self.unit_type = unit_type
-        self.name = config["name"]
-        self.max_hp = config["base_hp"]
-        self.hp = self.max_hp
-        self.attack = config["base_attack"]
-        self.defense = config["base_defense"]
-        self.counters = config.get("counters", [])
-        self.countered_by = config.get("countered_by", [])
+    def __len__(self):
+        return self.count
 
     def __repr__(self):
-        return f"Unit(type={self.unit_type}, hp={self.hp}/{self.max_hp})" 
\ No newline at end of file
+        return f"Regiment(type={self.unit_type}, count={self.count}, hp={self.hp_pool}/{self.max_hp})"
@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 
 class Stance(Enum):
@@ -39,4 +39,70 @@ class CombatType(Enum):
     Определяет тип начавшегося боя на основе стоек армий.
     """
     MEETING_ENGAGEMENT = auto()  # Встречный бой
-    POSITIONAL_ASSAULT = auto()  # Атака на подготовленную позицию 
\ No newline at end of file
+    POSITIONAL_ASSAULT = auto()  # Атака на подготовленную позицию 
+
+class Situation(IntEnum):
+    """
+    Ситуации из `tactical_matrix` профиля генерала. Значения — индексы столбцов
+    скомпилированной таблицы решений (см. src/ai/decision_tables.py).
+    """
+    DEFAULT = 0  # Нет более подходящей ситуации
+    VS_INFANTRY = 1  # Противник в основном пехота
+    VS_ARCHERS = 2  # Противник в основном стрелки
+    VS_CAVALRY = 3  # Противник в основном кавалерия
+    WHEN_OUTNUMBERED = 4  # Противник заметно многочисленнее
+
+
+class Tactic(IntEnum):
+    """
+    Тактики, которые генерал выбирает по `tactical_matrix`. Значения — коды
+    в скомпилированной таблице решений.
+    """
+    NONE = 0  # Не вступать в бой (нет тактики)
+    CHARGE = 1  # Прямая атака
+    OVERWHELM = 2  # Атака превосходящими силами
+    DESPERATE_CHARGE = 3  # Отчаянная атака
+    SKIRMISH = 4  # Перестрелка без сближения
+    HOLD_POSITION = 5  # Держать позицию
+    RETREAT = 6  # Отступление
+
+
+class EventType(IntEnum):
+    """
+    Типы событий структурного журнала (см. src/core/events.py). Значения — коды
+    в поле `kind` записи, идут подряд с нуля.
+    """
+    COMBAT_STARTED = 0  # Начало боя
+    ROUND_RESOLVED = 1  # Раунд боя рассчитан (урон и потери сторон)
+    COMBAT_FINISHED = 2  # Бой окончен (победитель или ничья)
+    ARMY_MOVED_TILE = 3  # Армия перешла на другой тайл
+    ARMY_DESTROYED = 4  # Армия уничтожена
+
+
+class PathStatus(Enum):
+    """
+    Итог поиска пути (см. src/core/pathfinding.py).
+    """
+    FOUND = auto()  # Путь найден (пустой, если старт совпадает с целью)
+    UNREACHABLE = auto()  # Цель недостижима: открытое множество исчерпано или точка непроходима
+    BUDGET_EXCEEDED = auto()  # Поиск прерван по лимиту итераций — недостижимость не доказана
+
+
+class CommandType(IntEnum):
+    """
+    Команды игрока (см. Game.execute_command). Значения — коды в потоке
+    команд записи сессии (src/core/replay.py).
+    """
+    QUIT = 0  # Выход из игры
+    TOGGLE_PAUSE = 1  # Пауза / продолжение
+    ZOOM_IN = 2  # Приблизить камеру
+    ZOOM_OUT = 3  # Отдалить камеру
+    MOVE_CAMERA = 4  # Сдвиг камеры: a, b — смещение по x и y
+    RESIZE = 5  # Изменён размер окна
+    INSPECT_TILE = 6  # Информация о тайле: a, b — координаты тайла
+    TOGGLE_POLITICAL_MAP = 7  # Политическая карта
+    TOGGLE_PROFILER = 8  # Оверлей профилировщика
+    DUMP_TRACE = 9  # Сохранить трассу профилировщика
+    QUICKSAVE = 10  # Быстрое сохранение
+    QUICKLOAD = 11  # Загрузка быстрого сохранения
+    LOAD_AUTOSAVE = 12  # Загрузка автосохранения
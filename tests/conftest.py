@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# The tests import the game as `src...`, like main.py and the benchmarks do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture
+def make_game(tmp_path):
+    """Builds small headless games with fixed seeds; autosaves go to the test's temporary directory."""
+    from src.core.autosave import Autosave
+    from src.core.game import Game
+
+    def make(**options):
+        game = Game(**dict(dict(headless=True, map_size=24, armies_per_faction=3, seed=7, map_seed=42), **options))
+        game.autosave = Autosave(str(tmp_path / "autosave"), enabled=False)
+        game.world.events.views.clear() # No text log
+        return game
+    return make
+
+
+@pytest.fixture
+def world_state():
+    """Returns a function that lists what the simulation of a world depends on: armies, units, paths, combats."""
+    def state(world):
+        armies = [(army.id, army.faction.name, army.x, army.y, army.speed, army.stance, army.in_combat,
+                   list(army.path), army.path_index,
+                   army.target_entity.id if army.target_entity is not None else None,
+                   [(unit.type_record.unit_type, unit.hp) for unit in army.units])
+                  for army in world.armies]
+        combats = [(combat.combat_type, combat.round_number, [[army.id for army in side] for side in combat.sides])
+                   for combat in world.engagements]
+        return world.time, armies, combats
+    return state
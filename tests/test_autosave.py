@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+
+from src.core.autosave import Autosave, latest_chain
+from src.game_objects.tile import Road
+
+FRAME = 1 / 60
+
+
+def _run(game, frames):
+    for _ in range(frames):
+        game.step(FRAME)
+
+
+def test_compacted_chain_with_deltas_equals_full_snapshot(make_game, world_state, tmp_path):
+    directory = str(tmp_path / "chain")
+    game = make_game()
+    game.autosave = Autosave(directory, max_chain=2, enabled=False) # Checkpoints are taken by hand below
+
+    game.autosave.checkpoint(game.world, game) # Base of generation 0
+    _run(game, 400)
+    game.world.map_data[3][3].add_feature(Road())
+    game.world.tile_changed(3, 3)
+    game.autosave.checkpoint(game.world, game)
+    _run(game, 400)
+    game.autosave.checkpoint(game.world, game) # Second delta: compacted into the base of generation 1
+    _run(game, 400)
+    game.autosave.checkpoint(game.world, game) # First delta on top of the compacted base
+    game.autosave.flush()
+    full_path = str(tmp_path / "full.ewcs")
+    game.save_snapshot(full_path)
+
+    base, deltas = latest_chain(directory)
+    assert os.path.basename(base) == "base_000001.ewcs" and len(deltas) == 1
+
+    from_chain = make_game()
+    from_chain.autosave = Autosave(directory, enabled=False)
+    from_chain.load_autosave()
+    from_full = make_game()
+    from_full.load_snapshot(full_path)
+
+    assert world_state(from_chain.world) == world_state(from_full.world) == world_state(game.world)
+    assert Road in {type(feature) for feature in from_chain.world.map_data[3][3].features}
+    for name in ("movement_cost_raster", "defense_bonus_raster"):
+        np.testing.assert_array_equal(getattr(from_chain.world, name), getattr(from_full.world, name))
+    fields = {faction.name: field for faction, field in from_full.world.influence.strength.items()}
+    for faction, field in from_chain.world.influence.strength.items():
+        np.testing.assert_allclose(field, fields[faction.name], rtol=1e-6)
@@ -0,0 +1,47 @@
+import io
+import logging
+import queue
+
+from src.core import log as log_module
+from src.core.log import LogWriter, _NonFormattingQueueHandler
+
+
+def _record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def _writer():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return LogWriter(queue.SimpleQueue(), [handler]), stream
+
+
+def test_stop_marker_in_the_middle_of_a_batch_ends_the_thread():
+    writer, stream = _writer()
+    # A record logged after stop() queued the marker lands in the same batch behind it
+    writer.queue.put(_record("before"))
+    writer.queue.put(LogWriter._STOP)
+    writer.queue.put(_record("after"))
+    writer.start()
+    writer._thread.join(timeout=5)
+    assert not writer._thread.is_alive()
+    assert stream.getvalue() == "before\nafter\n"
+
+
+def test_records_logged_after_shutdown_are_written_synchronously(monkeypatch):
+    writer, stream = _writer()
+    logger = logging.getLogger("EternalWarChronicles.test_shutdown")
+    logger.propagate = False
+    queue_handler = _NonFormattingQueueHandler(writer.queue)
+    logger.addHandler(queue_handler)
+    monkeypatch.setattr(log_module, "log", logger)
+    monkeypatch.setattr(log_module, "writer", writer)
+    monkeypatch.setattr(log_module, "queue_handler", queue_handler)
+    writer.start()
+
+    logger.info("queued")
+    log_module.shutdown_logging()
+    logger.info("after shutdown")
+    assert writer._thread is None
+    assert stream.getvalue() == "queued\nafter shutdown\n"
@@ -0,0 +1,40 @@
+from src.core.terrain_config import TERRAIN_TYPES
+from src.core.world import GameWorld
+from src.game_objects.army import Army
+from src.game_objects.faction import Faction
+from src.game_objects.tile import Tile
+from src.game_objects.unit import Unit
+
+
+def _world(size=10, water=(3, 3)):
+    world = GameWorld(width=size, height=size)
+    world.map_data = [[Tile(TERRAIN_TYPES["GRASSLAND"]) for _ in range(size)] for _ in range(size)]
+    world.map_data[water[1]][water[0]] = Tile(TERRAIN_TYPES["DEEP_WATER"])
+    world.build_movement_cost_raster()
+    world.build_knowledge()
+    world.events.views.clear()
+    return world
+
+
+def _army_on_water():
+    army = Army(Faction("Order of the Sun", "Blue"), 3.5, 3.5, [Unit("swordsman")])
+    army.set_path([(6, 3)])
+    return army
+
+
+def test_army_on_unwalkable_tile_walks_off_it():
+    world = _world()
+    army = _army_on_water()
+    world.add_army(army)
+    for _ in range(600):
+        world.movement.update(1 / 60)
+    assert (army.x, army.y) == (6, 3)
+    assert not army.has_path
+
+
+def test_single_army_update_walks_off_unwalkable_tile():
+    world = _world()
+    army = _army_on_water()
+    start = army.x
+    army.update(1 / 60, world)
+    assert army.x > start
@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+
+from src.core.path_smoothing import _segment_cost, smooth_path
+
+
+def _tiles_on_segment(start, end, points=4000):
+    """Tiles under evenly spaced points of a segment."""
+    t = (np.arange(points) + 0.5) / points
+    xs = (start[0] + (end[0] - start[0]) * t).astype(int)
+    ys = (start[1] + (end[1] - start[1]) * t).astype(int)
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def _grid_with_wall(size=12, wall=(3, 3)):
+    raster = np.ones((size, size))
+    raster[wall[1], wall[0]] = math.inf
+    return raster
+
+
+def test_segment_cost_is_exact_length_on_uniform_grid():
+    raster = np.full((12, 12), 2.0)
+    assert _segment_cost(raster, (0, 0), (7, 9)) == math.hypot(7, 9) * 2.0
+
+
+def test_segment_clipping_tile_corner_is_unwalkable():
+    # (0,0)->(7,9) crosses about 0.18 tiles of (3,3): sampling 4 points per tile missed it
+    raster = _grid_with_wall()
+    assert (3, 3) in _tiles_on_segment((0, 0), (7, 9))
+    assert _segment_cost(raster, (0, 0), (7, 9)) == math.inf
+
+
+def test_segment_through_corner_of_unwalkable_tile():
+    raster = np.ones((5, 5))
+    raster[0, 1] = math.inf # The diagonal (0,0)->(2,2) touches only the corner of (1,0)
+    assert _segment_cost(raster, (0, 0), (2, 2)) == math.inf
+
+
+def test_smooth_path_keeps_off_unwalkable_corner():
+    raster = _grid_with_wall()
+    path = [(0, y) for y in range(10)] + [(x, 9) for x in range(1, 8)]
+    smoothed = smooth_path(path, raster)
+    assert smoothed[0] == (0, 0) and smoothed[-1] == (7, 9)
+    for start, end in zip(smoothed, smoothed[1:]):
+        assert (3, 3) not in _tiles_on_segment(start, end)
@@ -0,0 +1,36 @@
+import random
+
+from src.core.recording import Command
+from src.core.replay import Replay
+from src.misc.enums import CommandType
+
+
+def test_replay_reaches_the_recorded_final_state(make_game, world_state, tmp_path):
+    path = str(tmp_path / "session.ewcr")
+    game = make_game(record_path=path, map_size=40, armies_per_faction=12)
+    # Tiny frame budgets make both schedulers cut frames short, so the recorded cutoffs are exercised too
+    game.ai_scheduler.frame_budget_ms = 0.0001
+    game.combat_scheduler.frame_budget_ms = 0.0001
+    wall_clock = random.Random(99) # Uneven frame durations, like a real session
+    for frame in range(1500):
+        frame_ms = 0 if game.paused else wall_clock.choice((16, 17, 17, 33))
+        game.recorder.begin_frame(frame_ms)
+        if frame % 500 == 0:
+            game.execute_command(Command(CommandType.MOVE_CAMERA, 5, 3))
+        if frame in (700, 760):
+            game.execute_command(Command(CommandType.TOGGLE_PAUSE))
+        game.step(frame_ms / 1000.0)
+    assert game.recorder.cutoffs and game.recorder.decisions
+    assert game.recorder.save(path) == 1500
+
+    replay = Replay(path, keyframe_interval=500)
+    replay.run()
+    assert replay.desync_frame is None
+    assert replay.frame == 1500
+    assert world_state(replay.world) == world_state(game.world)
+    assert (replay.game.camera.x, replay.game.camera.y) == (game.camera.x, game.camera.y)
+
+    # Seeking back to a keyframe and running on ends in the same state
+    replay.seek(600)
+    replay.run()
+    assert world_state(replay.world) == world_state(game.world)
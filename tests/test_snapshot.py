@@ -0,0 +1,44 @@
+import random
+
+import numpy as np
+
+FRAME = 1 / 60
+
+
+def _run(game, frames):
+    for _ in range(frames):
+        game.step(FRAME)
+
+
+def _run_until_combat(game, limit=3000):
+    for _ in range(limit):
+        if any(combat.round_number > 0 for combat in game.world.engagements):
+            return
+        game.step(FRAME)
+    raise AssertionError(f"no combat within {limit} frames")
+
+
+def test_snapshot_round_trip_with_armies_in_combat(make_game, world_state, tmp_path):
+    game = make_game()
+    _run_until_combat(game)
+    path = str(tmp_path / "world.ewcs")
+    game.save_snapshot(path)
+
+    restored = make_game()
+    restored.load_snapshot(path) # Combats come back through Combat.restore
+    assert world_state(restored.world) == world_state(game.world)
+    assert restored.world.engagements
+    for combat in restored.world.engagements:
+        assert all(army.in_combat for army in combat.armies)
+        assert restored.combat_scheduler.due_time(combat) is not None
+    np.testing.assert_array_equal(restored.world.movement_cost_raster, game.world.movement_cost_raster)
+    for faction, field in game.world.influence.strength.items():
+        restored_field = next(f for other, f in restored.world.influence.strength.items() if other.name == faction.name)
+        np.testing.assert_allclose(restored_field, field, rtol=1e-6)
+
+    # Loading restored the random generator as it was at the save: both games go on the same way
+    random_state = random.getstate()
+    _run(game, 600)
+    random.setstate(random_state)
+    _run(restored, 600)
+    assert world_state(restored.world) == world_state(game.world)